@@ -1,7 +1,10 @@
 import typing
+from functools import lru_cache
 
 import numpy as np
 
+from Source.sudoku_validation import SudokuContradiction
+
 
 class EligibleNumbers:
     """
@@ -14,16 +17,47 @@ class EligibleNumbers:
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     array_all_true = np.array([0, 1, 1, 1, 1, 1, 1, 1, 1, 1, ], dtype=np.uint8)
     array_all_false = np.array([0, 0, 0, 0, 0, 0, 0, 0, 0, 0, ], dtype=np.uint8)
+    side = 9
+    __slots__ = ('base_array', 'trail')
 
     def __init__(self):
         self.base_array = self.array_all_true.copy()
+        # The undo list of the board, None unless the board has taken a checkpoint
+        self.trail = None
+
+    def copy(self):
+        """
+        The purpose of this function is to make an independent copy of the eligible numbers, the base array is copied
+        so the two objects never share memory.
+        :return: EligibleNumbers
+        """
+        en_copy = object.__new__(type(self))
+        en_copy.base_array = self.base_array.copy()
+        en_copy.trail = None
+        return en_copy
+
+    def record_state(self):
+        """
+        The purpose of this function is to put a copy of the base array on the trail before it changes.
+        :return:
+        """
+        if self.trail is not None:
+            self.trail.append((self, self.base_array.copy()))
+
+    def restore_state(self, state: np.array = None):
+        """
+        The purpose of this function is to put back a base array recorded on the trail.
+        :param state: old base array
+        :return:
+        """
+        self.base_array = state
 
     def get_values(self):
         """
         The purpose of this function is to get the indices of the True values in the array.
         :return:
         """
-        values = np.array([x for x in np.arange(0, 10) if self.base_array[x]], dtype=np.uint8)
+        values = np.array([x for x in np.arange(0, self.side + 1) if self.base_array[x]], dtype=np.uint8)
         return values
 
     def reset(self) -> np.array:
@@ -32,6 +66,7 @@ class EligibleNumbers:
         Note we use copy to give it a different memory address-otherwise we'd be updating the same object. 
         :return: 
         """
+        self.record_state()
         self.base_array = self.array_all_true.copy()
 
     def clear(self) -> np.array:
@@ -40,6 +75,7 @@ class EligibleNumbers:
         Note we use copy to give it a different memory address-otherwise we'd be updating the same object. 
         :return: 
         """
+        self.record_state()
         self.base_array = self.array_all_false.copy()
 
     def set_value(self, set_value: np.uint8 = None):
@@ -51,16 +87,47 @@ class EligibleNumbers:
         self.clear()
         self.base_array[set_value] = True
 
+    def get_mask(self) -> int:
+        """
+        The purpose of this function is to get the eligible numbers as a bitmask, bit d set when d is eligible, the
+        same layout EligibleBitmask uses.
+        :return:
+        """
+        gm = sum(1 << int(x) for x in np.flatnonzero(self.base_array))
+        return gm
+
+    def eliminate_mask(self, to_eliminate: int = None):
+        """
+        The purpose of this function is to eliminate every number whose bit is set in to_eliminate.
+        :param to_eliminate: bitmask
+        :return:
+        """
+        self.record_state()
+        for x in range(0, self.side + 1):
+            if to_eliminate >> x & 1:
+                self.base_array[x] = 0
+
+    def has_value(self, test_value: np.uint8 = None):
+        """
+        The purpose of this function is to check if a number is still eligible.
+        :param test_value:
+        :return:
+        """
+        hv = bool(self.base_array[test_value])
+        return hv
+
     def eliminate_value(self, to_eliminate: np.uint8 = None):
         """
-        The purpose of this function is to provide a means to eliminate a value.
+        The purpose of this function is to provide a means to eliminate a value. Removing the last eligible value
+        raises SudokuContradiction and leaves the cell as it was.
         :param to_eliminate:
         :return:
         """
 
-        if self.base_array.sum() == 0:
-            raise ValueError('shithitting ')
+        if self.base_array.sum() - self.base_array[to_eliminate] == 0:
+            raise SudokuContradiction('No eligible values would be left')
 
+        self.record_state()
         self.base_array[to_eliminate] = 0
 
     def number_of_eligible_values(self):
@@ -73,9 +140,9 @@ class EligibleNumbers:
         :param to_eliminate:
         :return:
         """
-        if self.number_of_eligible_values()==0:
-            raise ValueError("SHTF")
         to_eliminate = [np.uint8(x) for x in to_eliminate]
+        if not np.delete(self.base_array, to_eliminate).any():
+            raise SudokuContradiction('No eligible values would be left')
         for x in to_eliminate:
             self.eliminate_value(to_eliminate=x)
 
@@ -100,3 +167,21 @@ class EligibleNumbers:
         bas= self.base_array.sum()
         af = bas == np.uint8(1)
         return af
+
+
+@lru_cache(maxsize=8)
+def create_eligible_numbers_class(box_size: int = 3) -> type:
+    """
+    The purpose of this function is to create the EligibleNumbers class for a board of box_size x box_size parent
+    squares. The base array gets one slot per number plus the unused slot 0.
+    :param box_size: size of a parent square, 3 for 9 x 9, 4 for 16 x 16, 5 for 25 x 25
+    :return: class
+    """
+    if box_size == 3:
+        return EligibleNumbers
+    side = box_size * box_size
+    array_all_true = np.ones(shape=side + 1, dtype=np.uint8)
+    array_all_true[0] = 0
+    class_attributes = {'__slots__': (), 'side': side, 'array_all_true': array_all_true,
+                        'array_all_false': np.zeros(shape=side + 1, dtype=np.uint8)}
+    return type(f"EligibleNumbers{side}", (EligibleNumbers,), class_attributes)
@@ -0,0 +1,255 @@
+"""
+
+The purpose of this file is to store a compact bitmask version of the eligible numbers for a sudoku square.
+
+"""
+import typing
+from functools import lru_cache
+
+import numpy as np
+
+from Source.sudoku_validation import SudokuContradiction
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Bit d of the mask is set when the number d is still eligible. Bit 0 is never used, which mirrors the unused
+# slot 0 of EligibleNumbers.base_array.  Ten bits gives 1024 possible masks, small enough to precompute lookups.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+MASK_TABLE_SIZE = 1 << 10
+MASK_POPCOUNT = tuple(bin(m).count('1') for m in range(MASK_TABLE_SIZE))
+MASK_DIGITS = tuple(tuple(d for d in range(1, 10) if m >> d & 1) for m in range(MASK_TABLE_SIZE))
+MASK_LOWEST_DIGIT = tuple((m & -m).bit_length() - 1 if m else 0 for m in range(MASK_TABLE_SIZE))
+
+
+def _create_mask_value_arrays() -> tuple:
+    """
+    The purpose of this function is to build one read only uint8 array per mask so get_values can hand out a shared
+    array instead of building a new one on every call.
+    :return:
+    """
+    value_arrays = list()
+    for mask_digits in MASK_DIGITS:
+        value_array = np.array(mask_digits, dtype=np.uint8)
+        value_array.flags.writeable = False
+        value_arrays.append(value_array)
+    return tuple(value_arrays)
+
+
+MASK_VALUE_ARRAYS = _create_mask_value_arrays()
+
+
+def digits_to_mask(digits: typing.Iterable = None) -> int:
+    """
+    The purpose of this function is to turn an iterable of sudoku numbers into a bitmask.
+    :param digits: iterable of numbers 1..9
+    :return: int
+    """
+    mask = 0
+    for digit in digits:
+        mask |= 1 << int(digit)
+    return mask
+
+
+class EligibleBitmask:
+    """
+    The purpose of this class is to store the eligible numbers for a sudoku square as the bits of one small int.
+    It has the same functions as EligibleNumbers: initialize, retrieve, add, subtract.
+    """
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Board Values used throughout the class. Ints are immutable so no copy needed.
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    mask_all_true = 0b1111111110
+    mask_all_false = 0
+    side = 9
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # trail is the undo list of the board this cell belongs to, None unless the board has taken a checkpoint. Every
+    # change appends (self, old mask) so the board can roll back.
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    __slots__ = ('mask', 'trail')
+
+    def __init__(self):
+        self.mask = self.mask_all_true
+        self.trail = None
+
+    def copy(self):
+        """
+        The purpose of this function is to make an independent copy of the eligible numbers.
+        :return: EligibleBitmask
+        """
+        eb_copy = object.__new__(type(self))
+        eb_copy.mask = self.mask
+        eb_copy.trail = None
+        return eb_copy
+
+    def restore_state(self, state: int = None):
+        """
+        The purpose of this function is to put back a mask recorded on the trail.
+        :param state: old mask
+        :return:
+        """
+        self.mask = state
+
+    def get_mask(self) -> int:
+        """
+        The purpose of this function is to get the eligible numbers as a bitmask, bit d set when d is eligible.
+        :return:
+        """
+        return self.mask
+
+    def eliminate_mask(self, to_eliminate: int = None):
+        """
+        The purpose of this function is to eliminate every number whose bit is set in to_eliminate.
+        :param to_eliminate: bitmask
+        :return:
+        """
+        if self.trail is not None:
+            self.trail.append((self, self.mask))
+        self.mask &= ~to_eliminate
+
+    @property
+    def base_array(self) -> np.array:
+        """
+        The purpose of this property is to show the mask in the same 10 slot layout as EligibleNumbers.base_array.
+        This builds a new array, so it is for inspection only and not for the solving loops.
+        :return:
+        """
+        return np.array([self.mask >> x & 1 for x in range(0, self.side + 1)], dtype=np.uint8)
+
+    def get_values(self) -> np.array:
+        """
+        The purpose of this function is to get the eligible numbers. The array returned is shared and read only.
+        :return:
+        """
+        return MASK_VALUE_ARRAYS[self.mask]
+
+    def reset(self):
+        """
+        The purpose of this function is to make every number eligible again.
+        :return:
+        """
+        if self.trail is not None:
+            self.trail.append((self, self.mask))
+        self.mask = self.mask_all_true
+
+    def clear(self):
+        """
+        The purpose of this function is to make no number eligible.
+        :return:
+        """
+        if self.trail is not None:
+            self.trail.append((self, self.mask))
+        self.mask = self.mask_all_false
+
+    def set_value(self, set_value: np.uint8 = None):
+        """
+        The purpose of this function is to set the eligible numbers to a final value
+        :param set_value: np.uint8
+        :return: None
+        """
+        if self.trail is not None:
+            self.trail.append((self, self.mask))
+        self.mask = 1 << int(set_value)
+
+    def has_value(self, test_value: np.uint8 = None) -> bool:
+        """
+        The purpose of this function is to check if a number is still eligible.
+        :param test_value:
+        :return:
+        """
+        return bool(self.mask >> int(test_value) & 1)
+
+    def eliminate_value(self, to_eliminate: np.uint8 = None):
+        """
+        The purpose of this function is to provide a means to eliminate a value. Removing the last eligible value
+        raises SudokuContradiction and leaves the cell as it was.
+        :param to_eliminate:
+        :return:
+        """
+        remaining_mask = self.mask & ~(1 << int(to_eliminate))
+        if not remaining_mask:
+            raise SudokuContradiction('No eligible values would be left')
+
+        if self.trail is not None:
+            self.trail.append((self, self.mask))
+        self.mask = remaining_mask
+
+    def number_of_eligible_values(self) -> int:
+        return MASK_POPCOUNT[self.mask]
+
+    def eliminate_values(self, to_eliminate: typing.Iterable = None):
+        """
+        The purpose of this function is to provide a means to eliminate several values at once. Removing every
+        eligible value raises SudokuContradiction and leaves the cell as it was.
+        :param to_eliminate:
+        :return:
+        """
+        remaining_mask = self.mask & ~digits_to_mask(to_eliminate)
+        if not remaining_mask:
+            raise SudokuContradiction('No eligible values would be left')
+        if self.trail is not None:
+            self.trail.append((self, self.mask))
+        self.mask = remaining_mask
+
+    def get_correct_value(self) -> int:
+        """
+        The purpose of this function is to get the correct value, as determined by having an answer found flag be true
+        :return:
+        """
+        if self.answer_found():
+            return MASK_LOWEST_DIGIT[self.mask]
+        return 0
+
+    def answer_found(self) -> bool:
+        """
+        The purpose of this function is to determine if an answer has been found. If an answers found there will be
+        exactly one bit set.
+        :return:
+        """
+        mask = self.mask
+        return mask != 0 and mask & (mask - 1) == 0
+
+
+class WideEligibleBitmask(EligibleBitmask):
+    """
+    The purpose of this class is to store the eligible numbers of a cell on a board bigger than 9 x 9, 16 x 16 or
+    25 x 25. A python int has no width limit so the mask works the same way, but the 2 ** 26 possible masks of a
+    25 x 25 board are too many for lookup tables, so the counts and values are read from the bits instead.
+    Use create_eligible_bitmask_class to get the class for a box size, it sets side and mask_all_true.
+    """
+    __slots__ = ()
+
+    def get_values(self) -> np.array:
+        """
+        The purpose of this function is to get the eligible numbers, lowest first.
+        :return:
+        """
+        mask = self.mask
+        return np.array([x for x in range(1, self.side + 1) if mask >> x & 1], dtype=np.uint8)
+
+    def number_of_eligible_values(self) -> int:
+        return self.mask.bit_count()
+
+    def get_correct_value(self) -> int:
+        """
+        The purpose of this function is to get the correct value, as determined by having an answer found flag be true
+        :return:
+        """
+        if self.answer_found():
+            return self.mask.bit_length() - 1
+        return 0
+
+
+@lru_cache(maxsize=8)
+def create_eligible_bitmask_class(box_size: int = 3) -> type:
+    """
+    The purpose of this function is to create the bitmask class for a board of box_size x box_size parent squares,
+    EligibleBitmask itself for 9 x 9.
+    :param box_size: size of a parent square, 3 for 9 x 9, 4 for 16 x 16, 5 for 25 x 25
+    :return: class
+    """
+    if box_size == 3:
+        return EligibleBitmask
+    side = box_size * box_size
+    class_attributes = {'__slots__': (), 'side': side, 'mask_all_true': (1 << (side + 1)) - 2}
+    return type(f"EligibleBitmask{side}", (WideEligibleBitmask,), class_attributes)
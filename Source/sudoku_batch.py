@@ -0,0 +1,159 @@
+"""
+
+The purpose of this file is to solve many puzzles at once. The puzzles are stacked as an (N, 9, 9) uint8 array and the
+candidates for all of them are kept in one (N, 9, 9, 9) boolean array, so each propagation step is a handful of numpy
+operations for the whole batch instead of 81 python objects per puzzle.
+
+"""
+import typing
+
+import numpy as np
+
+from Source.sudoku_utilities import UNIT_INDEX, CELL_UNITS
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Per puzzle status codes returned with the batch solutions
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+STATUS_SOLVED = 1
+STATUS_STUCK = 2
+STATUS_CONTRADICTION = 3
+STATUS_NAMES = {STATUS_SOLVED: 'solved', STATUS_STUCK: 'stuck', STATUS_CONTRADICTION: 'contradiction'}
+
+digit_values = np.arange(1, 10, dtype=np.uint8)
+
+
+class BatchResult(typing.NamedTuple):
+    """
+    The purpose of this class is to hold the result of a batch solve.
+    solutions: (N, 9, 9) uint8 array, 0 where a cell is still unknown
+    status: (N,) uint8 array of STATUS_ codes
+    rounds: (N,) array of propagation rounds each puzzle took
+    """
+    solutions: np.ndarray
+    status: np.ndarray
+    rounds: np.ndarray
+
+    def status_names(self) -> list:
+        return [STATUS_NAMES[x] for x in self.status]
+
+
+def puzzles_to_candidates(puzzles: np.array = None) -> np.array:
+    """
+    The purpose of this function is to turn an (N, 9, 9) array of puzzles into an (N, 9, 9, 9) candidate array.
+    Empty cells, marked 0, get every number as a candidate.
+    :param puzzles: (N, 9, 9) uint8 array
+    :return: (N, 9, 9, 9) boolean array
+    """
+    puzzles = np.asarray(puzzles)
+    if puzzles.ndim == 2:
+        puzzles = puzzles[None]
+    if puzzles.ndim != 3 or puzzles.shape[1:] != (9, 9):
+        raise ValueError(f"Puzzles must be shaped (N, 9, 9), got {puzzles.shape}")
+    if puzzles.size and puzzles.max() > 9:
+        raise ValueError("Puzzle values must be 0 for empty or 1 through 9")
+    puzzles = puzzles.astype(np.uint8)
+    candidates = (puzzles[..., None] == digit_values) | (puzzles[..., None] == 0)
+    return candidates
+
+
+def candidates_to_values(candidates: np.array = None) -> np.array:
+    """
+    The purpose of this function is to turn candidates back into values, 0 for cells without exactly one candidate.
+    :param candidates: (N, 9, 9, 9) boolean array
+    :return: (N, 9, 9) uint8 array
+    """
+    solved = candidates.sum(axis=-1) == 1
+    values = np.where(solved, candidates.argmax(axis=-1) + 1, 0).astype(np.uint8)
+    return values
+
+
+def unit_totals(cell_values: np.array = None) -> np.array:
+    """
+    The purpose of this function is to add up an (M, 81, 9) array over the cells of each of the 27 units.
+    :return: (M, 27, 9) array
+    """
+    return cell_values[:, UNIT_INDEX].sum(axis=2)
+
+
+def cell_unit_any(unit_values: np.array = None) -> np.array:
+    """
+    The purpose of this function is to flag, for each cell, the numbers flagged in any of its 3 units.
+    :param unit_values: (M, 27, 9) boolean array
+    :return: (M, 81, 9) boolean array
+    """
+    return unit_values[:, CELL_UNITS].any(axis=2)
+
+
+def propagate_step(candidates: np.array = None) -> tuple:
+    """
+    The purpose of this function is to run one round of constraint propagation on a stack of boards.
+    Known values are removed from their row, column and parent square, and a number with only one place left in a
+    unit is placed there (hidden single).
+    :param candidates: (M, 9, 9, 9) boolean array
+    :return: new candidates and an (M,) boolean array flagging the boards that hit a contradiction
+    """
+    board_shape = candidates.shape
+    candidates = candidates.reshape(-1, 81, 9)
+    counts = candidates.sum(axis=2)
+    solved = counts == 1
+    known = candidates & solved[..., None]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # How many times each number is known in each row, column and parent square of every board
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    unit_known = unit_totals(known)
+    contradiction = (counts == 0).any(axis=1) | (unit_known > 1).any(axis=(1, 2))
+
+    seen = cell_unit_any(unit_known > 0)
+    candidates = candidates & ~(seen & ~solved[..., None])
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # Hidden singles. Count the places left for each number in each unit, a count of 0 means the
+    # unit can no longer hold that number.
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    unit_places = unit_totals(candidates)
+    contradiction |= (unit_places == 0).any(axis=(1, 2))
+
+    hidden = candidates & cell_unit_any(unit_places == 1)
+    hidden_count = hidden.sum(axis=2)
+    contradiction |= (hidden_count > 1).any(axis=1)
+    candidates = np.where((hidden_count == 1)[..., None], hidden, candidates)
+
+    return candidates.reshape(board_shape), contradiction
+
+
+def solve_batch(puzzles: np.array = None, max_rounds: int = 100) -> BatchResult:
+    """
+    The purpose of this function is to run constraint propagation over a batch of puzzles until each one converges.
+    Boards are dropped from the active set as soon as they are solved, stuck or found to be contradictory, so late
+    rounds only touch the boards that are still changing.
+    :param puzzles: (N, 9, 9) uint8 array, 0 for empty cells
+    :param max_rounds: safety cap on the number of propagation rounds
+    :return: BatchResult
+    """
+    candidates = puzzles_to_candidates(puzzles)
+    puzzle_count = candidates.shape[0]
+    status = np.full(puzzle_count, STATUS_STUCK, dtype=np.uint8)
+    rounds = np.zeros(puzzle_count, dtype=np.uint16)
+    active = np.arange(puzzle_count)
+
+    round_count = 0
+    while active.size and round_count < max_rounds:
+        round_count += 1
+        active_candidates = candidates[active]
+        new_candidates, contradiction = propagate_step(active_candidates)
+        changed = (new_candidates != active_candidates).any(axis=(1, 2, 3))
+        candidates[active] = new_candidates
+        rounds[active] = round_count
+
+        solved = (new_candidates.sum(axis=3) == 1).all(axis=(1, 2)) & ~contradiction
+        status[active[contradiction]] = STATUS_CONTRADICTION
+        status[active[solved & ~changed]] = STATUS_SOLVED
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Boards that did not change this round are converged, keep them out of later rounds
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        active = active[changed & ~contradiction]
+
+    solutions = candidates_to_values(candidates)
+    return BatchResult(solutions=solutions, status=status, rounds=rounds)
@@ -0,0 +1,225 @@
+"""
+
+The purpose of this file is to store the benchmark suite. It times the SudokuBoard building blocks and full solves on
+a bundled set of fixture puzzles at four difficulty tiers, reports per puzzle latency percentiles and throughput, and
+saves the results as JSON so a later run can be compared against it and regressions flagged.
+
+Usage: python -m Source.sudoku_benchmark --repeat 5 --output current.json --compare baseline.json
+
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from Source.sudoku_instrumentation import summarize_latencies
+from Source.sudoku_loader import puzzle_string_to_array
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_solver import SOLVE_METHODS, solve_puzzle
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Fixture puzzles, all with exactly one solution. 0 or . marks an empty cell.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+BENCHMARK_PUZZLES = {
+    'easy': (
+        "003020600900305001001806400008102900700000008006708200002609500800203009005010300",
+        "200080300060070084030500209000105408000000000402706000301007040720040060004010003",
+        "000000907000420180000705026100904000050000040000507009920108000034059000507000000",
+    ),
+    'medium': (
+        "030050040008010500460000012070502080000603000040109030250000098001020600080060020",
+        "020810740700003100090002805009040087400208003160030200302700060005600008076051090",
+        "100920000524010000000000070050008102000000000402700090060000000000030945000071006",
+    ),
+    'hard': (
+        "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+        "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+        "85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.",
+    ),
+    '17_clue': (
+        "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+        "000000012000035000000600070700000300000400800100000000000120000080000040050000600",
+        "000000012003600000000007000410020000000500300700000600280000040000300500000000000",
+    ),
+}
+
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+
+def load_benchmark_puzzles(tiers: list = None) -> dict:
+    """
+    The purpose of this function is to turn the fixture puzzles into arrays, grouped by tier.
+    :param tiers: tiers to load, all of them when None
+    :return: dict of tier name to list of 9 x 9 uint8 arrays
+    """
+    tiers = tiers or list(BENCHMARK_PUZZLES)
+    unknown_tiers = [x for x in tiers if x not in BENCHMARK_PUZZLES]
+    if unknown_tiers:
+        raise ValueError(f"Unknown benchmark tiers {unknown_tiers}, choose from {sorted(BENCHMARK_PUZZLES)}")
+    return {x: [puzzle_string_to_array(puzzle_string=y) for y in BENCHMARK_PUZZLES[x]] for x in tiers}
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Each component is split into a setup, which is not timed, and the timed call on what the setup returned.
+# The sweeps run on a board that already has the givens loaded, so only the sweep itself is measured.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def _empty_board(puzzle_array: np.array = None) -> tuple:
+    return SudokuBoard(start_board_array=np.zeros(shape=(9, 9), dtype=np.uint8)), puzzle_array
+
+
+def _loaded_board(puzzle_array: np.array = None) -> SudokuBoard:
+    return SudokuBoard(start_board_array=puzzle_array)
+
+
+BENCHMARK_COMPONENTS = {
+    'construct': (lambda x: x, lambda x: SudokuBoard(start_board_array=x)),
+    'update_board_array': (_empty_board, lambda x: x[0].update_board_array(external_update_board=x[1])),
+    'remove_known_neighbors': (_loaded_board, lambda x: x.remove_known_neighbors()),
+    'column_solve': (_loaded_board, lambda x: x.column_solve()),
+    'row_solve': (_loaded_board, lambda x: x.row_solve()),
+}
+for _solve_method in SOLVE_METHODS:
+    BENCHMARK_COMPONENTS[f"solve_{_solve_method}"] = (
+        lambda x: x, lambda x, _solve_method=_solve_method: solve_puzzle(puzzle_array=x, method=_solve_method))
+
+
+def time_component(component: str = None, puzzle_array: np.array = None, repeat: int = 3) -> float:
+    """
+    The purpose of this function is to time one component on one puzzle. The best of repeat runs is kept, which is
+    the least disturbed by whatever else the machine is doing.
+    :param component: key of BENCHMARK_COMPONENTS
+    :param puzzle_array: 9 x 9 uint8 array
+    :param repeat: number of timed runs
+    :return: seconds
+    """
+    setup, timed_call = BENCHMARK_COMPONENTS[component]
+    best_seconds = float('inf')
+    for _ in range(repeat):
+        prepared = setup(puzzle_array)
+        start_time = time.perf_counter()
+        timed_call(prepared)
+        best_seconds = min(best_seconds, time.perf_counter() - start_time)
+    return best_seconds
+
+
+def run_benchmarks(components: list = None, tiers: list = None, repeat: int = 3) -> dict:
+    """
+    The purpose of this function is to time every component on every fixture puzzle.
+    :param components: keys of BENCHMARK_COMPONENTS, all of them when None
+    :param tiers: keys of BENCHMARK_PUZZLES, all of them when None
+    :param repeat: timed runs per puzzle, the best one is kept
+    :return: dict with a metadata section and results[component][tier] summaries
+    """
+    components = components or list(BENCHMARK_COMPONENTS)
+    unknown_components = [x for x in components if x not in BENCHMARK_COMPONENTS]
+    if unknown_components:
+        raise ValueError(f"Unknown benchmark components {unknown_components}, "
+                         f"choose from {sorted(BENCHMARK_COMPONENTS)}")
+    tier_puzzles = load_benchmark_puzzles(tiers=tiers)
+
+    results = dict()
+    for component in components:
+        results[component] = dict()
+        for tier, puzzle_arrays in tier_puzzles.items():
+            latencies = [time_component(component=component, puzzle_array=x, repeat=repeat) for x in puzzle_arrays]
+            results[component][tier] = summarize_latencies(latencies=latencies)
+
+    metadata = {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+                'repeat': repeat, 'created': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    return {'metadata': metadata, 'results': results}
+
+
+def save_results(benchmark_results: dict = None, results_path: Path = None):
+    with open(results_path, 'w') as results_file:
+        json.dump(benchmark_results, results_file, indent=2)
+
+
+def load_results(results_path: Path = None) -> dict:
+    with open(results_path) as results_file:
+        return json.load(results_file)
+
+
+def compare_results(baseline: dict = None, current: dict = None, threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+                    metric: str = 'p50') -> list:
+    """
+    The purpose of this function is to compare two benchmark runs. Only the component and tier pairs found in both
+    runs are compared.
+    :param baseline: results of the reference run
+    :param current: results of the run being checked
+    :param threshold: relative slow down that counts as a regression, 0.10 is 10 percent
+    :param metric: latency summary to compare
+    :return: list of dicts with component, tier, baseline, current, change and a regression flag
+    """
+    comparisons = list()
+    for component, tier_summaries in current['results'].items():
+        for tier, summary in tier_summaries.items():
+            baseline_summary = baseline['results'].get(component, dict()).get(tier)
+            if baseline_summary is None:
+                continue
+            baseline_value = baseline_summary[metric]
+            current_value = summary[metric]
+            change = (current_value - baseline_value) / baseline_value if baseline_value else 0.0
+            comparisons.append({'component': component, 'tier': tier, 'baseline': baseline_value,
+                                'current': current_value, 'change': change, 'regression': change > threshold})
+    return comparisons
+
+
+def format_results(benchmark_results: dict = None) -> str:
+    """
+    The purpose of this function is to lay out the results as a table, latencies in milliseconds.
+    :param benchmark_results:
+    :return:
+    """
+    lines = [f"{'component':<24}{'tier':<10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'puzzles/s':>12}"]
+    for component, tier_summaries in benchmark_results['results'].items():
+        for tier, summary in tier_summaries.items():
+            lines.append(f"{component:<24}{tier:<10}{summary['p50'] * 1e3:>10.3f}{summary['p90'] * 1e3:>10.3f}"
+                         f"{summary['p99'] * 1e3:>10.3f}{summary['throughput']:>12.1f}")
+    return '\n'.join(lines)
+
+
+def format_comparisons(comparisons: list = None) -> str:
+    lines = list()
+    for comparison in comparisons:
+        flag = 'REGRESSION' if comparison['regression'] else ''
+        lines.append(f"{comparison['component']:<24}{comparison['tier']:<10}{comparison['change']:>+9.1%}  {flag}")
+    return '\n'.join(lines)
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(description="Time the solver components on the fixture puzzles.")
+    argument_parser.add_argument('-r', '--repeat', type=int, default=3, help="timed runs per puzzle, best is kept")
+    argument_parser.add_argument('-t', '--tiers', nargs='+', choices=list(BENCHMARK_PUZZLES), default=None)
+    argument_parser.add_argument('-k', '--components', nargs='+', choices=list(BENCHMARK_COMPONENTS), default=None)
+    argument_parser.add_argument('-o', '--output', type=Path, default=None, help="save the results as JSON")
+    argument_parser.add_argument('--compare', type=Path, default=None, help="baseline JSON to compare against")
+    argument_parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                                 help="relative p50 slow down flagged as a regression")
+    return argument_parser
+
+
+def main(argv: list = None) -> int:
+    arguments = create_argument_parser().parse_args(argv)
+    benchmark_results = run_benchmarks(components=arguments.components, tiers=arguments.tiers,
+                                       repeat=arguments.repeat)
+    print(format_results(benchmark_results=benchmark_results))
+    if arguments.output is not None:
+        save_results(benchmark_results=benchmark_results, results_path=arguments.output)
+    if arguments.compare is None:
+        return 0
+
+    comparisons = compare_results(baseline=load_results(results_path=arguments.compare), current=benchmark_results,
+                                  threshold=arguments.threshold)
+    print(format_comparisons(comparisons=comparisons))
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # A non zero exit status lets a CI job fail on a flagged regression
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    return 1 if any(x['regression'] for x in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+
+The purpose of this file is to store a solution cache that sits in front of the solvers. Puzzles that are the same up
+to digit relabelling, band and row permutations, stack and column permutations and transposition are brought to one
+canonical form, so a solution found once is reused for all of them.
+
+The canonical form orders bands, rows, stacks and columns by labels refined from clue counts and relabels digits in
+order of first appearance. Lines with equal invariants keep their input order, so a few isomorphic puzzles get different
+canonical forms and miss the cache. That only costs a solve: the transform to the canonical form is always inverted
+exactly, so a cached solution mapped back is always a solution of the puzzle asked for.
+
+"""
+import sqlite3
+import typing
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from Source.sudoku_solver import solve_puzzle
+
+band_rows = np.arange(9).reshape(3, 3)
+
+
+class CanonicalForm(typing.NamedTuple):
+    """
+    The purpose of this class is to hold a canonical grid and the transform that produced it.
+    grid = digit_map[(puzzle.T if transposed else puzzle)[row_order][:, column_order]]
+    """
+    grid: np.ndarray
+    row_order: np.ndarray
+    column_order: np.ndarray
+    transposed: bool
+    digit_map: np.ndarray
+
+    def key(self) -> bytes:
+        return self.grid.tobytes()
+
+    def to_original(self, canonical_grid: np.array = None) -> np.array:
+        """
+        The purpose of this function is to map a grid in canonical coordinates back to the puzzle's coordinates.
+        :param canonical_grid: 9 x 9 uint8 array, usually the cached solution of the canonical puzzle
+        :return: 9 x 9 uint8 array
+        """
+        inverse_digit_map = np.zeros(10, dtype=np.uint8)
+        inverse_digit_map[self.digit_map] = np.arange(10, dtype=np.uint8)
+        original_grid = np.empty(shape=(9, 9), dtype=np.uint8)
+        original_grid[np.ix_(self.row_order, self.column_order)] = inverse_digit_map[canonical_grid]
+        if self.transposed:
+            original_grid = original_grid.T.copy()
+        return original_grid
+
+
+def rank_signatures(signatures: list = None) -> list:
+    """
+    The purpose of this function is to replace each signature by its rank among the distinct signatures, which keeps
+    the labels small while staying independent of the input order.
+    :param signatures:
+    :return: list of ints
+    """
+    signature_ranks = {x: y for y, x in enumerate(sorted(set(signatures)))}
+    return [signature_ranks[x] for x in signatures]
+
+
+def refine_line_labels(grid: np.array = None, rounds: int = 3) -> tuple:
+    """
+    The purpose of this function is to label rows and columns with keys that do not change under any row, column or
+    digit permutation. Rows, columns, parent squares and digits start labelled by their clue counts, then each round
+    labels them again by the labels of the clues they hold.
+    :param grid: 9 x 9 uint8 array, 0 for empty cells
+    :param rounds: refinement rounds
+    :return: row labels, column labels, each a list of 9 ints
+    """
+    clue_rows, clue_columns = np.nonzero(grid)
+    clues = list(zip(clue_rows.tolist(), clue_columns.tolist(), grid[clue_rows, clue_columns].tolist(),
+                     ((clue_rows // 3) * 3 + clue_columns // 3).tolist()))
+    row_labels, column_labels, square_labels, digit_labels = [0] * 9, [0] * 9, [0] * 9, [0] * 10
+    for _ in range(rounds):
+        row_clues, column_clues, square_clues, digit_clues = ([list() for _ in range(x)] for x in (9, 9, 9, 10))
+        for clue_row, clue_column, clue_digit, clue_square in clues:
+            row_clues[clue_row].append((column_labels[clue_column], digit_labels[clue_digit],
+                                        square_labels[clue_square]))
+            column_clues[clue_column].append((row_labels[clue_row], digit_labels[clue_digit],
+                                              square_labels[clue_square]))
+            square_clues[clue_square].append((row_labels[clue_row], column_labels[clue_column],
+                                              digit_labels[clue_digit]))
+            digit_clues[clue_digit].append((row_labels[clue_row], column_labels[clue_column],
+                                            square_labels[clue_square]))
+        row_labels = rank_signatures([(-len(y), x, tuple(sorted(y))) for x, y in zip(row_labels, row_clues)])
+        column_labels = rank_signatures([(-len(y), x, tuple(sorted(y))) for x, y in zip(column_labels, column_clues)])
+        square_labels = rank_signatures([(-len(y), x, tuple(sorted(y))) for x, y in zip(square_labels, square_clues)])
+        digit_labels = rank_signatures([(-len(y), x, tuple(sorted(y))) for x, y in zip(digit_labels, digit_clues)])
+    return row_labels, column_labels
+
+
+def line_order(line_labels: list = None) -> np.array:
+    """
+    The purpose of this function is to order 9 lines (rows or columns) by their labels while keeping the 3 bands
+    together. Bands are ordered by the sorted labels of their lines, lines within a band by their own label. Equal
+    labels keep their input order.
+    :param line_labels: 9 ints from refine_line_labels
+    :return: (9,) array of line indexes, the first one becomes canonical line 0
+    """
+    band_orders = [sorted(x, key=lambda y: line_labels[y]) for x in band_rows.tolist()]
+    band_keys = [tuple(line_labels[y] for y in x) for x in band_orders]
+    ordered_bands = sorted(range(3), key=lambda x: band_keys[x])
+    return np.array([y for x in ordered_bands for y in band_orders[x]], dtype=np.intp)
+
+
+def relabel_digits(grid: np.array = None) -> np.array:
+    """
+    The purpose of this function is to number the digits of a grid in order of first appearance, reading row by row.
+    Digits that do not appear take the labels left over, in increasing order.
+    :param grid: 9 x 9 uint8 array
+    :return: (10,) uint8 array mapping each original digit to its new label, 0 stays 0
+    """
+    cell_values = grid.ravel()
+    given_values = cell_values[cell_values > 0]
+    _, first_positions = np.unique(given_values, return_index=True)
+    seen_digits = given_values[np.sort(first_positions)]
+    unseen_digits = np.setdiff1d(np.arange(1, 10, dtype=np.uint8), seen_digits)
+    digit_map = np.zeros(10, dtype=np.uint8)
+    digit_map[np.concatenate((seen_digits, unseen_digits)).astype(np.intp)] = np.arange(1, 10, dtype=np.uint8)
+    return digit_map
+
+
+def canonicalize(puzzle_array: np.array = None) -> CanonicalForm:
+    """
+    The purpose of this function is to bring a puzzle to its canonical form. The puzzle and its transpose are both
+    ordered and relabelled, and the one with the smaller bytes is kept.
+    :param puzzle_array: 9 x 9 array, 0 for empty cells
+    :return: CanonicalForm
+    """
+    puzzle_array = np.asarray(puzzle_array, dtype=np.uint8)
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # The labelling treats rows and columns the same way, so the transpose just swaps the two label lists
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    line_labels = refine_line_labels(grid=puzzle_array)
+    best_form = None
+    for transposed in (False, True):
+        oriented = puzzle_array.T if transposed else puzzle_array
+        row_labels, column_labels = line_labels[::-1] if transposed else line_labels
+        row_order = line_order(line_labels=row_labels)
+        column_order = line_order(line_labels=column_labels)
+        ordered = oriented[np.ix_(row_order, column_order)]
+        digit_map = relabel_digits(grid=ordered)
+        canonical_form = CanonicalForm(grid=digit_map[ordered], row_order=row_order, column_order=column_order,
+                                       transposed=transposed, digit_map=digit_map)
+        if best_form is None or canonical_form.key() < best_form.key():
+            best_form = canonical_form
+    return best_form
+
+
+class CacheStats(typing.NamedTuple):
+    """
+    The purpose of this class is to hold the hit and miss counts of a SolutionCache.
+    exact_hits: the same puzzle was seen before, no canonical form needed
+    hits: an isomorphic puzzle was found in memory
+    disk_hits: an isomorphic puzzle was found in the on-disk store
+    """
+    exact_hits: int
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        found = self.exact_hits + self.hits + self.disk_hits
+        lookups = found + self.misses
+        return found / lookups if lookups else 0.0
+
+
+class SolutionCache:
+    """
+    The purpose of this class is to keep the solutions of canonical puzzles in a bounded least recently used map,
+    optionally backed by an SQLite file that survives restarts. A second map of the same size keys solutions by the
+    exact puzzle, so a repeated puzzle skips the canonical form altogether.
+    """
+
+    def __init__(self, max_entries: int = 100_000, store_path: Path = None):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.exact_entries = OrderedDict()
+        self.exact_hits = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.store = None
+        if store_path is not None:
+            self.store = sqlite3.connect(str(store_path))
+            self.store.execute("CREATE TABLE IF NOT EXISTS solutions (canonical BLOB PRIMARY KEY, solution BLOB)")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(exact_hits=self.exact_hits, hits=self.hits, disk_hits=self.disk_hits, misses=self.misses,
+                          evictions=self.evictions, entries=len(self.entries))
+
+    def _remember(self, canonical_key: bytes = None, canonical_solution: bytes = None):
+        self.entries[canonical_key] = canonical_solution
+        self.entries.move_to_end(canonical_key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _remember_exact(self, puzzle_key: bytes = None, solution: np.array = None):
+        self.exact_entries[puzzle_key] = solution
+        self.exact_entries.move_to_end(puzzle_key)
+        while len(self.exact_entries) > self.max_entries:
+            self.exact_entries.popitem(last=False)
+
+    def _lookup(self, canonical_key: bytes = None) -> bytes | None:
+        canonical_solution = self.entries.get(canonical_key)
+        if canonical_solution is not None:
+            self.entries.move_to_end(canonical_key)
+            self.hits += 1
+            return canonical_solution
+        if self.store is not None:
+            store_row = self.store.execute("SELECT solution FROM solutions WHERE canonical = ?",
+                                           (canonical_key,)).fetchone()
+            if store_row is not None:
+                self.disk_hits += 1
+                self._remember(canonical_key=canonical_key, canonical_solution=store_row[0])
+                return store_row[0]
+        self.misses += 1
+        return None
+
+    def _find(self, puzzle_array: np.array = None) -> tuple:
+        """
+        The purpose of this function is to look a puzzle up, first by its exact bytes and then by its canonical form.
+        :param puzzle_array: 9 x 9 array, 0 for empty cells
+        :return: solution or None, and the canonical form when one had to be computed
+        """
+        puzzle_array = np.asarray(puzzle_array, dtype=np.uint8)
+        puzzle_key = puzzle_array.tobytes()
+        solution = self.exact_entries.get(puzzle_key)
+        if solution is not None:
+            self.exact_entries.move_to_end(puzzle_key)
+            self.exact_hits += 1
+            return solution.copy(), None
+
+        canonical_form = canonicalize(puzzle_array=puzzle_array)
+        canonical_solution = self._lookup(canonical_key=canonical_form.key())
+        if canonical_solution is None:
+            return None, canonical_form
+        solution = canonical_form.to_original(
+            canonical_grid=np.frombuffer(canonical_solution, dtype=np.uint8).reshape(9, 9))
+        self._remember_exact(puzzle_key=puzzle_key, solution=solution)
+        return solution.copy(), canonical_form
+
+    def get(self, puzzle_array: np.array = None) -> np.array:
+        """
+        The purpose of this function is to look up the solution of a puzzle or of any puzzle with the same canonical
+        form.
+        :param puzzle_array: 9 x 9 array, 0 for empty cells
+        :return: 9 x 9 uint8 solution, or None on a miss
+        """
+        solution, _ = self._find(puzzle_array=puzzle_array)
+        return solution
+
+    def put(self, puzzle_array: np.array = None, solution: np.array = None, canonical_form: CanonicalForm = None):
+        """
+        The purpose of this function is to store the solution of a puzzle under the puzzle's canonical form.
+        :param puzzle_array: 9 x 9 array, 0 for empty cells
+        :param solution: 9 x 9 solution of puzzle_array
+        :param canonical_form: canonical form of puzzle_array when already computed
+        :return:
+        """
+        puzzle_array = np.asarray(puzzle_array, dtype=np.uint8)
+        if canonical_form is None:
+            canonical_form = canonicalize(puzzle_array=puzzle_array)
+        solution = np.array(solution, dtype=np.uint8)
+        oriented = solution.T if canonical_form.transposed else solution
+        canonical_solution = canonical_form.digit_map[oriented[np.ix_(canonical_form.row_order,
+                                                                      canonical_form.column_order)]]
+        canonical_key = canonical_form.key()
+        self._remember(canonical_key=canonical_key, canonical_solution=canonical_solution.tobytes())
+        self._remember_exact(puzzle_key=puzzle_array.tobytes(), solution=solution)
+        if self.store is not None:
+            with self.store:
+                self.store.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?)",
+                                   (canonical_key, canonical_solution.tobytes()))
+
+    def solve(self, puzzle_array: np.array = None, method: str = 'search') -> np.array:
+        """
+        The purpose of this function is to answer from the cache and only run the solver on a miss.
+        :param puzzle_array: 9 x 9 array, 0 for empty cells
+        :param method: name of the solver, a key of SOLVE_METHODS
+        :return: 9 x 9 uint8 solution, or None when the puzzle has no solution
+        """
+        solution, canonical_form = self._find(puzzle_array=puzzle_array)
+        if solution is not None:
+            return solution
+
+        solution = solve_puzzle(puzzle_array=puzzle_array, method=method)
+        if solution is not None:
+            self.put(puzzle_array=puzzle_array, solution=solution, canonical_form=canonical_form)
+        return solution
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
@@ -0,0 +1,124 @@
+"""
+
+The purpose of this file is to store the command line entry point that solves a whole puzzle corpus across a pool of
+worker processes.
+
+Usage: python -m Source.sudoku_cli corpus.txt --workers 8 --output solutions.csv
+
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from Source.sudoku_loader import stream_puzzles
+from Source.sudoku_solver import SOLVE_METHODS, solve_puzzle_chunk
+
+
+# Cell value to the byte written for it, a puzzle cell the loader could not read shows as '?'
+digit_byte_lookup = np.full(256, ord('?'), dtype=np.uint8)
+digit_byte_lookup[:10] = np.arange(ord('0'), ord('9') + 1, dtype=np.uint8)
+
+
+def format_solution_lines(puzzles: np.array = None, solutions: np.array = None) -> bytes:
+    """
+    The purpose of this function is to turn k puzzles and their solutions into k lines of 81 puzzle digits, a comma
+    and 81 solution digits, so every solution can be matched to its puzzle. A puzzle with no solution gets 81 zeros.
+    :param puzzles: (k, 9, 9) array
+    :param solutions: (k, 9, 9) array
+    :return:
+    """
+    puzzle_bytes = digit_byte_lookup[puzzles.reshape(-1, 81)]
+    solution_bytes = digit_byte_lookup[solutions.reshape(-1, 81)]
+    comma_bytes = np.full((len(puzzle_bytes), 1), ord(','), dtype=np.uint8)
+    newline_bytes = np.full((len(puzzle_bytes), 1), ord('\n'), dtype=np.uint8)
+    return np.concatenate([puzzle_bytes, comma_bytes, solution_bytes, newline_bytes], axis=1).tobytes()
+
+
+def write_solution_chunk(output_stream=None, puzzle_chunk: np.array = None, solutions: np.array = None) -> int:
+    """
+    The purpose of this function is to write the lines of one solved chunk.
+    :param output_stream: binary stream
+    :param puzzle_chunk: (k, 9, 9) array
+    :param solutions: (k, 9, 9) array, all 0 for a puzzle with no solution
+    :return: number of puzzles of the chunk that were solved
+    """
+    output_stream.write(format_solution_lines(puzzles=puzzle_chunk, solutions=solutions))
+    return int(solutions.reshape(len(solutions), -1).all(axis=1).sum())
+
+
+def solve_corpus(corpus_path: Path = None, output_stream=None, workers: int = None, chunk_size: int = 512,
+                 method: str = 'search') -> tuple:
+    """
+    The purpose of this function is to solve every puzzle in a corpus across a process pool and write one
+    puzzle,solution line per puzzle in input order. Only a small window of chunks is in flight at a time, so the
+    corpus is never loaded whole.
+    :param corpus_path: line based puzzle file
+    :param output_stream: binary stream the lines are written to
+    :param workers: number of worker processes, all cores when None
+    :param chunk_size: puzzles per work unit
+    :param method: name of the solver, a key of SOLVE_METHODS
+    :return: number of puzzles, number of puzzles solved
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_worker = partial(solve_puzzle_chunk, method=method)
+    puzzle_count = 0
+    solved_count = 0
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for puzzle_chunk in stream_puzzles(puzzle_path=corpus_path, chunk_size=chunk_size):
+            in_flight.append((puzzle_chunk, executor.submit(chunk_worker, puzzle_chunk)))
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # Keep two chunks per worker queued, write the oldest one as soon as the window is full
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            if len(in_flight) >= workers * 2:
+                done_chunk, chunk_future = in_flight.popleft()
+                solved_count += write_solution_chunk(output_stream=output_stream, puzzle_chunk=done_chunk,
+                                                     solutions=chunk_future.result())
+                puzzle_count += len(done_chunk)
+        while in_flight:
+            done_chunk, chunk_future = in_flight.popleft()
+            solved_count += write_solution_chunk(output_stream=output_stream, puzzle_chunk=done_chunk,
+                                                 solutions=chunk_future.result())
+            puzzle_count += len(done_chunk)
+    return puzzle_count, solved_count
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(description="Solve a line based sudoku corpus across processes.")
+    argument_parser.add_argument('corpus', type=Path, help="text or CSV file with one 81 character puzzle per line")
+    argument_parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes, default all cores")
+    argument_parser.add_argument('-c', '--chunk-size', type=int, default=512, help="puzzles per work unit")
+    argument_parser.add_argument('-o', '--output', type=Path, default=None, help="puzzle,solution file, default stdout")
+    argument_parser.add_argument('-m', '--method', choices=sorted(SOLVE_METHODS), default='search')
+    return argument_parser
+
+
+def main(argv: list = None) -> int:
+    arguments = create_argument_parser().parse_args(argv)
+    start_time = time.perf_counter()
+    if arguments.output is None:
+        puzzle_count, solved_count = solve_corpus(corpus_path=arguments.corpus, output_stream=sys.stdout.buffer,
+                                                  workers=arguments.workers, chunk_size=arguments.chunk_size,
+                                                  method=arguments.method)
+        sys.stdout.flush()
+    else:
+        with open(arguments.output, 'wb') as output_stream:
+            puzzle_count, solved_count = solve_corpus(corpus_path=arguments.corpus, output_stream=output_stream,
+                                                      workers=arguments.workers, chunk_size=arguments.chunk_size,
+                                                      method=arguments.method)
+    elapsed = time.perf_counter() - start_time
+    throughput = puzzle_count / elapsed if elapsed else 0.0
+    print(f"Solved {solved_count} of {puzzle_count} puzzles in {elapsed:.2f}s ({throughput:.1f} puzzles/sec)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
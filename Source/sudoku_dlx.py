@@ -0,0 +1,235 @@
+"""
+
+The purpose of this file is to store an exact cover solver for sudoku using Knuth's Algorithm X with Dancing Links.
+Each of the 729 candidates (row, column, number) is a row of the cover matrix and covers 4 of the 324 constraints:
+the cell is filled, the row has the number, the column has the number and the parent square has the number.
+
+The links are kept in flat python lists indexed by node number rather than node objects, node 0 is the root header
+and nodes 1..324 are the constraint column headers.
+
+"""
+import numpy as np
+
+CONSTRAINT_COUNT = 324
+CANDIDATE_COUNT = 729
+
+
+def candidate_constraints(row: int = None, column: int = None, number: int = None) -> tuple:
+    """
+    The purpose of this function is to list the 4 constraint columns (1 based) covered by placing number at row, column
+    :param row: 0..8
+    :param column: 0..8
+    :param number: 1..9
+    :return: tuple of 4 ints
+    """
+    box = (row // 3) * 3 + column // 3
+    digit = number - 1
+    return (1 + row * 9 + column,
+            1 + 81 + row * 9 + digit,
+            1 + 162 + column * 9 + digit,
+            1 + 243 + box * 9 + digit)
+
+
+class DancingLinksSolver:
+    """
+    The purpose of this class is to solve a 9 x 9 puzzle array as an exact cover problem.
+    """
+
+    def __init__(self, start_board_array: np.array = None):
+        self.start_board_array = np.asarray(start_board_array, dtype=np.uint8)
+        self.nodes_visited = 0
+
+    def _build_links(self):
+        """
+        The purpose of this function is to build the toroidal linked lists for the full 729 x 324 cover matrix.
+        :return:
+        """
+        header_count = CONSTRAINT_COUNT + 1
+        self.left = list(range(-1, header_count - 1))
+        self.right = list(range(1, header_count + 1))
+        self.left[0] = CONSTRAINT_COUNT
+        self.right[CONSTRAINT_COUNT] = 0
+        self.up = list(range(header_count))
+        self.down = list(range(header_count))
+        self.column_of = list(range(header_count))
+        self.candidate_of = [-1] * header_count
+        self.size = [0] * header_count
+        self.candidate_first_node = [0] * CANDIDATE_COUNT
+
+        for candidate in range(CANDIDATE_COUNT):
+            row, rest = divmod(candidate, 81)
+            column, digit = divmod(rest, 9)
+            first_node = len(self.column_of)
+            self.candidate_first_node[candidate] = first_node
+            for offset, constraint in enumerate(candidate_constraints(row=row, column=column, number=digit + 1)):
+                node = first_node + offset
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                # Link the node in at the bottom of its constraint column
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                self.column_of.append(constraint)
+                self.candidate_of.append(candidate)
+                self.up.append(self.up[constraint])
+                self.down.append(constraint)
+                self.down[self.up[constraint]] = node
+                self.up[constraint] = node
+                self.size[constraint] += 1
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                # Link the 4 nodes of the candidate into a ring
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                self.left.append(first_node + (offset - 1) % 4)
+                self.right.append(first_node + (offset + 1) % 4)
+
+    def cover(self, column: int = None):
+        """
+        The purpose of this function is to remove a constraint column and every candidate that satisfies it.
+        :param column:
+        :return:
+        """
+        left, right, up, down, column_of, size = self.left, self.right, self.up, self.down, self.column_of, self.size
+        right[left[column]] = right[column]
+        left[right[column]] = left[column]
+        row_node = down[column]
+        while row_node != column:
+            node = right[row_node]
+            while node != row_node:
+                down[up[node]] = down[node]
+                up[down[node]] = up[node]
+                size[column_of[node]] -= 1
+                node = right[node]
+            row_node = down[row_node]
+
+    def uncover(self, column: int = None):
+        """
+        The purpose of this function is to put back a column removed by cover, in exactly the reverse order.
+        :param column:
+        :return:
+        """
+        left, right, up, down, column_of, size = self.left, self.right, self.up, self.down, self.column_of, self.size
+        row_node = up[column]
+        while row_node != column:
+            node = left[row_node]
+            while node != row_node:
+                size[column_of[node]] += 1
+                down[up[node]] = node
+                up[down[node]] = node
+                node = left[node]
+            row_node = up[row_node]
+        right[left[column]] = column
+        left[right[column]] = column
+
+    def select_candidate(self, candidate: int = None) -> bool:
+        """
+        The purpose of this function is to commit to a candidate by covering its 4 constraint columns, used for the
+        given values of the puzzle.
+        :param candidate: 0..728
+        :return: False when one of the constraints is already covered, meaning the givens clash
+        """
+        first_node = self.candidate_first_node[candidate]
+        columns = [self.column_of[first_node + x] for x in range(4)]
+        for column in columns:
+            if self.left[self.right[column]] != column:
+                return False
+        for column in columns:
+            self.cover(column=column)
+        return True
+
+    def _search(self, partial: list = None, solutions: list = None, limit: int = None):
+        """
+        The purpose of this function is to run Algorithm X, always branching on the column with the fewest candidates.
+        :param partial: candidates chosen so far
+        :param solutions: collector for complete lists of candidates
+        :param limit: stop once this many solutions are found, None to find every solution
+        :return:
+        """
+        self.nodes_visited += 1
+        right, down, size = self.right, self.down, self.size
+        if right[0] == 0:
+            solutions.append(list(partial))
+            return
+
+        column = right[0]
+        best_column = column
+        best_size = size[column]
+        while column != 0 and best_size > 1:
+            if size[column] < best_size:
+                best_column = column
+                best_size = size[column]
+            column = right[column]
+        if best_size == 0:
+            return
+
+        self.cover(column=best_column)
+        row_node = down[best_column]
+        while row_node != best_column:
+            partial.append(self.candidate_of[row_node])
+            node = right[row_node]
+            while node != row_node:
+                self.cover(column=self.column_of[node])
+                node = right[node]
+
+            self._search(partial=partial, solutions=solutions, limit=limit)
+
+            node = self.left[row_node]
+            while node != row_node:
+                self.uncover(column=self.column_of[node])
+                node = self.left[node]
+            partial.pop()
+            if limit is not None and len(solutions) >= limit:
+                break
+            row_node = down[row_node]
+        self.uncover(column=best_column)
+
+    def solve_all(self, limit: int = 1) -> list:
+        """
+        The purpose of this function is to find up to limit solutions of the puzzle.
+        :param limit: maximum number of solutions to look for, None for every solution
+        :return: list of 9 x 9 uint8 arrays
+        """
+        self._build_links()
+        self.nodes_visited = 0
+        given_candidates = list()
+        for row, column in zip(*np.nonzero(self.start_board_array)):
+            number = int(self.start_board_array[row, column])
+            if number > 9:
+                raise ValueError("Puzzle values must be 0 for empty or 1 through 9")
+            candidate = int(row) * 81 + int(column) * 9 + number - 1
+            if not self.select_candidate(candidate=candidate):
+                return list()
+            given_candidates.append(candidate)
+
+        solutions = list()
+        self._search(partial=given_candidates, solutions=solutions, limit=limit)
+        return [self.candidates_to_grid(candidates=x) for x in solutions]
+
+    @staticmethod
+    def candidates_to_grid(candidates: list = None) -> np.array:
+        """
+        The purpose of this function is to turn a list of chosen candidates into a 9 x 9 uint8 grid.
+        :param candidates:
+        :return:
+        """
+        grid = np.zeros(shape=(9, 9), dtype=np.uint8)
+        for candidate in candidates:
+            row, rest = divmod(candidate, 81)
+            column, digit = divmod(rest, 9)
+            grid[row, column] = digit + 1
+        return grid
+
+    def solve(self) -> np.array:
+        """
+        The purpose of this function is to find one solution of the puzzle.
+        :return: 9 x 9 uint8 array, or None when the puzzle has no solution
+        """
+        solutions = self.solve_all(limit=1)
+        if not solutions:
+            return None
+        return solutions[0]
+
+
+def dlx_solve(start_board_array: np.array = None) -> np.array:
+    """
+    The purpose of this function is to solve a 9 x 9 puzzle array with Dancing Links.
+    :param start_board_array: 9 x 9 uint8 array, 0 for empty cells
+    :return: 9 x 9 uint8 array, or None when the puzzle has no solution
+    """
+    return DancingLinksSolver(start_board_array=start_board_array).solve()
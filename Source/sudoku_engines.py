@@ -0,0 +1,31 @@
+"""
+
+The purpose of this file is to store the list of board engines so callers can pick one by name.
+
+"""
+import numpy as np
+
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_tensor import SudokuTensorBoard
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# object is the original board of 81 SudokuCell objects, tensor is the single (9, 9, 9) array board
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+BOARD_ENGINES = {
+    'object': SudokuBoard,
+    'tensor': SudokuTensorBoard,
+}
+
+
+def create_board(start_board_array: np.array = None, engine: str = 'object'):
+    """
+    The purpose of this function is to create a board with the chosen engine.
+    :param start_board_array: 9 x 9 uint8 array, 0 for empty cells
+    :param engine: name of the engine, a key of BOARD_ENGINES
+    :return: SudokuBoard or SudokuTensorBoard
+    """
+    try:
+        board_class = BOARD_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown board engine {engine}, choose from {sorted(BOARD_ENGINES)}") from None
+    return board_class(start_board_array=start_board_array)
@@ -0,0 +1,324 @@
+"""
+
+The purpose of this file is to store the puzzle generator. A random full grid is made by searching an empty board with
+the guesses in random order, then clues are removed one symmetry group at a time, each removal kept only when the
+puzzle still has a single solution.
+
+Every uniqueness check reuses the same SudokuBoard, PropagationQueue and BacktrackingSearch. The board is checkpointed
+while empty and rolled back before each check, so a check costs the givens and the search, not a new board.
+
+Usage: python -m Source.sudoku_generator -n 100 --seed 7 --symmetry rotational --clues 26 --output puzzles.txt
+
+"""
+import argparse
+import os
+import sys
+import time
+import typing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+
+import numpy as np
+
+from Source.sudoku_loader import write_packed_puzzles
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_propagation import PropagationQueue
+from Source.sudoku_search import BacktrackingSearch
+
+
+class GeneratedPuzzle(typing.NamedTuple):
+    """
+    The purpose of this class is to hold one generated puzzle.
+    puzzle: side x side uint8 array, 0 for empty cells
+    solution: the only solution of the puzzle
+    clues: number of given cells
+    seed: seed that reproduces the puzzle with the same generator options
+    checks: uniqueness searches run while removing clues
+    elapsed: seconds taken
+    """
+    puzzle: np.ndarray
+    solution: np.ndarray
+    clues: int
+    seed: int
+    checks: int
+    elapsed: float
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Each symmetry maps a cell (row, column) to its partner on a board of the given side. Cells are removed together with
+# all their partners so the finished puzzle keeps the symmetry.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+SYMMETRIES = {
+    'none': lambda row, column, side: (row, column),
+    'rotational': lambda row, column, side: (side - 1 - row, side - 1 - column),
+    'horizontal': lambda row, column, side: (side - 1 - row, column),
+    'vertical': lambda row, column, side: (row, side - 1 - column),
+    'diagonal': lambda row, column, side: (column, row),
+}
+
+
+@lru_cache(maxsize=16)
+def create_symmetry_groups(box_size: int = 3, symmetry: str = 'none') -> tuple:
+    """
+    The purpose of this function is to split the cells into the groups that are removed together under a symmetry.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :param symmetry: key of SYMMETRIES
+    :return: tuple of tuples of cell ids, every cell in exactly one group
+    """
+    try:
+        partner = SYMMETRIES[symmetry]
+    except KeyError:
+        raise ValueError(f"Unknown symmetry {symmetry}, choose from {sorted(SYMMETRIES)}") from None
+    side = box_size * box_size
+    grouped = set()
+    symmetry_groups = list()
+    for cell_id in range(side * side):
+        if cell_id in grouped:
+            continue
+        partner_row, partner_column = partner(cell_id // side, cell_id % side, side)
+        symmetry_group = tuple(sorted({cell_id, partner_row * side + partner_column}))
+        grouped.update(symmetry_group)
+        symmetry_groups.append(symmetry_group)
+    return tuple(symmetry_groups)
+
+
+class PuzzleGenerator:
+    """
+    The purpose of this class is to generate puzzles with a unique solution. One generator holds one board for its
+    whole life, so it is meant to be kept and reused for many puzzles.
+    """
+
+    def __init__(self, box_size: int = 3, symmetry: str = 'none'):
+        self.box_size = box_size
+        self.side = box_size * box_size
+        self.symmetry_groups = create_symmetry_groups(box_size=box_size, symmetry=symmetry)
+        self.symmetry = symmetry
+        self.sudoku_board = SudokuBoard(start_board_array=np.zeros(shape=(self.side, self.side), dtype=np.uint8))
+        self.candidates = self.sudoku_board.candidates
+        self.propagation_queue = PropagationQueue(sudoku_board=self.sudoku_board)
+        self.backtracking_search = BacktrackingSearch()
+        self.empty_checkpoint = self.sudoku_board.checkpoint()
+        self.checks = 0
+
+    def reset_board(self):
+        """
+        The purpose of this function is to put the board back to empty with the queue idle.
+        :return:
+        """
+        self.sudoku_board.rollback(checkpoint=self.empty_checkpoint)
+        self.propagation_queue.clear()
+        self.propagation_queue.recount()
+
+    def full_grid(self, rng: np.random.Generator = None) -> np.array:
+        """
+        The purpose of this function is to make a random full grid. The parent squares on the diagonal do not see
+        each other, so they are filled with random permutations straight away and the search fills the rest with its
+        guesses in random order.
+        :param rng: numpy random generator
+        :return: side x side uint8 array
+        """
+        self.reset_board()
+        box_size = self.box_size
+        for corner in range(0, self.side, box_size):
+            square_values = rng.permutation(np.arange(1, self.side + 1))
+            for value_position, value in enumerate(square_values.tolist()):
+                cell_id = (corner + value_position // box_size) * self.side + corner + value_position % box_size
+                self.propagation_queue.assign_value(cell_index=cell_id, value=value)
+
+        self.backtracking_search.value_order = rng.permutation
+        if not self.backtracking_search.search_board(sudoku_board=self.sudoku_board,
+                                                     propagation_queue=self.propagation_queue):
+            raise ValueError("The diagonal parent squares could not be completed to a full grid")
+        grid = self.sudoku_board.get_value_array()
+        self.backtracking_search.value_order = None
+        return grid
+
+    def has_other_solution(self, puzzle_array: np.array = None, cell_id: int = None, value: int = None) -> bool:
+        """
+        The purpose of this function is to check if the puzzle has a solution with something other than value in the
+        cell cell_id. The value is removed from the cell's eligible numbers and the search only has to find any
+        solution, which is quicker than counting solutions.
+        :param puzzle_array: side x side uint8 array, 0 for empty cells
+        :param cell_id: row * side + column of an empty cell
+        :param value: value of the cell in the known solution
+        :return:
+        """
+        self.checks += 1
+        self.reset_board()
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # The cells are set directly and the queue counts them once, rather than updating its counters per given
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        for given_id in np.flatnonzero(puzzle_array).tolist():
+            self.candidates[given_id].set_value(set_value=int(puzzle_array.flat[given_id]))
+        self.candidates[cell_id].eliminate_value(to_eliminate=value)
+        self.propagation_queue.recount()
+        self.propagation_queue.push_known_cells()
+        return self.backtracking_search.search_board(sudoku_board=self.sudoku_board,
+                                                     propagation_queue=self.propagation_queue)
+
+    def remove_clues(self, solution_grid: np.array = None, rng: np.random.Generator = None,
+                     target_clues: int = None) -> np.array:
+        """
+        The purpose of this function is to remove clues from a full grid, one symmetry group at a time in random
+        order, keeping only the removals that leave a single solution. The solution was unique before a removal, so
+        a second solution has to differ in one of the removed cells, and one has_other_solution check per removed
+        cell settles it.
+        :param solution_grid: full side x side grid
+        :param rng: numpy random generator
+        :param target_clues: stop once the puzzle has this many clues or fewer, None removes as many as possible
+        :return: puzzle array
+        """
+        puzzle_array = solution_grid.copy()
+        clues = puzzle_array.size
+        for group_position in rng.permutation(len(self.symmetry_groups)).tolist():
+            if target_clues is not None and clues <= target_clues:
+                break
+            symmetry_group = self.symmetry_groups[group_position]
+            puzzle_array.flat[list(symmetry_group)] = 0
+            if any(self.has_other_solution(puzzle_array=puzzle_array, cell_id=x, value=int(solution_grid.flat[x]))
+                   for x in symmetry_group):
+                puzzle_array.flat[list(symmetry_group)] = solution_grid.flat[list(symmetry_group)]
+            else:
+                clues -= len(symmetry_group)
+        return puzzle_array
+
+    def generate(self, seed: int = None, target_clues: int = None, max_attempts: int = 1) -> GeneratedPuzzle:
+        """
+        The purpose of this function is to generate one puzzle. When a target clue count is given and a grid cannot
+        be brought down to it, a new grid is tried, up to max_attempts grids, and the puzzle with the fewest clues is
+        kept.
+        :param seed: seed of the random generator, the same seed and options give the same puzzle
+        :param target_clues: wanted number of clues, None for a minimal puzzle
+        :param max_attempts: full grids to try for the target
+        :return: GeneratedPuzzle
+        """
+        start_time = time.perf_counter()
+        self.checks = 0
+        rng = np.random.default_rng(seed)
+        best_puzzle = None
+        best_solution = None
+        for _ in range(max_attempts):
+            solution_grid = self.full_grid(rng=rng)
+            puzzle_array = self.remove_clues(solution_grid=solution_grid, rng=rng, target_clues=target_clues)
+            if best_puzzle is None or np.count_nonzero(puzzle_array) < np.count_nonzero(best_puzzle):
+                best_puzzle, best_solution = puzzle_array, solution_grid
+            if target_clues is None or np.count_nonzero(best_puzzle) <= target_clues:
+                break
+        return GeneratedPuzzle(puzzle=best_puzzle, solution=best_solution, clues=int(np.count_nonzero(best_puzzle)),
+                               seed=seed, checks=self.checks, elapsed=time.perf_counter() - start_time)
+
+
+@lru_cache(maxsize=4)
+def get_puzzle_generator(box_size: int = 3, symmetry: str = 'none') -> PuzzleGenerator:
+    """
+    The purpose of this function is to keep one generator per process and options, so a worker builds its board once
+    and reuses it for every chunk it is handed.
+    :param box_size:
+    :param symmetry:
+    :return: PuzzleGenerator
+    """
+    return PuzzleGenerator(box_size=box_size, symmetry=symmetry)
+
+
+def generate_puzzle_chunk(seeds: list = None, box_size: int = 3, symmetry: str = 'none', target_clues: int = None,
+                          max_attempts: int = 1) -> list:
+    """
+    The purpose of this function is to generate one puzzle per seed, used as the work unit of generate_puzzles.
+    :param seeds: list of int seeds
+    :return: list of GeneratedPuzzle
+    """
+    puzzle_generator = get_puzzle_generator(box_size=box_size, symmetry=symmetry)
+    return [puzzle_generator.generate(seed=x, target_clues=target_clues, max_attempts=max_attempts) for x in seeds]
+
+
+def create_puzzle_seeds(count: int = None, seed: int = None) -> list:
+    """
+    The purpose of this function is to derive one seed per puzzle from a master seed, so the puzzles do not depend on
+    how they are spread over the workers.
+    :param count: number of puzzles
+    :param seed: master seed, None for fresh entropy
+    :return: list of int seeds
+    """
+    return [int(x) for x in np.random.SeedSequence(seed).generate_state(count, dtype=np.uint64)]
+
+
+def generate_puzzles(count: int = None, seed: int = None, workers: int = None, chunk_size: int = 8,
+                     box_size: int = 3, symmetry: str = 'none', target_clues: int = None,
+                     max_attempts: int = 1) -> typing.Iterator[GeneratedPuzzle]:
+    """
+    The purpose of this function is to generate puzzles across a process pool, yielded in seed order as they finish.
+    Only a small window of chunks is in flight at a time.
+    :param count: number of puzzles
+    :param seed: master seed, the same seed gives the same puzzles whatever the number of workers
+    :param workers: number of worker processes, all cores when None, 1 generates in this process
+    :param chunk_size: puzzles per work unit
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :param symmetry: key of SYMMETRIES
+    :param target_clues: wanted number of clues, None for minimal puzzles
+    :param max_attempts: full grids to try per puzzle for the target
+    :return: iterator of GeneratedPuzzle
+    """
+    create_symmetry_groups(box_size=box_size, symmetry=symmetry)
+    workers = workers or os.cpu_count() or 1
+    puzzle_seeds = create_puzzle_seeds(count=count, seed=seed)
+    seed_chunks = [puzzle_seeds[x:x + chunk_size] for x in range(0, count, chunk_size)]
+    chunk_worker = partial(generate_puzzle_chunk, box_size=box_size, symmetry=symmetry, target_clues=target_clues,
+                           max_attempts=max_attempts)
+    if workers == 1:
+        for seed_chunk in seed_chunks:
+            yield from chunk_worker(seed_chunk)
+        return
+
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for seed_chunk in seed_chunks:
+            in_flight.append(executor.submit(chunk_worker, seed_chunk))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def format_puzzle_line(puzzle_array: np.array = None) -> str:
+    return ''.join(str(x) for x in puzzle_array.ravel().tolist())
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(description="Generate sudoku puzzles with a unique solution.")
+    argument_parser.add_argument('-n', '--count', type=int, default=1, help="number of puzzles")
+    argument_parser.add_argument('-s', '--seed', type=int, default=None, help="master seed for reproducible output")
+    argument_parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes, default all cores")
+    argument_parser.add_argument('--symmetry', choices=sorted(SYMMETRIES), default='none')
+    argument_parser.add_argument('-c', '--clues', type=int, default=None, help="target clue count, default minimal")
+    argument_parser.add_argument('-a', '--attempts', type=int, default=1, help="full grids to try per puzzle")
+    argument_parser.add_argument('-o', '--output', type=Path, default=None,
+                                 help="puzzle file, .sdkp writes the packed format with solutions, default stdout")
+    return argument_parser
+
+
+def main(argv: list = None) -> int:
+    arguments = create_argument_parser().parse_args(argv)
+    start_time = time.perf_counter()
+    generated_puzzles = list(generate_puzzles(count=arguments.count, seed=arguments.seed, workers=arguments.workers,
+                                              symmetry=arguments.symmetry, target_clues=arguments.clues,
+                                              max_attempts=arguments.attempts))
+    puzzle_lines = '\n'.join(format_puzzle_line(puzzle_array=x.puzzle) for x in generated_puzzles) + '\n'
+    if arguments.output is None:
+        sys.stdout.write(puzzle_lines)
+    elif arguments.output.suffix == '.sdkp':
+        write_packed_puzzles(puzzle_path=arguments.output, puzzles=np.array([x.puzzle for x in generated_puzzles]),
+                             solutions=np.array([x.solution for x in generated_puzzles]))
+    else:
+        arguments.output.write_text(puzzle_lines)
+    elapsed = time.perf_counter() - start_time
+    throughput = len(generated_puzzles) / elapsed if elapsed else 0.0
+    mean_clues = np.mean([x.clues for x in generated_puzzles]) if generated_puzzles else 0.0
+    print(f"Generated {len(generated_puzzles)} puzzles in {elapsed:.2f}s ({throughput:.1f} puzzles/sec, "
+          f"mean clues {mean_clues:.1f})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
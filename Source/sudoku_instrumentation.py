@@ -0,0 +1,195 @@
+"""
+
+The purpose of this file is to store the instrumentation used to find out which solving strategy pays for itself.
+A SolveStats object attached to a solve records, for each strategy, the sweeps run, the eligible numbers eliminated,
+the cells solved and the wall time. Hooks let an external profiler hear about every strategy call as it happens.
+
+When no SolveStats is attached nothing is counted or timed, the only cost left is one None check per strategy call.
+
+summarize_latencies reduces per puzzle timings to percentiles and throughput, for the benchmark and the service.
+
+"""
+import functools
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+
+class StrategyStats:
+    """
+    The purpose of this class is to hold the running totals of one strategy.
+    """
+    __slots__ = ('sweeps', 'eliminations', 'cells_solved', 'seconds')
+
+    def __init__(self):
+        self.sweeps = 0
+        self.eliminations = 0
+        self.cells_solved = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return (f"StrategyStats(sweeps={self.sweeps}, eliminations={self.eliminations}, "
+                f"cells_solved={self.cells_solved}, seconds={self.seconds:.6f})")
+
+    def as_dict(self) -> dict:
+        return {x: getattr(self, x) for x in self.__slots__}
+
+
+class SolveHook:
+    """
+    The purpose of this class is to define the callbacks a profiler can implement. Every method does nothing, so a
+    hook only overrides the ones it needs.
+    """
+
+    def on_strategy_start(self, strategy_name: str = None, sudoku_board=None):
+        pass
+
+    def on_strategy_end(self, strategy_name: str = None, sudoku_board=None, eliminations: int = None,
+                        cells_solved: int = None, seconds: float = None):
+        pass
+
+
+def board_progress(sudoku_board=None) -> tuple:
+    """
+    The purpose of this function is to read how far a board has got, used before and after a strategy call.
+    :param sudoku_board: SudokuBoard or SudokuTensorBoard, which count by scanning every cell, or a PropagationQueue,
+    which reads its running counters
+    :return: known cells, eligible numbers left on the unsolved cells
+    """
+    return int(sudoku_board.count_known_cells()), int(sudoku_board.get_board_wide_unkowns_count())
+
+
+class SolveStats:
+    """
+    The purpose of this class is to collect StrategyStats for every strategy run during a solve and to pass each
+    strategy call on to the hooks.
+    """
+
+    def __init__(self, hooks: list = None):
+        self.strategies = dict()
+        self.hooks = list(hooks or [])
+
+    def __repr__(self):
+        return f"SolveStats({self.strategies})"
+
+    def add_hook(self, solve_hook: SolveHook = None):
+        self.hooks.append(solve_hook)
+
+    def get_strategy_stats(self, strategy_name: str = None) -> StrategyStats:
+        strategy_stats = self.strategies.get(strategy_name)
+        if strategy_stats is None:
+            strategy_stats = self.strategies[strategy_name] = StrategyStats()
+        return strategy_stats
+
+    def record(self, strategy_name: str = None, eliminations: int = 0, cells_solved: int = 0, seconds: float = 0.0):
+        """
+        The purpose of this function is to add one sweep of a strategy to its totals.
+        :param strategy_name:
+        :param eliminations: eligible numbers removed by the sweep
+        :param cells_solved: cells that became known during the sweep
+        :param seconds: wall time of the sweep
+        :return:
+        """
+        strategy_stats = self.get_strategy_stats(strategy_name=strategy_name)
+        strategy_stats.sweeps += 1
+        strategy_stats.eliminations += eliminations
+        strategy_stats.cells_solved += cells_solved
+        strategy_stats.seconds += seconds
+
+    def measure(self, strategy_name: str = None, sudoku_board=None, strategy_call=None, propagation_queue=None):
+        """
+        The purpose of this function is to run one strategy call and record what it did to the board. The call is
+        recorded even when it raises, so contradictions found by a strategy still show up in its time.
+        :param strategy_name:
+        :param sudoku_board: board the strategy works on
+        :param strategy_call: callable taking no arguments
+        :param propagation_queue: optional queue of the board, kept right by strategy_call. Its counters are read
+        instead of scanning the board, which only the sweep engines still need.
+        :return: whatever strategy_call returns
+        """
+        for solve_hook in self.hooks:
+            solve_hook.on_strategy_start(strategy_name=strategy_name, sudoku_board=sudoku_board)
+        progress_source = sudoku_board if propagation_queue is None else propagation_queue
+        known_before, unknowns_before = board_progress(sudoku_board=progress_source)
+        start_time = time.perf_counter()
+        try:
+            return strategy_call()
+        finally:
+            seconds = time.perf_counter() - start_time
+            known_after, unknowns_after = board_progress(sudoku_board=progress_source)
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # Solved cells count 0 towards the unknowns, a cell going from 2 eligible numbers to 1 drops the
+            # unknowns by 2 for a single elimination, so take the newly solved cells back off
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            cells_solved = known_after - known_before
+            eliminations = unknowns_before - unknowns_after - cells_solved
+            self.record(strategy_name=strategy_name, eliminations=eliminations, cells_solved=cells_solved,
+                        seconds=seconds)
+            for solve_hook in self.hooks:
+                solve_hook.on_strategy_end(strategy_name=strategy_name, sudoku_board=sudoku_board,
+                                           eliminations=eliminations, cells_solved=cells_solved, seconds=seconds)
+
+    def merge(self, other_stats=None):
+        """
+        The purpose of this function is to add the totals of another SolveStats, used to sum up many solves.
+        :param other_stats: SolveStats
+        :return:
+        """
+        for strategy_name, other_strategy in other_stats.strategies.items():
+            strategy_stats = self.get_strategy_stats(strategy_name=strategy_name)
+            for slot in StrategyStats.__slots__:
+                setattr(strategy_stats, slot, getattr(strategy_stats, slot) + getattr(other_strategy, slot))
+
+    def as_dict(self) -> dict:
+        return {x: y.as_dict() for x, y in self.strategies.items()}
+
+    def format_table(self) -> str:
+        """
+        The purpose of this function is to lay out the totals one strategy per line, most expensive first.
+        :return:
+        """
+        lines = [f"{'strategy':<24}{'sweeps':>8}{'eliminated':>12}{'solved':>8}{'ms':>10}"]
+        for strategy_name, strategy_stats in sorted(self.strategies.items(), key=lambda x: -x[1].seconds):
+            lines.append(f"{strategy_name:<24}{strategy_stats.sweeps:>8}{strategy_stats.eliminations:>12}"
+                         f"{strategy_stats.cells_solved:>8}{strategy_stats.seconds * 1e3:>10.3f}")
+        return '\n'.join(lines)
+
+
+def instrumented(strategy_name: str = None):
+    """
+    The purpose of this function is to decorate a board method so each call is measured by the SolveStats in the
+    board's solve_stats attribute. With no stats attached the method is called straight through.
+    :param strategy_name: name the calls are recorded under
+    :return: decorator
+    """
+
+    def decorator(board_method):
+        @functools.wraps(board_method)
+        def measured_method(self, *args, **kwargs):
+            solve_stats = self.solve_stats
+            if solve_stats is None:
+                return board_method(self, *args, **kwargs)
+            return solve_stats.measure(strategy_name=strategy_name, sudoku_board=self,
+                                       strategy_call=lambda: board_method(self, *args, **kwargs))
+
+        return measured_method
+
+    return decorator
+
+
+def summarize_latencies(latencies: list = None) -> dict:
+    """
+    The purpose of this function is to reduce a list of per puzzle latencies to percentiles and throughput.
+    :param latencies: seconds per puzzle
+    :return: dict with count, mean, p50/p90/p99, max (all seconds) and throughput in puzzles per second
+    """
+    latency_array = np.asarray(latencies, dtype=np.float64)
+    summary = {'count': int(latency_array.size), 'mean': float(latency_array.mean())}
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}"] = float(np.percentile(latency_array, percentile))
+    summary['max'] = float(latency_array.max())
+    total_seconds = float(latency_array.sum())
+    summary['throughput'] = latency_array.size / total_seconds if total_seconds else 0.0
+    return summary
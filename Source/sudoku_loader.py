@@ -1,26 +1,398 @@
+"""
+
+The purpose of this file is to load puzzles from disk. Each file format is a plugin module that is only imported when
+a file of that format is opened, so solving in-memory arrays, or reading text corpora, never pays for pandas or
+openpyxl at import time.
+
+"""
+import importlib
 import os
-import pickle
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# File suffix to the module and function that loads one puzzle of that format. The module is imported on first use.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+PUZZLE_FORMAT_PLUGINS = {
+    '.xlsx': ('Source.sudoku_loader_excel', 'load_excel_puzzle'),
+    '.pkl': ('Source.sudoku_loader_pickle', 'load_pickle_puzzle'),
+    '.txt': ('Source.sudoku_loader', 'load_text_puzzle'),
+    '.csv': ('Source.sudoku_loader', 'load_text_puzzle'),
+    '.sdkp': ('Source.sudoku_loader', 'load_packed_puzzle'),
+}
+
+
+def get_format_plugin(suffix: str = None):
+    """
+    The purpose of this function is to import the plugin for a file suffix and hand back its load function.
+    :param suffix: file suffix including the dot, e.g. '.xlsx'
+    :return: function taking a puzzle_path and returning a 9 x 9 uint8 array
+    """
+    try:
+        module_name, function_name = PUZZLE_FORMAT_PLUGINS[suffix.lower()]
+    except KeyError:
+        raise ValueError(f"No puzzle loader for {suffix} files, known formats {sorted(PUZZLE_FORMAT_PLUGINS)}") from None
+    return getattr(importlib.import_module(module_name), function_name)
 
 
 def load_puzzle(puzzle_path: Path = None):
+    """
+    The purpose of this function is to load one puzzle as a 9 x 9 uint8 array, 0 for empty cells.
+    :param puzzle_path: .xlsx, .pkl, .txt, .csv or .sdkp file
+    :return:
+    """
+    puzzle_path = Path(puzzle_path)
+    load_function = get_format_plugin(suffix=puzzle_path.suffix)
+    return load_function(puzzle_path)
+
+
+def load_text_puzzle(puzzle_path: Path = None) -> np.array:
+    """
+    The purpose of this function is to load the first puzzle of a line based text or CSV file.
+    :param puzzle_path:
+    :return:
+    """
+    for puzzle_chunk in stream_puzzles(puzzle_path=puzzle_path, chunk_size=1):
+        return puzzle_chunk[0]
+    raise ValueError(f"No puzzle lines found in {puzzle_path}")
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Line based corpora. Each puzzle is a line whose first 81 characters are the cells in row major order, using a
+# digit for a given and '0' or '.' for an empty cell. Anything after a separator (CSV solution column and so on) is
+# ignored. Lines that do not start with a cell character (headers, blank lines) are skipped. Every other line is a
+# puzzle line and gives exactly one puzzle, so the puzzles stay in line with the input: a puzzle line that is too
+# short, holds a bad character or runs on without a separator comes back with every cell INVALID_CELL_BYTE, which
+# check_puzzles turns away.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+PUZZLE_LINE_LENGTH = 81
+INVALID_CELL_BYTE = 255
+cell_byte_lookup = np.full(256, INVALID_CELL_BYTE, dtype=np.uint8)
+cell_byte_lookup[ord('0'):ord('9') + 1] = np.arange(10, dtype=np.uint8)
+cell_byte_lookup[ord('.')] = 0
+separator_bytes = np.frombuffer(b',;\t \r\n', dtype=np.uint8)
+cell_offsets = np.arange(PUZZLE_LINE_LENGTH)
+
+
+def parse_puzzle_lines(line_bytes: np.array = None) -> np.array:
+    """
+    The purpose of this function is to parse a block of whole lines into puzzles without a python loop per line.
+    :param line_bytes: uint8 array of the raw bytes of one or more complete lines
+    :return: (k, 9, 9) uint8 array, one puzzle per puzzle line
+    """
+    newline_positions = np.flatnonzero(line_bytes == ord('\n'))
+    line_ends = newline_positions
+    if not newline_positions.size or newline_positions[-1] != len(line_bytes) - 1:
+        line_ends = np.append(newline_positions, len(line_bytes))
+    line_starts = np.concatenate(([0], newline_positions + 1))[:len(line_ends)]
+    line_lengths = line_ends - line_starts
+
+    puzzle_lines = (line_lengths > 0) & (cell_byte_lookup[line_bytes[np.minimum(line_starts, len(line_bytes) - 1)]]
+                                         != INVALID_CELL_BYTE)
+    line_starts = line_starts[puzzle_lines]
+    line_lengths = line_lengths[puzzle_lines]
+    if not line_starts.size:
+        return np.zeros(shape=(0, 9, 9), dtype=np.uint8)
+
+    cell_positions = np.minimum(line_starts[:, None] + cell_offsets, len(line_bytes) - 1)
+    cell_values = cell_byte_lookup[line_bytes[cell_positions]]
+    valid_lines = (line_lengths >= PUZZLE_LINE_LENGTH) & (cell_values != INVALID_CELL_BYTE).all(axis=1)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # A line longer than 81 characters must have a separator straight after the cells, otherwise it holds
+    # more cells than a puzzle
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    longer = line_lengths > PUZZLE_LINE_LENGTH
+    next_positions = np.where(longer, line_starts + PUZZLE_LINE_LENGTH, 0)
+    valid_lines &= ~longer | np.isin(line_bytes[next_positions], separator_bytes)
+
+    cell_values[~valid_lines] = INVALID_CELL_BYTE
+    return cell_values.reshape(-1, 9, 9)
+
+
+def puzzle_string_to_array(puzzle_string: str = None) -> np.array:
+    """
+    The purpose of this function is to turn one 81 character puzzle string into a 9 x 9 uint8 array.
+    :param puzzle_string: digits with 0 or . for empty cells
+    :return:
+    """
+    return np.array([0 if x in '0.' else int(x) for x in puzzle_string], dtype=np.uint8).reshape(9, 9)
+
+
+def stream_puzzles(puzzle_path: Path = None, chunk_size: int = 4096, block_bytes: int = 1 << 22):
+    """
+    The purpose of this function is to stream a large text or CSV corpus as (chunk, 9, 9) uint8 arrays.
+    The file is memory mapped and parsed one block of bytes at a time, so memory use depends on block_bytes and
+    chunk_size and not on the size of the file.
+    :param puzzle_path: path to a .txt, .csv or other line based puzzle file, or a packed .sdkp file
+    :param chunk_size: number of puzzles per yielded array, the last one may be shorter
+    :param block_bytes: number of bytes parsed at a time
+    :return: generator of (k, 9, 9) uint8 arrays
+    """
+    if Path(puzzle_path).suffix.lower() == PACKED_SUFFIX:
+        yield from PackedPuzzleFile(puzzle_path=puzzle_path).iter_chunks(chunk_size=chunk_size)
+        return
+
+    file_size = os.path.getsize(puzzle_path)
+    if not file_size:
+        return
+
+    file_bytes = np.memmap(puzzle_path, dtype=np.uint8, mode='r')
+    pending = list()
+    pending_count = 0
+    position = 0
+    read_size = block_bytes
+    while position < file_size:
+        block_end = min(position + read_size, file_size)
+        line_bytes = file_bytes[position:block_end]
+        if block_end < file_size:
+            newline_positions = np.flatnonzero(line_bytes == ord('\n'))
+            if not newline_positions.size:
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                # A single line longer than the block, read a bigger block
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                read_size *= 2
+                continue
+            line_bytes = line_bytes[:newline_positions[-1] + 1]
+        read_size = block_bytes
+        position += len(line_bytes)
+
+        block_puzzles = parse_puzzle_lines(line_bytes=np.asarray(line_bytes))
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Slice through the block, only a chunk that spans two blocks is joined, so no puzzle is copied twice
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        block_offset = 0
+        while block_offset < len(block_puzzles):
+            take_count = min(chunk_size - pending_count, len(block_puzzles) - block_offset)
+            pending.append(block_puzzles[block_offset:block_offset + take_count])
+            pending_count += take_count
+            block_offset += take_count
+            if pending_count == chunk_size:
+                yield pending[0] if len(pending) == 1 else np.concatenate(pending)
+                pending = list()
+                pending_count = 0
+
+    if pending_count:
+        yield pending[0] if len(pending) == 1 else np.concatenate(pending)
+    del file_bytes
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Packed binary corpora (.sdkp). A 32 byte header is followed by fixed size records. Each record holds the puzzle
+# at 4 bits per cell, two cells per byte with the first cell in the high nibble and the 82nd nibble unused, so 41
+# bytes. Optional columns add the solution, packed the same way, and a one byte status code.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+PACKED_SUFFIX = '.sdkp'
+PACKED_MAGIC = b'SDKPACK1'
+PACKED_VERSION = 1
+PACKED_CELL_BYTES = 41
+PACKED_HAS_SOLUTIONS = 1
+PACKED_HAS_STATUS = 2
+PACKED_HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u2'), ('flags', '<u2'), ('record_size', '<u4'),
+                                ('count', '<u8'), ('reserved', 'u1', (8,))])
+
+
+def packed_record_dtype(flags: int = 0) -> np.dtype:
+    """
+    The purpose of this function is to build the record layout for a set of column flags.
+    :param flags: PACKED_HAS_SOLUTIONS and/or PACKED_HAS_STATUS
+    :return: structured numpy dtype
+    """
+    record_fields = [('puzzle', 'u1', (PACKED_CELL_BYTES,))]
+    if flags & PACKED_HAS_SOLUTIONS:
+        record_fields.append(('solution', 'u1', (PACKED_CELL_BYTES,)))
+    if flags & PACKED_HAS_STATUS:
+        record_fields.append(('status', 'u1'))
+    return np.dtype(record_fields)
+
+
+def pack_grids(grids: np.array = None) -> np.array:
+    """
+    The purpose of this function is to pack (N, 9, 9) grids into 41 bytes each.
+    :param grids: (N, 9, 9) array with values 0..9
+    :return: (N, 41) uint8 array
+    """
+    grids = np.asarray(grids)
+    if grids.ndim == 2:
+        grids = grids[None]
+    if grids.ndim != 3 or grids.shape[1:] != (9, 9):
+        raise ValueError(f"Grids must be shaped (N, 9, 9), got {grids.shape}")
+    if grids.size and grids.max() > 9:
+        raise ValueError("Grid values must be 0 for empty or 1 through 9")
+    nibbles = np.zeros(shape=(len(grids), PACKED_CELL_BYTES * 2), dtype=np.uint8)
+    nibbles[:, :81] = grids.reshape(-1, 81)
+    return (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+
+
+def unpack_grids(packed: np.array = None) -> np.array:
+    """
+    The purpose of this function is to turn (N, 41) packed bytes back into (N, 9, 9) grids.
+    :param packed: (N, 41) uint8 array
+    :return: (N, 9, 9) uint8 array
+    """
+    nibbles = np.empty(shape=(len(packed), PACKED_CELL_BYTES * 2), dtype=np.uint8)
+    nibbles[:, 0::2] = packed >> 4
+    nibbles[:, 1::2] = packed & 0x0F
+    return nibbles[:, :81].reshape(-1, 9, 9)
+
+
+class PackedPuzzleWriter:
+    """
+    The purpose of this class is to write a packed puzzle file a chunk at a time, so a corpus never has to be held
+    in memory whole. The header count is filled in on close.
+    """
+
+    def __init__(self, puzzle_path: Path = None, has_solutions: bool = False, has_status: bool = False):
+        self.puzzle_path = Path(puzzle_path)
+        self.flags = (PACKED_HAS_SOLUTIONS if has_solutions else 0) | (PACKED_HAS_STATUS if has_status else 0)
+        self.record_dtype = packed_record_dtype(flags=self.flags)
+        self.count = 0
+        self.puzzle_file = open(self.puzzle_path, 'wb')
+        self.puzzle_file.write(self.create_header().tobytes())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def create_header(self) -> np.array:
+        header = np.zeros(1, dtype=PACKED_HEADER_DTYPE)
+        header['magic'] = PACKED_MAGIC
+        header['version'] = PACKED_VERSION
+        header['flags'] = self.flags
+        header['record_size'] = self.record_dtype.itemsize
+        header['count'] = self.count
+        return header
+
+    def append(self, puzzles: np.array = None, solutions: np.array = None, status: np.array = None):
+        """
+        The purpose of this function is to add a chunk of puzzles to the end of the file.
+        :param puzzles: (k, 9, 9) array, 0 for empty cells
+        :param solutions: (k, 9, 9) array, needed when the file has a solution column
+        :param status: (k,) array of status codes, needed when the file has a status column
+        :return:
+        """
+        packed_puzzles = pack_grids(grids=puzzles)
+        records = np.zeros(len(packed_puzzles), dtype=self.record_dtype)
+        records['puzzle'] = packed_puzzles
+        if self.flags & PACKED_HAS_SOLUTIONS:
+            if solutions is None or len(solutions) != len(records):
+                raise ValueError("This file has a solution column, give one solution per puzzle")
+            records['solution'] = pack_grids(grids=solutions)
+        if self.flags & PACKED_HAS_STATUS:
+            if status is None or len(status) != len(records):
+                raise ValueError("This file has a status column, give one status per puzzle")
+            records['status'] = status
+        self.puzzle_file.write(records.tobytes())
+        self.count += len(records)
+
+    def close(self):
+        if self.puzzle_file.closed:
+            return
+        self.puzzle_file.seek(0)
+        self.puzzle_file.write(self.create_header().tobytes())
+        self.puzzle_file.close()
+
+
+def write_packed_puzzles(puzzle_path: Path = None, puzzles: np.array = None, solutions: np.array = None,
+                         status: np.array = None) -> int:
+    """
+    The purpose of this function is to write a whole (N, 9, 9) array of puzzles, and optionally their solutions and
+    status codes, to a packed file.
+    :param puzzle_path: .sdkp file
+    :param puzzles: (N, 9, 9) array
+    :param solutions: optional (N, 9, 9) array
+    :param status: optional (N,) array
+    :return: number of puzzles written
+    """
+    with PackedPuzzleWriter(puzzle_path=puzzle_path, has_solutions=solutions is not None,
+                            has_status=status is not None) as packed_writer:
+        packed_writer.append(puzzles=puzzles, solutions=solutions, status=status)
+        return packed_writer.count
+
+
+class PackedPuzzleFile:
+    """
+    The purpose of this class is to read a packed puzzle file through a memory map. The packed columns and the status
+    column are views straight onto the file. Cells are 4 bits so an (N, 9, 9) uint8 array cannot be a view, slicing
+    unpacks just the records asked for in one vectorised pass.
+    """
+
+    def __init__(self, puzzle_path: Path = None):
+        self.puzzle_path = Path(puzzle_path)
+        header = np.fromfile(self.puzzle_path, dtype=PACKED_HEADER_DTYPE, count=1)
+        if not len(header) or header['magic'][0] != PACKED_MAGIC:
+            raise ValueError(f"{self.puzzle_path} is not a packed puzzle file")
+        if header['version'][0] != PACKED_VERSION:
+            raise ValueError(f"Unsupported packed puzzle version {header['version'][0]}")
+        self.flags = int(header['flags'][0])
+        self.record_dtype = packed_record_dtype(flags=self.flags)
+        if header['record_size'][0] != self.record_dtype.itemsize:
+            raise ValueError(f"{self.puzzle_path} has a record size that does not match its columns")
+        self.count = int(header['count'][0])
+        if self.count:
+            self.records = np.memmap(self.puzzle_path, dtype=self.record_dtype, mode='r',
+                                     offset=PACKED_HEADER_DTYPE.itemsize, shape=(self.count,))
+        else:
+            self.records = np.zeros(0, dtype=self.record_dtype)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, item) -> np.array:
+        """
+        The purpose of this function is to unpack the puzzles of an index or slice.
+        :param item: int or slice
+        :return: 9 x 9 array for an int, (k, 9, 9) array for a slice
+        """
+        if isinstance(item, slice):
+            return self.get_puzzles(start=item.start, stop=item.stop, step=item.step)
+        return unpack_grids(packed=self.records['puzzle'][item][None])[0]
+
+    @property
+    def has_solutions(self) -> bool:
+        return bool(self.flags & PACKED_HAS_SOLUTIONS)
 
-    if puzzle_path.suffix =='.xlsx':
-        lp_excel_reader = pd.ExcelFile(puzzle_path, engine='openpyxl')
-        with lp_excel_reader as ler:
-            puzzle_array = pd.read_excel(ler, header=None).fillna(0).astype(np.uint8)
+    @property
+    def has_status(self) -> bool:
+        return bool(self.flags & PACKED_HAS_STATUS)
 
-        puzzle_df_array = puzzle_array.values
-        return puzzle_df_array
+    def get_puzzles(self, start: int = None, stop: int = None, step: int = None) -> np.array:
+        return unpack_grids(packed=self.records['puzzle'][start:stop:step])
 
-    if puzzle_path.suffix=='.pkl':
-        with open(puzzle_path,'rb') as pp:
-            puzzle_array = pickle.load(pp)
-        return puzzle_array
+    def get_solutions(self, start: int = None, stop: int = None, step: int = None) -> np.array:
+        if not self.has_solutions:
+            raise ValueError(f"{self.puzzle_path} has no solution column")
+        return unpack_grids(packed=self.records['solution'][start:stop:step])
 
+    def get_status(self, start: int = None, stop: int = None, step: int = None) -> np.array:
+        """
+        The purpose of this function is to get the status codes, a read only view onto the file.
+        :return: (k,) uint8 array
+        """
+        if not self.has_status:
+            raise ValueError(f"{self.puzzle_path} has no status column")
+        return self.records['status'][start:stop:step]
 
+    def iter_chunks(self, chunk_size: int = 4096):
+        """
+        The purpose of this function is to stream the puzzles as (chunk, 9, 9) arrays, like stream_puzzles.
+        :param chunk_size:
+        :return: generator of (k, 9, 9) uint8 arrays
+        """
+        for chunk_start in range(0, self.count, chunk_size):
+            yield self.get_puzzles(start=chunk_start, stop=chunk_start + chunk_size)
 
 
+def load_packed_puzzle(puzzle_path: Path = None) -> np.array:
+    """
+    The purpose of this function is to load the first puzzle of a packed file.
+    :param puzzle_path:
+    :return:
+    """
+    packed_file = PackedPuzzleFile(puzzle_path=puzzle_path)
+    if not len(packed_file):
+        raise ValueError(f"No puzzles found in {puzzle_path}")
+    return packed_file[0]
@@ -0,0 +1,201 @@
+"""
+
+The purpose of this file is to store the Excel puzzle loader plugin. openpyxl is only imported here.
+
+A workbook can hold many puzzles. Every sheet is read, and on each sheet the puzzles are 9 x 9 blocks tiled from A1
+with block_gap blank rows and columns between neighbouring blocks, so a sheet holding a single puzzle at A1 is the
+simplest case. Blocks that are completely empty are skipped. A workbook is read in one streaming read only pass and
+written in one streaming write only pass, never cell by cell.
+
+"""
+import typing
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+from openpyxl.utils import get_column_letter
+
+SOLVED_SHEET_SUFFIX = ' solved'
+SHEET_TITLE_LENGTH = 31
+
+
+class WorkbookBlock(typing.NamedTuple):
+    """
+    The purpose of this class is to say where a puzzle was found in a workbook.
+    sheet_name: title of the sheet
+    row: 0 based row of the block's top left cell
+    column: 0 based column of the block's top left cell
+    """
+    sheet_name: str
+    row: int
+    column: int
+
+    @property
+    def cell_reference(self) -> str:
+        return f"{get_column_letter(self.column + 1)}{self.row + 1}"
+
+
+class WorkbookPuzzles(typing.NamedTuple):
+    """
+    The purpose of this class is to hold every puzzle of a workbook in one array, with where each one came from.
+    puzzles: (N, 9, 9) uint8 array, 0 for empty cells
+    blocks: N WorkbookBlock in sheet order, then row major block order
+    sheet_shapes: sheet title to (block rows, block columns) of the sheet's block grid, in sheet order
+    """
+    puzzles: np.ndarray
+    blocks: list
+    sheet_shapes: dict
+
+
+def sheet_rows_to_array(sheet_rows: list = None, sheet_name: str = None) -> np.array:
+    """
+    The purpose of this function is to turn the value rows of a sheet into one numeric array, blank cells as 0. The
+    rows of a read only sheet can have different lengths, the short ones are padded with blanks.
+    :param sheet_rows: list of tuples of cell values
+    :param sheet_name: used in the error message
+    :return: 2D float array
+    """
+    sheet_width = max((len(x) for x in sheet_rows), default=0)
+    padded_rows = [[0 if y is None else y for y in x] + [0] * (sheet_width - len(x)) for x in sheet_rows]
+    try:
+        sheet_array = np.array(padded_rows, dtype=np.float64).reshape(len(padded_rows), sheet_width)
+    except (TypeError, ValueError):
+        raise ValueError(f"Sheet {sheet_name} holds a value that is not a number") from None
+    if (sheet_array % 1).any():
+        raise ValueError(f"Sheet {sheet_name} holds a value that is not a whole number")
+    return sheet_array
+
+
+def split_sheet_blocks(sheet_array: np.array = None, block_gap: int = 1) -> np.array:
+    """
+    The purpose of this function is to cut a sheet into its grid of 9 x 9 blocks with one reshape.
+    :param sheet_array: 2D array of the sheet
+    :param block_gap: blank rows and columns between neighbouring blocks
+    :return: (block rows, block columns, 9, 9) array
+    """
+    block_stride = 9 + block_gap
+    block_rows = -(-(sheet_array.shape[0] + block_gap) // block_stride)
+    block_columns = -(-(sheet_array.shape[1] + block_gap) // block_stride)
+    padded_array = np.zeros(shape=(block_rows * block_stride, block_columns * block_stride), dtype=sheet_array.dtype)
+    padded_array[:sheet_array.shape[0], :sheet_array.shape[1]] = sheet_array
+    sheet_blocks = padded_array.reshape(block_rows, block_stride, block_columns, block_stride)[:, :9, :, :9]
+    return sheet_blocks.transpose(0, 2, 1, 3)
+
+
+def read_workbook_puzzles(workbook_path: Path = None, block_gap: int = 1) -> WorkbookPuzzles:
+    """
+    The purpose of this function is to read every puzzle of every sheet of a workbook in one read only pass.
+    Values outside 0 to 9 are kept so the validator can turn those puzzles away, anything that does not fit a uint8
+    becomes 255.
+    :param workbook_path: .xlsx file
+    :param block_gap: blank rows and columns between neighbouring blocks on a sheet
+    :return: WorkbookPuzzles
+    """
+    block_stride = 9 + block_gap
+    puzzle_list = list()
+    blocks = list()
+    sheet_shapes = dict()
+    workbook = openpyxl.load_workbook(workbook_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # The dimensions stored in a file are not always right, without them the rows are read to the end
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            worksheet.reset_dimensions()
+            sheet_array = sheet_rows_to_array(sheet_rows=list(worksheet.iter_rows(values_only=True)),
+                                              sheet_name=worksheet.title)
+            sheet_blocks = split_sheet_blocks(sheet_array=sheet_array, block_gap=block_gap)
+            sheet_shapes[worksheet.title] = sheet_blocks.shape[:2]
+            filled_blocks = np.argwhere(sheet_blocks.any(axis=(2, 3)))
+            puzzle_list.append(sheet_blocks[filled_blocks[:, 0], filled_blocks[:, 1]])
+            blocks.extend(WorkbookBlock(sheet_name=worksheet.title, row=x * block_stride, column=y * block_stride)
+                          for x, y in filled_blocks.tolist())
+    finally:
+        workbook.close()
+
+    if puzzle_list:
+        puzzles = np.concatenate(puzzle_list)
+        puzzles = np.where((puzzles < 0) | (puzzles > 255), 255, puzzles).astype(np.uint8)
+    else:
+        puzzles = np.zeros(shape=(0, 9, 9), dtype=np.uint8)
+    return WorkbookPuzzles(puzzles=puzzles, blocks=blocks, sheet_shapes=sheet_shapes)
+
+
+def load_excel_puzzle(puzzle_path: Path = None) -> np.array:
+    """
+    The purpose of this function is to read the first 9 x 9 puzzle of a workbook, blank cells become 0.
+    :param puzzle_path:
+    :return:
+    """
+    workbook_puzzles = read_workbook_puzzles(workbook_path=puzzle_path)
+    if not len(workbook_puzzles.puzzles):
+        raise ValueError(f"No puzzles found in {puzzle_path}")
+    return workbook_puzzles.puzzles[0]
+
+
+def join_sheet_blocks(sheet_blocks: np.array = None, block_gap: int = 1) -> np.array:
+    """
+    The purpose of this function is to lay a grid of 9 x 9 blocks out as one sheet, the reverse of split_sheet_blocks.
+    :param sheet_blocks: (block rows, block columns, 9, 9) array
+    :param block_gap: blank rows and columns between neighbouring blocks
+    :return: 2D array without the trailing gap
+    """
+    block_rows, block_columns = sheet_blocks.shape[:2]
+    block_stride = 9 + block_gap
+    sheet_array = np.zeros(shape=(block_rows, block_stride, block_columns, block_stride), dtype=sheet_blocks.dtype)
+    sheet_array[:, :9, :, :9] = sheet_blocks.transpose(0, 2, 1, 3)
+    sheet_array = sheet_array.reshape(block_rows * block_stride, block_columns * block_stride)
+    return sheet_array[:block_rows * block_stride - block_gap, :block_columns * block_stride - block_gap]
+
+
+def append_block_sheet(workbook: openpyxl.Workbook = None, sheet_title: str = None, sheet_blocks: np.array = None,
+                       block_gap: int = 1):
+    """
+    The purpose of this function is to add a sheet holding a grid of blocks to a write only workbook, one row append
+    per sheet row. Cells that are 0 are left blank.
+    :param workbook: write only workbook
+    :param sheet_title:
+    :param sheet_blocks: (block rows, block columns, 9, 9) array
+    :param block_gap: blank rows and columns between neighbouring blocks
+    :return:
+    """
+    worksheet = workbook.create_sheet(title=sheet_title)
+    for sheet_row in join_sheet_blocks(sheet_blocks=sheet_blocks, block_gap=block_gap).tolist():
+        worksheet.append([x or None for x in sheet_row])
+
+
+def write_workbook_grids(workbook_path: Path = None, workbook_puzzles: WorkbookPuzzles = None,
+                         solutions: np.array = None, block_gap: int = 1, include_puzzles: bool = False) -> int:
+    """
+    The purpose of this function is to write solutions to a new workbook in one write only pass, each solution at the
+    same place as its puzzle on a sheet named after the puzzle's sheet. Cells that are 0, a puzzle with no solution,
+    are left blank.
+    :param workbook_path: .xlsx file to create
+    :param workbook_puzzles: WorkbookPuzzles the solutions belong to
+    :param solutions: (N, 9, 9) array in the order of workbook_puzzles.blocks
+    :param block_gap: blank rows and columns between neighbouring blocks
+    :param include_puzzles: also write each puzzle sheet, with the solutions on an extra sheet after it
+    :return: number of sheets written
+    """
+    block_stride = 9 + block_gap
+    sheet_grids = {x: (np.zeros(shape=y + (9, 9), dtype=np.uint8), np.zeros(shape=y + (9, 9), dtype=np.uint8))
+                   for x, y in workbook_puzzles.sheet_shapes.items()}
+    for wb_block, wb_puzzle, wb_solution in zip(workbook_puzzles.blocks, workbook_puzzles.puzzles, solutions):
+        puzzle_blocks, solution_blocks = sheet_grids[wb_block.sheet_name]
+        block_position = wb_block.row // block_stride, wb_block.column // block_stride
+        puzzle_blocks[block_position] = wb_puzzle
+        solution_blocks[block_position] = wb_solution
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet_count = 0
+    for sheet_name, (puzzle_blocks, solution_blocks) in sheet_grids.items():
+        if include_puzzles:
+            append_block_sheet(workbook=workbook, sheet_title=sheet_name, sheet_blocks=puzzle_blocks,
+                               block_gap=block_gap)
+            sheet_name = sheet_name[:SHEET_TITLE_LENGTH - len(SOLVED_SHEET_SUFFIX)] + SOLVED_SHEET_SUFFIX
+            sheet_count += 1
+        append_block_sheet(workbook=workbook, sheet_title=sheet_name, sheet_blocks=solution_blocks,
+                           block_gap=block_gap)
+        sheet_count += 1
+    workbook.save(workbook_path)
+    return sheet_count
@@ -0,0 +1,20 @@
+"""
+
+The purpose of this file is to store the pickle puzzle loader plugin.
+
+"""
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+
+def load_pickle_puzzle(puzzle_path: Path = None) -> np.array:
+    """
+    The purpose of this function is to read a pickled 9 x 9 numpy puzzle array.
+    :param puzzle_path:
+    :return:
+    """
+    with open(puzzle_path, 'rb') as pp:
+        puzzle_array = pickle.load(pp)
+    return puzzle_array
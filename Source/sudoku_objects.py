@@ -1,15 +1,18 @@
 import typing
-from copy import copy
 
 import numpy as np
 
-from Source.eligible_array import EligibleNumbers
-from Source.sudoku_utilities import CoordinatesList, PatentSquareArray, NineRange, NeighborListDictionary
+from Source.eligible_array import EligibleNumbers, create_eligible_numbers_class
+from Source.eligible_bitmask import EligibleBitmask, create_eligible_bitmask_class
+from Source.sudoku_instrumentation import SolveStats, instrumented
+from Source.sudoku_propagation import PropagationQueue
+from Source.sudoku_strategies import StrategyPipeline, create_unit_tables
+from Source.sudoku_utilities import CoordinatesList, PatentSquareArray, BoardIndexTables, CellGeometry, \
+    CellGeometryTable, box_size_from_side
+from Source.sudoku_validation import SudokuContradiction, find_repeated_units
 
-nine_range = NineRange.nine_range()
 
-
-def assign_parent_square(p_row: np.uint8 = None, p_column: np.uint8 = None) -> str:
+def assign_parent_square(p_row: np.uint8 = None, p_column: np.uint8 = None, box_size: int = 3) -> str:
     """
     The purpose of this function is to take a row, column and find which of the 9 big "Parent Squares" that it belongs
     to and assign it that value
@@ -17,36 +20,64 @@ def assign_parent_square(p_row: np.uint8 = None, p_column: np.uint8 = None) -> s
     :param p_row: Sudoko board row
     :dtype p_row: np.uint8
     :param p_column: Sudoku board column.
+    :param box_size: size of a parent square, 3 for 9 x 9
     :return:
     """
-    parent_square_master_df = PatentSquareArray.patent_square_array()
+    parent_square_master_df = PatentSquareArray.patent_square_array(box_size=box_size)
     parent_square_master_value = parent_square_master_df[p_row, p_column]
     return parent_square_master_value
 
 
-def create_initial_board():
+def size_eligible_class(eligible_class: type = EligibleBitmask, box_size: int = 3) -> type:
+    """
+    The purpose of this function is to get the version of an eligible numbers class that is wide enough for a board
+    of box_size x box_size parent squares.
+    :param eligible_class: EligibleBitmask or EligibleNumbers, or one of their sized versions
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return: class
+    """
+    if eligible_class.side == box_size * box_size:
+        return eligible_class
+    if issubclass(eligible_class, EligibleNumbers):
+        return create_eligible_numbers_class(box_size=box_size)
+    return create_eligible_bitmask_class(box_size=box_size)
+
+
+def create_initial_board(eligible_class: type = EligibleBitmask, box_size: int = 3, candidates: list = None):
     """
     The purpose of this function is to create a blank board, and populate it with Sudoku cell objects.
-    :return: Board Array - 9 x 9 array of blank SudokuCell Objects.
+    :param eligible_class: class used to store each cell's eligible numbers, EligibleBitmask or EligibleNumbers.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :param candidates: optional list of the cells' eligible numbers in cell id order, owned by the board, new blank
+    ones are made when None
+    :return: Board Array - 9 x 9 array of blank SudokuCell Objects, side x side for bigger boxes.
     """
-    board_array = np.array(np.zeros(shape=(9, 9), dtype=object))
-    for cib_row in nine_range:
-        for cib_col in nine_range:
-            board_array[cib_row, cib_col] = SudokuCell(sudoku_cell_row=cib_row, sudoku_cell_column=cib_col)
-    return board_array
+    cell_geometry_table = CellGeometryTable.cell_geometry_table(box_size=box_size)
+    if candidates is None:
+        eligible_class = size_eligible_class(eligible_class=eligible_class, box_size=box_size)
+        candidates = [eligible_class() for _ in cell_geometry_table]
+    side = box_size * box_size
+    board_array = np.empty(shape=side * side, dtype=object)
+    board_array[:] = [SudokuCell.from_geometry(geometry=x, eligible_numbers=y)
+                      for x, y in zip(cell_geometry_table, candidates)]
+    return board_array.reshape(side, side)
 
 
 class SudokuCell:
     """
-    This is the class for a single square of a sudoku board.
+    This is the class for a single square of a sudoku board. A cell holds only two references: its eligible numbers,
+    which are the board's entry in its candidates list, and its CellGeometry, the row, column, parent square and
+    neighbors shared by the same cell of every board of that size.
     """
+    __slots__ = ('eligible_numbers', 'geometry')
 
     def __repr__(self):
         remaining_unknowns = ','.join([f"{str(x)}" for x in self.get_remaining_unknowns()])
         out_string = f"Row {self.row}, Col {self.column} {remaining_unknowns}"
         return out_string
 
-    def __init__(self, sudoku_cell_row: np.uint8 = None, sudoku_cell_column: np.uint8 = None):
+    def __init__(self, sudoku_cell_row: np.uint8 = None, sudoku_cell_column: np.uint8 = None,
+                 eligible_class: type = EligibleBitmask, box_size: int = 3):
 
         # CHeck that the inputs are np.uint8
         if not isinstance(sudoku_cell_row, np.uint8) or not isinstance(sudoku_cell_column, np.uint8):
@@ -54,27 +85,48 @@ class SudokuCell:
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Each cell has a list of eligible numbers that it can hold. THe purpose of the solving algorithms is to
-        # reduce this list down to one number thus solving the square
+        # reduce this list down to one number thus solving the square. The list is either the bitmask or the
+        # original numpy array version, both have the same functions.
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        self.eligible_numbers = EligibleNumbers()
+        self.eligible_numbers = eligible_class()
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Since rules of sudoku limit repetition in a specific 3x3 square, we divide the board for analysis sake into
-        # 9 such of these 3x3 squares labeled a through i
+        # Row, column, parent square and neighbors come from the shared geometry table instead of being worked out
+        # for every cell of every board
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        self.parent_square = assign_parent_square(p_row=sudoku_cell_row, p_column=sudoku_cell_column)
+        side = box_size * box_size
+        cell_geometry_table = CellGeometryTable.cell_geometry_table(box_size=box_size)
+        self.geometry = cell_geometry_table[int(sudoku_cell_row) * side + int(sudoku_cell_column)]
 
-        # ~~~~~~~~~~~~~~~~~~~~~~~~
-        # Find the neighbor cell
-        # ~~~~~~~~~~~~~~~~~~~~~~~~
+    @classmethod
+    def from_geometry(cls, geometry: CellGeometry = None, eligible_numbers=None):
+        """
+        The purpose of this function is to make a cell from parts that already exist, skipping the checks and the
+        table lookup of __init__. The board uses it to build its cells quickly.
+        :param geometry: the cell's entry of the geometry table
+        :param eligible_numbers: the cell's eligible numbers
+        :return: SudokuCell
+        """
+        fg_cell = object.__new__(cls)
+        fg_cell.eligible_numbers = eligible_numbers
+        fg_cell.geometry = geometry
+        return fg_cell
 
-        neighbor_list_dictionary = NeighborListDictionary.neighbor_list_dictionary()
-        self.neighbor_list = neighbor_list_dictionary.get((sudoku_cell_row, sudoku_cell_column))
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Track the row and column  as  cell properties.
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        self.row = sudoku_cell_row
-        self.column = sudoku_cell_column
+    @property
+    def row(self) -> np.uint8:
+        return self.geometry.row
+
+    @property
+    def column(self) -> np.uint8:
+        return self.geometry.column
+
+    @property
+    def parent_square(self) -> str:
+        return self.geometry.parent_square
+
+    @property
+    def neighbor_list(self) -> tuple:
+        return self.geometry.neighbor_list
 
     @property
     def answer_found(self):
@@ -93,17 +145,17 @@ class SudokuCell:
     def remove_values(self, removal_values: int | typing.Iterable):
         if isinstance(removal_values, typing.Iterable):
             if self.remaining_unknowns_count() == 0:
-                raise ValueError('shtf')
+                raise SudokuContradiction('No eligible values left to remove from')
             self.eligible_numbers.eliminate_values(to_eliminate=removal_values)
         elif isinstance(removal_values, int | np.uint8):
             self.eligible_numbers.eliminate_value(to_eliminate=np.uint8(removal_values))
 
     def has_value_in_eligible(self, test_value: np.uint8 = None):
-        hvie = self.eligible_numbers.base_array[test_value]
+        hvie = self.eligible_numbers.has_value(test_value=test_value)
         return hvie
 
     def remaining_unknowns_count(self):
-        bas = self.eligible_numbers.base_array.sum()
+        bas = self.eligible_numbers.number_of_eligible_values()
         if bas == 1:
             ruc = 0
         else:
@@ -118,14 +170,38 @@ class SudokuCell:
 class SudokuBoard:
     """
     This is the class to hold a sudoku board of 9x9 squares. Each square holds an object called a SudokuCell.
+    Bigger boards of box_size x box_size parent squares, 16 x 16 or 25 x 25, work the same way, the box size is read
+    from the shape of the start board array.
     """
 
     def __repr__(self):
         ds = self.board_display()
         return ds
 
-    def __init__(self, start_board_array=None):
-        self.board = create_initial_board()
+    def __init__(self, start_board_array=None, eligible_class: type = EligibleBitmask, solve_stats: SolveStats = None):
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # The size of the board and its index tables, shared by every board of the same size
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        board_shape = np.shape(start_board_array)
+        if len(board_shape) != 2 or board_shape[0] != board_shape[1]:
+            raise ValueError(f"A start board array must be square, got shape {board_shape}")
+        self.box_size = box_size_from_side(side=board_shape[0])
+        self.side = board_shape[0]
+        self.coordinates_list = CoordinatesList.coordinates_list(box_size=self.box_size)
+        self.unit_index = BoardIndexTables.unit_index_array(box_size=self.box_size)
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # The board owns the candidate state, one eligible numbers object per cell in cell id order. The cells and
+        # the solving loops share these objects, the loops index the list directly.
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        eligible_class = size_eligible_class(eligible_class=eligible_class, box_size=self.box_size)
+        self.candidates = [eligible_class() for _ in range(self.side * self.side)]
+        self.board = create_initial_board(box_size=self.box_size, candidates=self.candidates)
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # When a SolveStats is attached every sweep and strategy records what it did to the board
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        self.solve_stats = solve_stats
+        # Undo list shared by the eligible numbers of every cell, None until the first checkpoint
+        self.trail = None
         self.update_board_array(external_update_board=start_board_array)
 
     def update_board_array(self, external_update_board: np.array = None):
@@ -135,15 +211,13 @@ class SudokuBoard:
         :param external_update_board: numpy array which holds the SudokuCell objects.  
         :return: 
         """
-        for uba_row, uba_column in CoordinatesList.coordinates_list():
-            this_sudoku_square = self.board[uba_row, uba_column]
-
+        candidates = self.candidates
+        for cell_id, input_board_array_value in enumerate(np.asarray(external_update_board).ravel().tolist()):
             # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
             # Check if the input has a value in it for updating.
             # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            input_board_array_value = external_update_board[uba_row, uba_column]
             if input_board_array_value:
-                this_sudoku_square.eligible_numbers.set_value(set_value=input_board_array_value)
+                candidates[cell_id].set_value(set_value=input_board_array_value)
 
     def count_known_cells(self):
         """
@@ -151,28 +225,39 @@ class SudokuBoard:
 
         :return:
         """
-        cl = CoordinatesList.coordinates_list()
-        known_count_list = np.array([self.board[ckc_row, ckc_row].answer_found for ckc_row, ckc_column in cl])
-        known_counts = known_count_list.sum().astype(np.uint8)
-        return known_counts
+        cl = self.coordinates_list
+        known_count_list = np.array([self.board[ckc_row, ckc_column].answer_found for ckc_row, ckc_column in cl])
+        return int(known_count_list.sum())
 
     def get_board_wide_unkowns_count(self):
-        cl = CoordinatesList.coordinates_list()
+        cl = self.coordinates_list
         gbwuc = np.array([self.board[gbw_row, gbw_column].remaining_unknowns_count() for gbw_row, gbw_column in cl])
         board_wide_unknowns_count = gbwuc.sum()
         return board_wide_unknowns_count
 
+    def get_cell_remaining_unknowns(self, row: np.uint8 = None, column: np.uint8 = None) -> np.array:
+        """
+        The purpose of this function is to get the eligible numbers of one cell.
+        :param row:
+        :param column:
+        :return:
+        """
+        gcru = self.board[row, column].get_remaining_unknowns()
+        return gcru
+
+    @instrumented(strategy_name='remove_known_neighbors')
     def remove_known_neighbors(self, verbose=False):
         """
         The purpose of this function is to run all cells on the board and eliminate possible numbers based on other
         values in the square.
         :return:
         """
-        print(f"**removing known neighbors**")
+        if verbose:
+            print(f"**removing known neighbors**")
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Modify coordinates list to eliminate known cells
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        cl = CoordinatesList.coordinates_list()
+        cl = self.coordinates_list
 
         keep_going = True
         while keep_going:
@@ -211,12 +296,14 @@ class SudokuBoard:
 
         return True
 
+    @instrumented(strategy_name='column_solve')
     def column_solve(self, verbose=False):
         """
         The purpose of this function is to analyze rows and columns to solve a sudoku square
         :return:
         """
-        print(f"Column Solve")
+        if verbose:
+            print(f"Column Solve")
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
         # Set the while loop controls and a round counter.
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -233,7 +320,7 @@ class SudokuBoard:
             # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
             # The coordinates list of all row, column combinations
             # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            cl = CoordinatesList.coordinates_list()
+            cl = self.coordinates_list
             for b_row, b_col in cl:
 
                 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -267,16 +354,21 @@ class SudokuBoard:
                 after_unknowns_count = b_cell.remaining_unknowns_count()
                 unknowns_eliminated_this_cell = before_unknowns_count - after_unknowns_count
                 total_removed += unknowns_eliminated_this_cell
-                known_count = self.count_known_cells()
-                current_unknowns = self.get_board_wide_unkowns_count()
                 if verbose:
+                    known_count = self.count_known_cells()
+                    current_unknowns = self.get_board_wide_unkowns_count()
                     print(f"Cell at Row {b_row} and Column {b_col}  removed {unknowns_eliminated_this_cell} "
                           f"known count {known_count} total_removed {total_removed} \t current unknown {current_unknowns}")
                     print(f"Round {round_counter}")
 
-            if known_count == 81 or total_removed == 0:
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # Count the known cells once per round, not once per cell, it scans the whole board
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            known_count = self.count_known_cells()
+            if known_count == self.side * self.side or total_removed == 0:
                 keep_going = False
 
+    @instrumented(strategy_name='row_solve')
     def row_solve(self, verbose=False):
         """
         The purpose of this function is to analyze rows and columns to solve a sudoku square
@@ -299,7 +391,7 @@ class SudokuBoard:
             # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
             # The coordinates list of all row, column combinations
             # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            cl = CoordinatesList.coordinates_list()
+            cl = self.coordinates_list
             for b_row, b_col in cl:
 
                 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -333,35 +425,316 @@ class SudokuBoard:
                 after_unknowns_count = b_cell.remaining_unknowns_count()
                 unknowns_eliminated_this_cell = before_unknowns_count - after_unknowns_count
                 total_removed += unknowns_eliminated_this_cell
-                known_count = self.count_known_cells()
-                current_unknowns = self.get_board_wide_unkowns_count()
                 if verbose:
+                    known_count = self.count_known_cells()
+                    current_unknowns = self.get_board_wide_unkowns_count()
                     print(f"Cell at Row {b_row} and Column {b_col}  removed {unknowns_eliminated_this_cell} "
                           f"known count {known_count} total_removed {total_removed} \t current unknown {current_unknowns}")
                     print(f"Round {round_counter}")
 
-            if known_count == 81 or total_removed == 0:
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # Count the known cells once per round, not once per cell, it scans the whole board
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            known_count = self.count_known_cells()
+            if known_count == self.side * self.side or total_removed == 0:
                 keep_going = False
 
+    @instrumented(strategy_name='eliminate_seen_values')
+    def eliminate_seen_values(self) -> int:
+        """
+        The purpose of this function is to remove, in one pass per round, every value already known in a cell's row,
+        column or parent square. It does the same work as remove_known_neighbors, column_solve and row_solve together
+        but gathers the known values once per round instead of once per cell, and never prints.
+        :return: number of eligible values removed
+        """
+        cells = self.board.ravel()
+        total_removed = 0
+        keep_going = True
+        while keep_going:
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # Collect the known values of every row, column and parent square in one go
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            row_knowns = [set() for _ in range(self.side)]
+            column_knowns = [set() for _ in range(self.side)]
+            square_knowns = dict()
+            for esv_cell in cells:
+                if esv_cell.answer_found:
+                    known_value = esv_cell.get_correct_answer_value()
+                    row_knowns[esv_cell.row].add(known_value)
+                    column_knowns[esv_cell.column].add(known_value)
+                    square_knowns.setdefault(esv_cell.parent_square, set()).add(known_value)
+
+            round_removed = 0
+            for esv_cell in cells:
+                if esv_cell.answer_found:
+                    continue
+                seen_values = row_knowns[esv_cell.row] | column_knowns[esv_cell.column]
+                seen_values |= square_knowns.get(esv_cell.parent_square, set())
+                if not seen_values:
+                    continue
+                before_count = esv_cell.eligible_numbers.number_of_eligible_values()
+                esv_cell.remove_values(removal_values=seen_values)
+                round_removed += before_count - esv_cell.eligible_numbers.number_of_eligible_values()
+
+            total_removed += round_removed
+            keep_going = bool(round_removed)
+        return total_removed
+
+    @instrumented(strategy_name='propagate')
+    def propagate(self) -> bool:
+        """
+        The purpose of this function is to push every known value out to its row, column and parent square through
+        the event driven PropagationQueue, so each elimination is only done once.
+        :return: False when the board ends up in a contradiction
+        """
+        propagation_queue = PropagationQueue(sudoku_board=self)
+        propagation_queue.push_known_cells()
+        return propagation_queue.run()
+
+    def checkpoint(self) -> int:
+        """
+        The purpose of this function is to mark the current state of the board so it can be rolled back to later.
+        The first checkpoint hands every cell the board's trail, from then on each change to the eligible numbers
+        records the old state on it. Taking a checkpoint after that costs nothing but reading the trail length.
+        :return: checkpoint to hand to rollback
+        """
+        if self.trail is None:
+            self.trail = list()
+            for c_eligible in self.candidates:
+                c_eligible.trail = self.trail
+        return len(self.trail)
+
+    def rollback(self, checkpoint: int = 0):
+        """
+        The purpose of this function is to undo every change made since a checkpoint, newest first. The cost depends
+        only on the number of changes made since.
+        :param checkpoint: value returned by checkpoint
+        :return:
+        """
+        trail = self.trail
+        if trail is None:
+            return
+        while len(trail) > checkpoint:
+            r_eligible, r_state = trail.pop()
+            r_eligible.restore_state(state=r_state)
+
+    def release_trail(self):
+        """
+        The purpose of this function is to stop recording changes and drop the trail, keeping the current state.
+        Checkpoints taken before are no longer valid.
+        :return:
+        """
+        for rt_eligible in self.candidates:
+            rt_eligible.trail = None
+        self.trail = None
+
+    def select_branch_cell(self):
+        """
+        The purpose of this function is to find the unsolved cell with the fewest remaining unknowns, the cell a
+        search guesses on next.
+        :return: the cell, or None when every cell is solved
+        """
+        best_cell = None
+        best_count = self.side + 1
+        for sbc_cell in self.board.flat:
+            remaining_count = sbc_cell.remaining_unknowns_count()
+            if remaining_count and remaining_count < best_count:
+                best_cell = sbc_cell
+                best_count = remaining_count
+                if best_count == 2:
+                    break
+        return best_cell
+
+    def _enumerate_solutions(self, propagation_queue: PropagationQueue = None) -> typing.Iterator[bool]:
+        """
+        The purpose of this function is to walk the search tree below the current state, depth first, and stop at
+        every solution with the board holding it. Each guess is checkpointed and rolled back once its subtree is done.
+        :param propagation_queue: queue of the board, holding the cells changed since the last propagation
+        :return: iterator that yields True each time the board is solved
+        """
+        keep_going = True
+        while keep_going:
+            if not propagation_queue.run():
+                return
+            keep_going = bool(self.place_hidden_singles(propagation_queue=propagation_queue))
+
+        branch_cell = self.select_branch_cell()
+        if branch_cell is None:
+            yield True
+            return
+
+        branch_index = int(branch_cell.row) * self.side + int(branch_cell.column)
+        for guess_value in tuple(branch_cell.get_remaining_unknowns()):
+            checkpoint = self.checkpoint()
+            saved_counts = propagation_queue.save_counts()
+            propagation_queue.assign_value(cell_index=branch_index, value=guess_value)
+            yield from self._enumerate_solutions(propagation_queue=propagation_queue)
+            self.rollback(checkpoint=checkpoint)
+            propagation_queue.restore_counts(saved_counts=saved_counts)
+
+    def iter_solutions(self, limit: int = None) -> typing.Iterator[np.array]:
+        """
+        The purpose of this function is to yield the solutions of the board one at a time, each found only when the
+        next one is asked for. The board is put back the way it was when the iterator finishes or is closed, so
+        stopping early costs nothing extra.
+        :param limit: stop after this many solutions, None for all of them
+        :return: iterator of side x side uint8 arrays
+        """
+        owns_trail = self.trail is None
+        start_checkpoint = self.checkpoint()
+        propagation_queue = PropagationQueue(sudoku_board=self)
+        propagation_queue.push_known_cells()
+        found = 0
+        try:
+            for _ in self._enumerate_solutions(propagation_queue=propagation_queue):
+                yield self.get_value_array()
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+        finally:
+            self.rollback(checkpoint=start_checkpoint)
+            if owns_trail:
+                self.release_trail()
+
+    def count_solutions(self, limit: int = 2) -> int:
+        """
+        The purpose of this function is to count the solutions of the board, stopping as soon as limit are found. With
+        the default limit of 2 it tells apart a puzzle with no solution, one solution or many without exploring the
+        rest of the tree. The board is left the way it was.
+        :param limit: stop counting at this many solutions, None to count them all
+        :return: number of solutions found, at most limit
+        """
+        owns_trail = self.trail is None
+        start_checkpoint = self.checkpoint()
+        propagation_queue = PropagationQueue(sudoku_board=self)
+        propagation_queue.push_known_cells()
+        found = 0
+        try:
+            for _ in self._enumerate_solutions(propagation_queue=propagation_queue):
+                found += 1
+                if limit is not None and found >= limit:
+                    break
+        finally:
+            self.rollback(checkpoint=start_checkpoint)
+            if owns_trail:
+                self.release_trail()
+        return found
+
+    def get_candidate_masks(self) -> list:
+        """
+        The purpose of this function is to get the eligible numbers of all 81 cells as bitmasks, in cell id order.
+        :return: list of 81 ints, side * side on bigger boards
+        """
+        return [x.get_mask() for x in self.candidates]
+
+    def eliminate_candidate_mask(self, cell_id: int = None, removal_mask: int = None) -> int:
+        """
+        The purpose of this function is to remove the numbers in removal_mask from one cell.
+        :param cell_id: row * side + column
+        :param removal_mask: bitmask of the numbers to remove
+        :return: number of eligible values actually removed
+        """
+        ecm_numbers = self.candidates[cell_id]
+        current_mask = ecm_numbers.get_mask()
+        removing = current_mask & removal_mask
+        if not removing:
+            return 0
+        if removing == current_mask:
+            raise SudokuContradiction(f"Cell {cell_id} would have no eligible values left", cell_id=cell_id)
+        ecm_numbers.eliminate_mask(to_eliminate=removing)
+        return removing.bit_count()
+
+    def apply_strategies(self, strategy_pipeline=None) -> bool:
+        """
+        The purpose of this function is to run a pipeline of deduction strategies on the board until none of them
+        makes progress.
+        :param strategy_pipeline: StrategyPipeline, the default pipeline when None
+        :return: False when the board ends up in a contradiction
+        """
+        if strategy_pipeline is None:
+            strategy_pipeline = StrategyPipeline()
+        return strategy_pipeline.run(sudoku_board=self)
+
+    def unit_cells(self) -> np.array:
+        """
+        The purpose of this function is to list the cells of the 27 units: 9 rows, 9 columns and 9 parent squares.
+        :return: (27, 9) array of SudokuCell, (3 * side, side) on bigger boards
+        """
+        units = self.board.ravel()[self.unit_index]
+        return units
+
+    def place_hidden_singles(self, propagation_queue: PropagationQueue = None) -> int:
+        """
+        The purpose of this function is to find numbers that have only one possible cell left in a row, column or
+        parent square and place them there.
+        :param propagation_queue: optional queue, placed cells are set through it so its counters stay right and
+        the new values get pushed to their peers on the next run
+        :return: number of cells solved
+        """
+        candidates = self.candidates
+        masks = self.get_candidate_masks()
+        placed = 0
+        for phs_unit in create_unit_tables(box_size=self.box_size).unit_cells:
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # One pass over the unit's masks finds the numbers seen in exactly one cell, seen_once & ~seen_twice
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            seen_once = 0
+            seen_twice = 0
+            for phs_index in phs_unit:
+                seen_twice |= seen_once & masks[phs_index]
+                seen_once |= masks[phs_index]
+            single_places = seen_once & ~seen_twice
+            if not single_places:
+                continue
+
+            for phs_index in phs_unit:
+                phs_mask = masks[phs_index]
+                phs_singles = phs_mask & single_places
+                if not phs_singles or phs_mask & (phs_mask - 1) == 0:
+                    continue
+                phs_value = (phs_singles & -phs_singles).bit_length() - 1
+                if propagation_queue is None:
+                    candidates[phs_index].set_value(set_value=phs_value)
+                else:
+                    propagation_queue.assign_value(cell_index=phs_index, value=phs_value)
+                masks[phs_index] = 1 << phs_value
+                placed += 1
+        return placed
+
+    def get_value_array(self) -> np.array:
+        """
+        The purpose of this function is to get the board as a 9 x 9 uint8 array with 0 for unsolved cells.
+        :return:
+        """
+        value_array = np.zeros(shape=(self.side, self.side), dtype=np.uint8)
+        for gva_row, gva_column in self.coordinates_list:
+            value_array[gva_row, gva_column] = self.board[gva_row, gva_column].get_correct_answer_value()
+        return value_array
+
+    def has_contradiction(self) -> bool:
+        """
+        The purpose of this function is to check if the board can no longer be solved, either because a cell ran out
+        of eligible numbers or because a row, column or parent square holds the same known value twice.
+        :return:
+        """
+        if 0 in self.get_candidate_masks():
+            return True
+        return bool(find_repeated_units(grids=self.get_value_array()).any())
+
     def board_display(self):
         display_string = str()
-        for i in nine_range:
-            for j in nine_range:
+        for i in range(self.side):
+            for j in range(self.side):
                 display_string += f"{self.board[i, j].get_correct_answer_value()} "
             display_string += '\n'
         trailing_text = f"unknowns {self.get_board_wide_unkowns_count()} solved {self.count_known_cells()}\n\n"
         display_string += trailing_text
         return display_string
 
-    def check_out_of_options(self):
-        cl = CoordinatesList.coordinates_list()
-        out_of_options_list = list()
-        for coo_row, coo_col in cl:
-            coo_cell = self.board[coo_row, coo_col]
-            remaining_options_count = coo_cell.eligible_numbers.base_array.sum()
-            if remaining_options_count == 0:
-                out_of_options_list.append((coo_row, coo_col))
-        if not out_of_options_list:
-            print(f"Out of options check ok")
-        else:
-            print(f"Out of options {copy(out_of_options_list)}")
+    def check_out_of_options(self) -> list:
+        """
+        The purpose of this function is to find the cells that have no eligible numbers left.
+        :return: list of (row, column) tuples, empty when the board is ok
+        """
+        masks = self.get_candidate_masks()
+        return [self.coordinates_list[x] for x, y in enumerate(masks) if not y]
@@ -0,0 +1,264 @@
+"""
+
+The purpose of this file is to store an event driven propagation scheduler for SudokuBoard. Instead of sweeping all 81
+cells every round, a cell is put on a work queue when its value becomes known, and only its 20 peers (same row,
+column and parent square) are visited to remove that value. The known and unknown counts are kept up to date on
+every elimination so nothing has to rescan the board.
+
+The queue also keeps, for every row, column and parent square, how many of its cells can still take each number.
+An elimination lowers three of those place counts, so a cell running out of numbers or a unit losing the last place
+for a number is seen at the elimination that caused it and the queue stops there with a SudokuContradiction.
+
+"""
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
+
+from Source.sudoku_utilities import BoardIndexTables
+from Source.sudoku_validation import SudokuContradiction
+
+
+@lru_cache(maxsize=8)
+def create_peer_index_tuple(box_size: int = 3) -> tuple:
+    """
+    The purpose of this function is to hold the peer table as tuples of python ints, which are quicker than numpy
+    scalars for the per element lookups of the queue.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return: tuple of 81 tuples of 20 cell ids, 625 tuples of 72 for 25 x 25
+    """
+    return tuple(tuple(x) for x in BoardIndexTables.peer_index_array(box_size=box_size).tolist())
+
+
+@lru_cache(maxsize=8)
+def create_place_base_tuple(box_size: int = 3) -> tuple:
+    """
+    The purpose of this function is to hold, for every cell, where the place counts of its row, column and parent
+    square start, unit_id * (side + 1), as tuples of python ints for the place count updates of the queue.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return: tuple of 81 tuples of 3 ints, side * side tuples on bigger boards
+    """
+    place_stride = box_size * box_size + 1
+    return tuple(tuple(x * place_stride for x in y)
+                 for y in BoardIndexTables.cell_unit_array(box_size=box_size).tolist())
+
+
+class PropagationQueue:
+    """
+    The purpose of this class is to push known values out to their peers, one queued cell at a time, until no new
+    cell becomes known.
+    """
+
+    def __init__(self, sudoku_board=None):
+        # The board's eligible numbers in cell id order, indexed directly so the loops skip the SudokuCell objects
+        self.cells = sudoku_board.candidates
+        self.peer_index = create_peer_index_tuple(box_size=sudoku_board.box_size)
+        self.place_bases = create_place_base_tuple(box_size=sudoku_board.box_size)
+        self.unit_index = BoardIndexTables.unit_index_array(box_size=sudoku_board.box_size)
+        self.queue = deque()
+        self.queued = [False] * len(self.cells)
+        self.eliminations = 0
+        self.known_count = 0
+        self.unknowns_count = 0
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # place_counts[unit_id * place_stride + number] is how many cells of the unit still have number eligible
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        self.place_stride = sudoku_board.side + 1
+        self.place_counts = [0] * (3 * sudoku_board.side * self.place_stride)
+        self.contradiction = None
+        self.recount()
+
+    def recount(self):
+        """
+        The purpose of this function is to set the known, unknown and place counters from scratch, needed only when
+        the cells were changed behind the queue's back. A cell or unit that is already stuck is kept as the
+        contradiction, so the next run stops straight away.
+        :return:
+        """
+        counts = [x.number_of_eligible_values() for x in self.cells]
+        self.known_count = sum(1 for x in counts if x == 1)
+        self.unknowns_count = sum(x for x in counts if x > 1)
+
+        masks = np.array([x.get_mask() for x in self.cells], dtype=np.int64)
+        number_flags = masks[:, None] >> np.arange(self.place_stride) & 1
+        unit_places = number_flags[self.unit_index].sum(axis=1)
+        self.place_counts = unit_places.ravel().tolist()
+
+        self.contradiction = None
+        if 0 in counts:
+            cell_index = counts.index(0)
+            self.contradiction = SudokuContradiction(f"Cell {cell_index} has no eligible numbers left",
+                                                     cell_id=cell_index)
+            return
+        blocked_places = np.argwhere(unit_places[:, 1:] == 0)
+        if len(blocked_places):
+            unit_id, number = int(blocked_places[0, 0]), int(blocked_places[0, 1]) + 1
+            self.contradiction = SudokuContradiction(f"Unit {unit_id} has no place left for {number}",
+                                                     unit_id=unit_id, number=number)
+
+    def save_counts(self) -> tuple:
+        """
+        The purpose of this function is to save the counters before a guess, so a search can put them back together
+        with the board when the guess fails.
+        :return: state for restore_counts
+        """
+        return self.known_count, self.unknowns_count, self.place_counts.copy()
+
+    def restore_counts(self, saved_counts: tuple = None):
+        """
+        The purpose of this function is to put the counters back as save_counts found them and drop any queued
+        cells and contradiction left over from the failed guess.
+        :param saved_counts: state returned by save_counts
+        :return:
+        """
+        self.clear()
+        self.known_count, self.unknowns_count, place_counts = saved_counts
+        self.place_counts = place_counts.copy()
+        self.contradiction = None
+
+    def remove_places(self, cell_index: int = None, removed_mask: int = None):
+        """
+        The purpose of this function is to lower the place counts of the cell's units for every number in
+        removed_mask, keeping the contradiction when a unit has no place left for one of them.
+        :param cell_index: row * side + column
+        :param removed_mask: bitmask of the numbers the cell lost
+        :return:
+        """
+        place_counts = self.place_counts
+        first_unit, second_unit, third_unit = self.place_bases[cell_index]
+        while removed_mask:
+            number_bit = removed_mask & -removed_mask
+            removed_mask ^= number_bit
+            number = number_bit.bit_length() - 1
+            place_counts[first_unit + number] -= 1
+            place_counts[second_unit + number] -= 1
+            place_counts[third_unit + number] -= 1
+            if self.contradiction is None and not (place_counts[first_unit + number]
+                                                   and place_counts[second_unit + number]
+                                                   and place_counts[third_unit + number]):
+                self.contradiction = self.blocked_unit(cell_index=cell_index, number=number)
+
+    def blocked_unit(self, cell_index: int = None, number: int = None) -> SudokuContradiction:
+        """
+        The purpose of this function is to describe the unit of a cell that has no place left for number.
+        :param cell_index: row * side + column of the cell that lost number last
+        :param number:
+        :return: SudokuContradiction
+        """
+        unit_base = next(x for x in self.place_bases[cell_index] if not self.place_counts[x + number])
+        unit_id = unit_base // self.place_stride
+        return SudokuContradiction(f"Unit {unit_id} has no place left for {number}", unit_id=unit_id, number=number)
+
+    def fail(self, contradiction: SudokuContradiction = None) -> bool:
+        """
+        The purpose of this function is to stop the queue at a contradiction.
+        :param contradiction: what went wrong
+        :return: False, for run to hand back
+        """
+        self.contradiction = contradiction
+        self.clear()
+        return False
+
+    def count_known_cells(self) -> int:
+        return self.known_count
+
+    def get_board_wide_unkowns_count(self) -> int:
+        return self.unknowns_count
+
+    def push(self, cell_index: int = None):
+        """
+        The purpose of this function is to queue a cell whose known value has to be removed from its peers.
+        :param cell_index: row * side + column
+        :return:
+        """
+        if not self.queued[cell_index]:
+            self.queued[cell_index] = True
+            self.queue.append(cell_index)
+
+    def push_known_cells(self):
+        """
+        The purpose of this function is to queue every cell that is already known, used to start from a fresh board.
+        :return:
+        """
+        for cell_index, pkc_numbers in enumerate(self.cells):
+            if pkc_numbers.answer_found():
+                self.push(cell_index=cell_index)
+
+    def assign_value(self, cell_index: int = None, value: int = None):
+        """
+        The purpose of this function is to set a cell to a known value, keep the counters right and queue the cell.
+        A unit left with no place for one of the numbers the cell gave up is kept as the contradiction and the next
+        run stops straight away.
+        :param cell_index: row * side + column
+        :param value: 1..side
+        :return:
+        """
+        av_numbers = self.cells[cell_index]
+        before_count = av_numbers.number_of_eligible_values()
+        before_mask = av_numbers.get_mask()
+        av_numbers.set_value(set_value=value)
+        if before_count != 1:
+            self.known_count += 1
+            self.unknowns_count -= before_count
+
+        value_bit = 1 << int(value)
+        if not before_mask & value_bit:
+            for unit_base in self.place_bases[cell_index]:
+                self.place_counts[unit_base + int(value)] += 1
+        self.remove_places(cell_index=cell_index, removed_mask=before_mask & ~value_bit)
+        self.push(cell_index=cell_index)
+
+    def clear(self):
+        for cell_index in self.queue:
+            self.queued[cell_index] = False
+        self.queue.clear()
+
+    def run(self) -> bool:
+        """
+        The purpose of this function is to work through the queue until it is empty. A peer that drops to one
+        eligible value is queued in turn.
+        :return: False when a contradiction is found, kept in self.contradiction: a peer that would lose its last
+        eligible value, or a unit left with no place for a number
+        """
+        if self.contradiction is not None:
+            return self.fail(contradiction=self.contradiction)
+
+        cells = self.cells
+        peer_index = self.peer_index
+        place_bases = self.place_bases
+        place_counts = self.place_counts
+        while self.queue:
+            cell_index = self.queue.popleft()
+            self.queued[cell_index] = False
+            known_value = int(cells[cell_index].get_correct_value())
+            if not known_value:
+                continue
+
+            for peer in peer_index[cell_index]:
+                peer_numbers = cells[peer]
+                if not peer_numbers.has_value(test_value=known_value):
+                    continue
+                before_count = peer_numbers.number_of_eligible_values()
+                if before_count == 1:
+                    return self.fail(contradiction=SudokuContradiction(
+                        f"Cell {peer} has no eligible numbers left", cell_id=peer, number=known_value))
+
+                peer_numbers.eliminate_value(to_eliminate=known_value)
+                self.eliminations += 1
+                first_unit, second_unit, third_unit = place_bases[peer]
+                place_counts[first_unit + known_value] -= 1
+                place_counts[second_unit + known_value] -= 1
+                place_counts[third_unit + known_value] -= 1
+                if not (place_counts[first_unit + known_value] and place_counts[second_unit + known_value]
+                        and place_counts[third_unit + known_value]):
+                    return self.fail(contradiction=self.blocked_unit(cell_index=peer, number=known_value))
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                # Solved cells count 0 towards the unknowns, so a cell going from 2 to 1 drops 2 unknowns
+                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                if before_count == 2:
+                    self.known_count += 1
+                    self.unknowns_count -= 2
+                    self.push(cell_index=peer)
+                else:
+                    self.unknowns_count -= 1
+        return True
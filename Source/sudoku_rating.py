@@ -0,0 +1,240 @@
+"""
+
+The purpose of this file is to store the difficulty rating engine. A puzzle is rated by solving it the way a person
+would: the deduction strategies run cheapest first through a StrategyPipeline, and only when they all stall does a
+backtracking search take over, each of its guesses counted as a step harder than any strategy.
+
+The grade is the cost of the hardest step needed, plus a fraction below 1 that grows with how many steps of each
+cost were needed, so a puzzle never grades past the next strategy up however long it is. The tier is read off the
+hardest step.
+
+Rating runs the singles through the board's PropagationQueue, so a puzzle the singles solve costs about as much as a
+plain solve.
+
+Usage: python -m Source.sudoku_rating corpus.txt --workers 8 --output ratings.csv
+
+"""
+import argparse
+import os
+import sys
+import time
+import typing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from Source.sudoku_cli import digit_byte_lookup
+from Source.sudoku_loader import stream_puzzles
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_propagation import PropagationQueue
+from Source.sudoku_search import BacktrackingSearch
+from Source.sudoku_strategies import StrategyPipeline, create_default_strategies
+from Source.sudoku_validation import check_puzzles
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# A guess costs more than any strategy. Tiers are (label, highest step cost allowed), checked in order.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+GUESS_NAME = 'guessing'
+GUESS_COST = 10
+RATING_TIERS = (
+    ('easy', 2),
+    ('medium', 4),
+    ('hard', 6),
+    ('expert', 9),
+    ('diabolical', GUESS_COST),
+)
+INVALID_TIER = 'invalid'
+UNSOLVABLE_TIER = 'unsolvable'
+# Weighted steps at which the fractional part of the grade reaches one half
+GRADE_HALF_WEIGHT = 50
+
+
+class PuzzleRating(typing.NamedTuple):
+    """
+    The purpose of this class is to hold the rating of one puzzle.
+    grade: cost of the hardest step plus a fraction for the amount of work, 0.0 for an invalid or unsolvable puzzle
+    tier: label from RATING_TIERS, or INVALID_TIER or UNSOLVABLE_TIER
+    hardest: name of the hardest strategy needed, GUESS_NAME when the strategies were not enough, None when nothing
+    was needed
+    usage: strategy name to the number of times it made progress, with GUESS_NAME for the guesses, only the ones used
+    solved: True when a solution was found
+    """
+    grade: float
+    tier: str
+    hardest: str
+    usage: dict
+    solved: bool
+
+
+def tier_for_cost(step_cost: int = None) -> str:
+    """
+    The purpose of this function is to find the tier label of the hardest step cost.
+    :param step_cost: cost of the hardest step, 0 when nothing was needed
+    :return: tier label
+    """
+    return next((x for x, y in RATING_TIERS if step_cost <= y), RATING_TIERS[-1][0])
+
+
+def grade_usage(usage: dict = None, step_costs: dict = None) -> tuple:
+    """
+    The purpose of this function is to turn the steps a solve needed into a grade.
+    :param usage: strategy name to the number of times it made progress
+    :param step_costs: strategy name to its cost, GUESS_NAME included
+    :return: grade, cost of the hardest step
+    """
+    hardest_cost = max((step_costs[x] for x in usage), default=0)
+    weighted_steps = sum(step_costs[x] * y for x, y in usage.items())
+    return round(hardest_cost + weighted_steps / (weighted_steps + GRADE_HALF_WEIGHT), 3), hardest_cost
+
+
+def rate_puzzle(puzzle_array: np.array = None, strategies: list = None, validate: bool = True) -> PuzzleRating:
+    """
+    The purpose of this function is to rate a puzzle by the deductions needed to solve it. The strategies run on the
+    board and its PropagationQueue to a fixed point, and when cells are still open a search from that point counts
+    the guesses.
+    :param puzzle_array: 9 x 9 uint8 array, 0 for empty cells, or side x side for a bigger box size
+    :param strategies: DeductionStrategy objects, the default strategies when None
+    :param validate: check the givens first, rate_puzzle_chunk checks a whole chunk at once and turns it off
+    :return: PuzzleRating
+    """
+    if validate and not check_puzzles(puzzles=puzzle_array).valid[0]:
+        return PuzzleRating(grade=0.0, tier=INVALID_TIER, hardest=None, usage=dict(), solved=False)
+
+    strategy_pipeline = StrategyPipeline(strategies=strategies)
+    sudoku_board = SudokuBoard(start_board_array=puzzle_array)
+    propagation_queue = PropagationQueue(sudoku_board=sudoku_board)
+    propagation_queue.push_known_cells()
+    solved = strategy_pipeline.run(sudoku_board=sudoku_board, propagation_queue=propagation_queue)
+    usage = {x: y for x, y in strategy_pipeline.usage.items() if y}
+
+    if solved and propagation_queue.count_known_cells() < len(sudoku_board.candidates):
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # The search starts where the strategies stalled, every node after the first one is a guess
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        backtracking_search = BacktrackingSearch()
+        solved = backtracking_search.search_board(sudoku_board=sudoku_board, propagation_queue=propagation_queue)
+        usage[GUESS_NAME] = backtracking_search.nodes_visited - 1
+    if not solved:
+        return PuzzleRating(grade=0.0, tier=UNSOLVABLE_TIER, hardest=None, usage=usage, solved=False)
+
+    step_costs = {x.name: x.cost for x in strategy_pipeline.strategies}
+    step_costs[GUESS_NAME] = GUESS_COST
+    grade, hardest_cost = grade_usage(usage=usage, step_costs=step_costs)
+    hardest = max(usage, key=step_costs.get) if usage else None
+    return PuzzleRating(grade=grade, tier=tier_for_cost(step_cost=hardest_cost), hardest=hardest, usage=usage,
+                        solved=True)
+
+
+def rate_puzzle_chunk(puzzle_chunk: np.array = None) -> list:
+    """
+    The purpose of this function is to rate a chunk of puzzles, used as the work unit of rate_puzzles. The givens of
+    the whole chunk are checked in one vectorised call.
+    :param puzzle_chunk: (k, 9, 9) uint8 array
+    :return: list of k PuzzleRating
+    """
+    valid = check_puzzles(puzzles=puzzle_chunk).valid
+    invalid_rating = PuzzleRating(grade=0.0, tier=INVALID_TIER, hardest=None, usage=dict(), solved=False)
+    return [rate_puzzle(puzzle_array=x, validate=False) if y else invalid_rating for x, y in zip(puzzle_chunk, valid)]
+
+
+def rate_puzzles(puzzle_chunks: typing.Iterable = None, workers: int = None) -> typing.Iterator[tuple]:
+    """
+    The purpose of this function is to rate puzzles across a process pool, yielded in input order as they finish.
+    Only a small window of chunks is in flight at a time, so a corpus is never loaded whole.
+    :param puzzle_chunks: iterable of (k, 9, 9) uint8 arrays, as yielded by stream_puzzles
+    :param workers: number of worker processes, all cores when None, 1 rates in this process
+    :return: iterator of (puzzle array, PuzzleRating)
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for puzzle_chunk in puzzle_chunks:
+            yield from zip(puzzle_chunk, rate_puzzle_chunk(puzzle_chunk=puzzle_chunk))
+        return
+
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for puzzle_chunk in puzzle_chunks:
+            in_flight.append((puzzle_chunk, executor.submit(rate_puzzle_chunk, puzzle_chunk)))
+            if len(in_flight) >= workers * 2:
+                done_chunk, chunk_future = in_flight.popleft()
+                yield from zip(done_chunk, chunk_future.result())
+        while in_flight:
+            done_chunk, chunk_future = in_flight.popleft()
+            yield from zip(done_chunk, chunk_future.result())
+
+
+def rating_header_line(strategy_names: list = None) -> str:
+    return ','.join(['puzzle', 'grade', 'tier', 'hardest'] + strategy_names + [GUESS_NAME]) + '\n'
+
+
+def format_rating_line(puzzle_array: np.array = None, puzzle_rating: PuzzleRating = None,
+                       strategy_names: list = None) -> str:
+    """
+    The purpose of this function is to turn a rating into one CSV line, the puzzle as digits followed by the grade,
+    tier, hardest step and the usage count of every strategy. A cell the loader could not read shows as '?', so the
+    puzzle column always holds one character per cell.
+    :param puzzle_array:
+    :param puzzle_rating:
+    :param strategy_names: names in column order
+    :return:
+    """
+    usage_counts = [str(puzzle_rating.usage.get(x, 0)) for x in strategy_names + [GUESS_NAME]]
+    puzzle_text = digit_byte_lookup[puzzle_array.ravel()].tobytes().decode('ascii')
+    return ','.join([puzzle_text, f"{puzzle_rating.grade:.3f}",
+                     puzzle_rating.tier, puzzle_rating.hardest or ''] + usage_counts) + '\n'
+
+
+def rate_corpus(corpus_path: Path = None, output_stream=None, workers: int = None, chunk_size: int = 256) -> dict:
+    """
+    The purpose of this function is to rate every puzzle in a corpus and stream one CSV line per puzzle, in input
+    order, to output_stream as each chunk comes back.
+    :param corpus_path: line based or packed puzzle file
+    :param output_stream: text stream the CSV lines are written to
+    :param workers: number of worker processes, all cores when None
+    :param chunk_size: puzzles per work unit
+    :return: tier label to number of puzzles
+    """
+    strategy_names = [x.name for x in create_default_strategies()]
+    output_stream.write(rating_header_line(strategy_names=strategy_names))
+    tier_counts = dict()
+    puzzle_chunks = stream_puzzles(puzzle_path=corpus_path, chunk_size=chunk_size)
+    for puzzle_array, puzzle_rating in rate_puzzles(puzzle_chunks=puzzle_chunks, workers=workers):
+        output_stream.write(format_rating_line(puzzle_array=puzzle_array, puzzle_rating=puzzle_rating,
+                                               strategy_names=strategy_names))
+        tier_counts[puzzle_rating.tier] = tier_counts.get(puzzle_rating.tier, 0) + 1
+    return tier_counts
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(description="Rate the difficulty of every puzzle in a sudoku corpus.")
+    argument_parser.add_argument('corpus', type=Path, help="text, CSV or .sdkp file with one puzzle per line")
+    argument_parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes, default all cores")
+    argument_parser.add_argument('-c', '--chunk-size', type=int, default=256, help="puzzles per work unit")
+    argument_parser.add_argument('-o', '--output', type=Path, default=None, help="CSV file, default stdout")
+    return argument_parser
+
+
+def main(argv: list = None) -> int:
+    arguments = create_argument_parser().parse_args(argv)
+    start_time = time.perf_counter()
+    if arguments.output is None:
+        tier_counts = rate_corpus(corpus_path=arguments.corpus, output_stream=sys.stdout, workers=arguments.workers,
+                                  chunk_size=arguments.chunk_size)
+        sys.stdout.flush()
+    else:
+        with open(arguments.output, 'w', newline='') as output_stream:
+            tier_counts = rate_corpus(corpus_path=arguments.corpus, output_stream=output_stream,
+                                      workers=arguments.workers, chunk_size=arguments.chunk_size)
+    elapsed = time.perf_counter() - start_time
+    puzzle_count = sum(tier_counts.values())
+    throughput = puzzle_count / elapsed if elapsed else 0.0
+    tier_summary = ', '.join(f"{x} {y}" for x, y in tier_counts.items())
+    print(f"Rated {puzzle_count} puzzles in {elapsed:.2f}s ({throughput:.1f} puzzles/sec): {tier_summary}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
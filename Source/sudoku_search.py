@@ -0,0 +1,170 @@
+"""
+
+The purpose of this file is to store a depth first search that takes over when the propagation in SudokuBoard stalls.
+The search branches on the unsolved cell with the fewest eligible numbers (minimum remaining values), propagates
+after every guess and backs up as soon as a guess leads to a contradiction.
+
+"""
+import time
+import typing
+
+import numpy as np
+
+from Source.sudoku_instrumentation import SolveStats
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_propagation import PropagationQueue
+from Source.sudoku_strategies import StrategyPipeline
+
+
+class SearchResult(typing.NamedTuple):
+    """
+    The purpose of this class is to hold the result of a search.
+    """
+    solved: bool
+    grid: np.ndarray
+    nodes_visited: int
+    backtracks: int
+    elapsed: float
+    stats: SolveStats = None
+
+
+def propagate_board(sudoku_board: SudokuBoard = None, propagation_queue: PropagationQueue = None,
+                    strategy_pipeline: StrategyPipeline = None) -> bool:
+    """
+    The purpose of this function is to run the queued row, column and parent square eliminations, then place hidden
+    singles, until neither makes progress. When a strategy pipeline is given its stronger deductions run last.
+    :param sudoku_board:
+    :param propagation_queue: queue holding the cells whose values have not been pushed to their peers yet
+    :param strategy_pipeline: optional StrategyPipeline
+    :return: False when the board ends up in a contradiction
+    """
+    solve_stats = sudoku_board.solve_stats
+    keep_going = True
+    while keep_going:
+        if solve_stats is None:
+            if not propagation_queue.run():
+                return False
+            keep_going = bool(sudoku_board.place_hidden_singles(propagation_queue=propagation_queue))
+            continue
+
+        if not solve_stats.measure(strategy_name='propagation_queue', sudoku_board=sudoku_board,
+                                   strategy_call=propagation_queue.run, propagation_queue=propagation_queue):
+            return False
+        placed = solve_stats.measure(strategy_name='hidden_singles', sudoku_board=sudoku_board,
+                                     strategy_call=lambda: sudoku_board.place_hidden_singles(
+                                         propagation_queue=propagation_queue), propagation_queue=propagation_queue)
+        keep_going = bool(placed)
+
+    if strategy_pipeline is not None:
+        return strategy_pipeline.run(sudoku_board=sudoku_board, propagation_queue=propagation_queue)
+    return True
+
+
+def select_branch_cell(sudoku_board: SudokuBoard = None):
+    """
+    The purpose of this function is to find the unsolved cell with the fewest remaining unknowns.
+    :param sudoku_board:
+    :return: the cell, or None when every cell is solved
+    """
+    return sudoku_board.select_branch_cell()
+
+
+class BacktrackingSearch:
+    """
+    The purpose of this class is to solve a board by propagation plus depth first search with MRV branching.
+    """
+
+    def __init__(self, start_board_array: np.array = None, strategy_pipeline: StrategyPipeline = None,
+                 solve_stats: SolveStats = None, value_order: typing.Callable = None):
+        self.start_board_array = start_board_array
+        self.strategy_pipeline = strategy_pipeline
+        self.solve_stats = solve_stats
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Optional callable that reorders the guesses of a branch cell, the generator passes a random permutation
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        self.value_order = value_order
+        self.nodes_visited = 0
+        self.backtracks = 0
+
+    def _search(self, sudoku_board: SudokuBoard = None, propagation_queue: PropagationQueue = None) -> SudokuBoard | None:
+        """
+        The purpose of this function is to propagate one node of the search tree and branch on its best cell.
+        :param sudoku_board:
+        :param propagation_queue: queue of the board, holding the cells changed since the last propagation
+        :return: the solved board, or None when this branch has no solution
+        """
+        self.nodes_visited += 1
+        if not propagate_board(sudoku_board=sudoku_board, propagation_queue=propagation_queue,
+                               strategy_pipeline=self.strategy_pipeline):
+            return None
+
+        branch_cell = select_branch_cell(sudoku_board=sudoku_board)
+        if branch_cell is None:
+            return sudoku_board
+
+        branch_index = int(branch_cell.row) * sudoku_board.side + int(branch_cell.column)
+        guess_values = tuple(branch_cell.get_remaining_unknowns())
+        if self.value_order is not None:
+            guess_values = self.value_order(guess_values)
+        for guess_value in guess_values:
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # Checkpoint before guessing, a dead branch is undone from the trail along with the queue's counters
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            checkpoint = sudoku_board.checkpoint()
+            saved_counts = propagation_queue.save_counts()
+            propagation_queue.assign_value(cell_index=branch_index, value=guess_value)
+            solved_board = self._search(sudoku_board=sudoku_board, propagation_queue=propagation_queue)
+            if solved_board is not None:
+                return solved_board
+            self.backtracks += 1
+            sudoku_board.rollback(checkpoint=checkpoint)
+            propagation_queue.restore_counts(saved_counts=saved_counts)
+        return None
+
+    def search_board(self, sudoku_board: SudokuBoard = None, propagation_queue: PropagationQueue = None) -> bool:
+        """
+        The purpose of this function is to search a board that is already set up, in place. On success the board is
+        left solved, a caller that took a checkpoint first rolls it back to use it again, so one board and queue can
+        serve many searches without being rebuilt.
+        :param sudoku_board:
+        :param propagation_queue: queue of the board with the known cells pushed and its counters right
+        :return: True when a solution was found
+        """
+        self.nodes_visited = 0
+        self.backtracks = 0
+        return self._search(sudoku_board=sudoku_board, propagation_queue=propagation_queue) is not None
+
+    def solve(self) -> SearchResult:
+        """
+        The purpose of this function is to run the search from the starting board.
+        :return: SearchResult
+        """
+        start_time = time.perf_counter()
+        self.nodes_visited = 0
+        self.backtracks = 0
+        sudoku_board = SudokuBoard(start_board_array=self.start_board_array, solve_stats=self.solve_stats)
+        propagation_queue = PropagationQueue(sudoku_board=sudoku_board)
+        propagation_queue.push_known_cells()
+        solved_board = self._search(sudoku_board=sudoku_board, propagation_queue=propagation_queue)
+        elapsed = time.perf_counter() - start_time
+
+        if solved_board is None:
+            grid = sudoku_board.get_value_array()
+        else:
+            grid = solved_board.get_value_array()
+        return SearchResult(solved=solved_board is not None, grid=grid, nodes_visited=self.nodes_visited,
+                            backtracks=self.backtracks, elapsed=elapsed, stats=self.solve_stats)
+
+
+def search_solve(start_board_array: np.array = None, strategy_pipeline: StrategyPipeline = None,
+                 solve_stats: SolveStats = None) -> SearchResult:
+    """
+    The purpose of this function is to solve a 9 x 9 puzzle array with propagation and backtracking search. Bigger
+    puzzles, 16 x 16 or 25 x 25, are solved the same way.
+    :param start_board_array: 9 x 9 uint8 array, 0 for empty cells, or side x side for a bigger box size
+    :param strategy_pipeline: optional StrategyPipeline run at every node for stronger propagation
+    :param solve_stats: optional SolveStats that records what each strategy did during the search
+    :return: SearchResult
+    """
+    return BacktrackingSearch(start_board_array=start_board_array, strategy_pipeline=strategy_pipeline,
+                              solve_stats=solve_stats).solve()
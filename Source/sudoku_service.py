@@ -0,0 +1,414 @@
+"""
+
+The purpose of this file is to store a local solve service, so other programs can send puzzles to one long running
+process instead of importing the package or starting main.py for every puzzle.
+
+The protocol is one JSON object per line, over localhost TCP or a Unix socket:
+    request   {"id": 7, "puzzle": "003020600900305001..."}      81 characters, 0 or . for empty cells
+    response  {"id": 7, "solved": true, "solution": "483921657...", "latency_ms": 1.9}
+    metrics   {"id": 8, "command": "metrics"}  answered with {"id": 8, "metrics": {...}}
+A request that cannot be read is answered with {"id": ..., "error": "..."}. Responses come back as their batch
+finishes, not in request order, the id says which request each one answers.
+
+Puzzles wait in a bounded queue and are solved in micro-batches, a batch is closed when it reaches max_batch_size or
+max_batch_delay after its first puzzle. When the queue is full a connection stops being read until there is room,
+so a fast client is slowed down instead of the service running out of memory.
+
+Usage: python -m Source.sudoku_service --port 8765
+       python -m Source.sudoku_service --unix /tmp/sudoku.sock --workers 4
+
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+import typing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from Source.sudoku_instrumentation import summarize_latencies
+from Source.sudoku_solver import SOLVE_METHODS, solve_puzzle_batch
+
+
+class PendingRequest(typing.NamedTuple):
+    """
+    The purpose of this class is to hold one puzzle waiting in the queue.
+    """
+    request_id: typing.Any
+    puzzle_array: np.ndarray
+    future: asyncio.Future
+    received: float
+
+
+def parse_puzzle(puzzle_string: str = None) -> np.array:
+    """
+    The purpose of this function is to read an 81 character puzzle string, 0 or . for empty cells.
+    :param puzzle_string:
+    :return: 9 x 9 uint8 array
+    """
+    if not isinstance(puzzle_string, str) or len(puzzle_string) != 81:
+        raise ValueError("A puzzle must be a string of 81 characters")
+    puzzle_bytes = np.frombuffer(puzzle_string.replace('.', '0').encode(), dtype=np.uint8)
+    if ((puzzle_bytes < ord('0')) | (puzzle_bytes > ord('9'))).any():
+        raise ValueError("A puzzle may only hold the digits 0 through 9 and .")
+    return (puzzle_bytes - ord('0')).reshape(9, 9)
+
+
+def encode_message(message: dict = None) -> bytes:
+    return json.dumps(message).encode() + b'\n'
+
+
+class ServiceMetrics:
+    """
+    The purpose of this class is to count what the service has done. Latencies are kept for the most recent requests
+    only, so a long running service does not grow without limit.
+    """
+
+    def __init__(self, latency_window: int = 10_000):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.responses = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_puzzles = 0
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=latency_window)
+
+    def as_dict(self, queue_depth: int = 0) -> dict:
+        uptime = time.perf_counter() - self.started
+        metrics = {'uptime': uptime, 'requests': self.requests, 'responses': self.responses, 'errors': self.errors,
+                   'batches': self.batches, 'queue_depth': queue_depth, 'max_queue_depth': self.max_queue_depth,
+                   'mean_batch_size': self.batched_puzzles / self.batches if self.batches else 0.0,
+                   'throughput': self.responses / uptime if uptime else 0.0}
+        if self.latencies:
+            metrics['latency'] = summarize_latencies(latencies=list(self.latencies))
+        return metrics
+
+
+class SolveService:
+    """
+    The purpose of this class is to accept puzzles from socket connections, solve them in micro-batches and send the
+    solutions back with the ids they came with.
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_batch_delay: float = 0.005, max_queue_size: int = 1024,
+                 method: str = 'search', workers: int = None):
+        """
+        :param max_batch_size: most puzzles solved in one batch
+        :param max_batch_delay: seconds a batch waits for more puzzles after its first one
+        :param max_queue_size: puzzles that can wait before connections stop being read
+        :param method: name of the solver used for the puzzles batch propagation leaves stuck, a key of SOLVE_METHODS
+        :param workers: worker processes that solve batches side by side, None solves one batch at a time in a thread
+        """
+        if method not in SOLVE_METHODS:
+            raise ValueError(f"Unknown solve method {method}, choose from {sorted(SOLVE_METHODS)}")
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.max_queue_size = max_queue_size
+        self.method = method
+        self.workers = workers
+        self.metrics = ServiceMetrics()
+        self.request_queue = None
+        self.batch_slots = None
+        self.executor = None
+        self.server = None
+        self.batcher_task = None
+        self.batch_tasks = set()
+
+    @property
+    def address(self):
+        """
+        The purpose of this property is to get the address the service listens on, (host, port) or the socket path.
+        :return:
+        """
+        return self.server.sockets[0].getsockname()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0, unix_path: str = None):
+        """
+        The purpose of this function is to start listening and start the batcher. Port 0 picks a free port.
+        :param host:
+        :param port:
+        :param unix_path: listen on this Unix socket instead of TCP
+        :return:
+        """
+        self.request_queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.batch_slots = asyncio.Semaphore(self.workers or 1)
+        if self.workers:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        if unix_path is None:
+            self.server = await asyncio.start_server(self.handle_connection, host=host, port=port)
+        else:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        self.batcher_task = asyncio.create_task(self.run_batches())
+
+    async def close(self):
+        """
+        The purpose of this function is to stop listening, stop the batcher and shut the worker processes down.
+        :return:
+        """
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher_task.cancel()
+        await asyncio.gather(self.batcher_task, *self.batch_tasks, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+    async def collect_batch(self) -> list:
+        """
+        The purpose of this function is to wait for a puzzle, then take more until the batch is full or its deadline
+        has passed.
+        :return: list of PendingRequest
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self.request_queue.get()]
+        deadline = loop.time() + self.max_batch_delay
+        while len(batch) < self.max_batch_size:
+            if not self.request_queue.empty():
+                batch.append(self.request_queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.request_queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run_batches(self):
+        """
+        The purpose of this function is to keep collecting batches while a batch slot is free. With every slot busy
+        the queue fills up and the connections stop being read, which is the back-pressure.
+        :return:
+        """
+        while True:
+            await self.batch_slots.acquire()
+            try:
+                batch = await self.collect_batch()
+            except BaseException:
+                self.batch_slots.release()
+                raise
+            batch_task = asyncio.create_task(self.solve_batch(batch=batch))
+            self.batch_tasks.add(batch_task)
+            batch_task.add_done_callback(self.batch_tasks.discard)
+
+    async def solve_batch(self, batch: list = None):
+        """
+        The purpose of this function is to solve one batch off the event loop and hand each puzzle its result.
+        :param batch: list of PendingRequest
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            puzzle_chunk = np.stack([x.puzzle_array for x in batch])
+            batch_worker = partial(solve_puzzle_batch, puzzle_chunk, method=self.method)
+            solutions = await loop.run_in_executor(self.executor, batch_worker)
+        except Exception as batch_error:
+            for pending_request in batch:
+                if not pending_request.future.done():
+                    pending_request.future.set_exception(batch_error)
+            return
+        finally:
+            self.batch_slots.release()
+
+        self.metrics.batches += 1
+        self.metrics.batched_puzzles += len(batch)
+        for pending_request, solution in zip(batch, solutions):
+            if not pending_request.future.done():
+                pending_request.future.set_result(solution)
+
+    def read_request(self, request_line: bytes = None) -> tuple:
+        """
+        The purpose of this function is to read one request line.
+        :param request_line:
+        :return: request id, the request dict
+        """
+        try:
+            request = json.loads(request_line)
+        except json.JSONDecodeError:
+            raise ValueError("A request must be one JSON object per line") from None
+        if not isinstance(request, dict):
+            raise ValueError("A request must be one JSON object per line")
+        return request.get('id'), request
+
+    async def respond(self, writer: asyncio.StreamWriter = None, write_lock: asyncio.Lock = None,
+                      pending_request: PendingRequest = None):
+        """
+        The purpose of this function is to wait for a puzzle's result and write the response line.
+        :param writer: stream of the connection the request came on
+        :param write_lock: lock of the connection, so responses are drained one at a time
+        :param pending_request:
+        :return:
+        """
+        try:
+            solution = await pending_request.future
+        except Exception as solve_error:
+            self.metrics.errors += 1
+            response = {'id': pending_request.request_id, 'error': str(solve_error)}
+        else:
+            latency = time.perf_counter() - pending_request.received
+            self.metrics.latencies.append(latency)
+            solved = bool(solution.all())
+            response = {'id': pending_request.request_id, 'solved': solved,
+                        'solution': ''.join(str(x) for x in solution.ravel().tolist()) if solved else None,
+                        'latency_ms': latency * 1e3}
+        self.metrics.responses += 1
+        async with write_lock:
+            writer.write(encode_message(response))
+            await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader = None, writer: asyncio.StreamWriter = None):
+        """
+        The purpose of this function is to read the request lines of one connection and queue their puzzles. Each
+        puzzle gets a task that writes its response when its batch is done.
+        :param reader:
+        :param writer:
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        write_lock = asyncio.Lock()
+        response_tasks = set()
+        try:
+            while request_line := await reader.readline():
+                if not request_line.strip():
+                    continue
+                self.metrics.requests += 1
+                request_id = None
+                try:
+                    request_id, request = self.read_request(request_line=request_line)
+                    if request.get('command') == 'metrics':
+                        response = {'id': request_id, 'metrics': self.metrics.as_dict(
+                            queue_depth=self.request_queue.qsize())}
+                        self.metrics.responses += 1
+                        async with write_lock:
+                            writer.write(encode_message(response))
+                            await writer.drain()
+                        continue
+                    puzzle_array = parse_puzzle(puzzle_string=request.get('puzzle'))
+                except ValueError as request_error:
+                    self.metrics.errors += 1
+                    self.metrics.responses += 1
+                    async with write_lock:
+                        writer.write(encode_message({'id': request_id, 'error': str(request_error)}))
+                        await writer.drain()
+                    continue
+
+                pending_request = PendingRequest(request_id=request_id, puzzle_array=puzzle_array,
+                                                 future=loop.create_future(), received=time.perf_counter())
+                await self.request_queue.put(pending_request)
+                self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.request_queue.qsize())
+                response_task = asyncio.create_task(self.respond(writer=writer, write_lock=write_lock,
+                                                                 pending_request=pending_request))
+                response_tasks.add(response_task)
+                response_task.add_done_callback(response_tasks.discard)
+            await asyncio.gather(*response_tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class SolveClient:
+    """
+    The purpose of this class is to talk to a SolveService. Requests get ids from a counter and any number can be
+    waiting at once, a reader task hands each response to the request with the same id.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader = None, writer: asyncio.StreamWriter = None):
+        self.reader = reader
+        self.writer = writer
+        self.request_ids = itertools.count(1)
+        self.waiting = dict()
+        self.reader_task = asyncio.create_task(self.read_responses())
+
+    @classmethod
+    async def connect(cls, host: str = '127.0.0.1', port: int = None, unix_path: str = None):
+        if unix_path is None:
+            reader, writer = await asyncio.open_connection(host=host, port=port)
+        else:
+            reader, writer = await asyncio.open_unix_connection(path=unix_path)
+        return cls(reader=reader, writer=writer)
+
+    async def read_responses(self):
+        while response_line := await self.reader.readline():
+            response = json.loads(response_line)
+            response_future = self.waiting.pop(response.get('id'), None)
+            if response_future is not None and not response_future.done():
+                response_future.set_result(response)
+        for response_future in self.waiting.values():
+            if not response_future.done():
+                response_future.set_exception(ConnectionError("The service closed the connection"))
+
+    async def request(self, message: dict = None) -> dict:
+        """
+        The purpose of this function is to send one request and wait for its response.
+        :param message: request without an id
+        :return: response dict
+        """
+        request_id = next(self.request_ids)
+        response_future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = response_future
+        self.writer.write(encode_message({'id': request_id, **message}))
+        await self.writer.drain()
+        return await response_future
+
+    async def solve(self, puzzle_string: str = None) -> dict:
+        return await self.request(message={'puzzle': puzzle_string})
+
+    async def get_metrics(self) -> dict:
+        response = await self.request(message={'command': 'metrics'})
+        return response['metrics']
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.reader_task.cancel()
+        await asyncio.gather(self.reader_task, return_exceptions=True)
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8765, unix_path: str = None, **service_options):
+    """
+    The purpose of this function is to run a SolveService until the process is stopped.
+    :return:
+    """
+    solve_service = SolveService(**service_options)
+    await solve_service.start(host=host, port=port, unix_path=unix_path)
+    print(f"Sudoku solve service listening on {solve_service.address}", file=sys.stderr)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await solve_service.close()
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(description="Serve sudoku solving over a local socket.")
+    argument_parser.add_argument('--host', default='127.0.0.1')
+    argument_parser.add_argument('-p', '--port', type=int, default=8765)
+    argument_parser.add_argument('-u', '--unix', default=None, help="listen on a Unix socket path instead of TCP")
+    argument_parser.add_argument('-b', '--batch-size', type=int, default=32, help="most puzzles per batch")
+    argument_parser.add_argument('-d', '--batch-delay-ms', type=float, default=5.0,
+                                 help="milliseconds a batch waits for more puzzles")
+    argument_parser.add_argument('-q', '--queue-size', type=int, default=1024, help="puzzles that can wait")
+    argument_parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes, default none")
+    argument_parser.add_argument('-m', '--method', choices=sorted(SOLVE_METHODS), default='search')
+    return argument_parser
+
+
+def main(argv: list = None) -> int:
+    arguments = create_argument_parser().parse_args(argv)
+    try:
+        asyncio.run(serve(host=arguments.host, port=arguments.port, unix_path=arguments.unix,
+                          max_batch_size=arguments.batch_size, max_batch_delay=arguments.batch_delay_ms / 1e3,
+                          max_queue_size=arguments.queue_size, method=arguments.method, workers=arguments.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
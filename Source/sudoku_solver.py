@@ -0,0 +1,202 @@
+"""
+
+The purpose of this file is to store the single entry point used to solve a puzzle array with any of the solvers,
+and the library level solve function that runs the board sweeps to a fixed point before handing over to them.
+
+"""
+import time
+import typing
+
+import numpy as np
+
+from Source.sudoku_batch import solve_batch, STATUS_SOLVED, STATUS_STUCK
+from Source.sudoku_dlx import dlx_solve
+from Source.sudoku_engines import create_board
+from Source.sudoku_instrumentation import SolveStats, board_progress
+from Source.sudoku_search import search_solve
+from Source.sudoku_validation import SudokuContradiction, check_puzzles, find_repeated_units
+
+
+def _search_method(start_board_array: np.array = None) -> np.array:
+    search_result = search_solve(start_board_array=start_board_array)
+    if not search_result.solved:
+        return None
+    return search_result.grid
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# search is SudokuBoard propagation plus backtracking, dlx is the exact cover solver for the worst case puzzles
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+SOLVE_METHODS = {
+    'search': _search_method,
+    'dlx': dlx_solve,
+}
+
+
+def solve_puzzle(puzzle_array: np.array = None, method: str = 'search') -> np.array:
+    """
+    The purpose of this function is to solve a puzzle array with the chosen solver.
+    :param puzzle_array: 9 x 9 uint8 array as returned by load_puzzle, 0 for empty cells
+    :param method: name of the solver, a key of SOLVE_METHODS
+    :return: solved 9 x 9 uint8 array, or None when the puzzle has no solution
+    """
+    try:
+        solve_method = SOLVE_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown solve method {method}, choose from {sorted(SOLVE_METHODS)}") from None
+    return solve_method(puzzle_array)
+
+
+def solve_puzzle_chunk(puzzle_chunk: np.array = None, method: str = 'search') -> np.array:
+    """
+    The purpose of this function is to solve a chunk of puzzles one at a time, used as the work unit of the
+    multi-process corpus solver.
+    :param puzzle_chunk: (k, 9, 9) uint8 array
+    :param method: name of the solver, a key of SOLVE_METHODS
+    :return: (k, 9, 9) uint8 array of solutions, all 0 for a puzzle with no solution
+    """
+    solutions = np.zeros(shape=puzzle_chunk.shape, dtype=np.uint8)
+    valid = check_puzzles(puzzles=puzzle_chunk).valid
+    for puzzle_index in np.flatnonzero(valid):
+        solved_grid = solve_puzzle(puzzle_array=puzzle_chunk[puzzle_index], method=method)
+        if solved_grid is not None:
+            solutions[puzzle_index] = solved_grid
+    return solutions
+
+
+def solve_puzzle_batch(puzzle_chunk: np.array = None, method: str = 'search') -> np.array:
+    """
+    The purpose of this function is to solve a chunk of puzzles together. Puzzles the validator turns away are left
+    unsolved, the vectorised batch propagation runs on the rest first and only the puzzles it leaves stuck go to the
+    chosen solver one at a time.
+    :param puzzle_chunk: (k, 9, 9) uint8 array
+    :param method: name of the solver, a key of SOLVE_METHODS
+    :return: (k, 9, 9) uint8 array of solutions, all 0 for a puzzle with no solution
+    """
+    solutions = np.zeros(shape=puzzle_chunk.shape, dtype=np.uint8)
+    valid_indices = np.flatnonzero(check_puzzles(puzzles=puzzle_chunk).valid)
+    if not len(valid_indices):
+        return solutions
+    batch_result = solve_batch(puzzles=puzzle_chunk[valid_indices])
+    solved = batch_result.status == STATUS_SOLVED
+    solutions[valid_indices[solved]] = batch_result.solutions[solved]
+    for batch_index in np.flatnonzero(batch_result.status == STATUS_STUCK):
+        solved_grid = solve_puzzle(puzzle_array=batch_result.solutions[batch_index], method=method)
+        if solved_grid is not None:
+            solutions[valid_indices[batch_index]] = solved_grid
+    return solutions
+
+
+class SolveResult(typing.NamedTuple):
+    """
+    The purpose of this class is to hold the result of solve.
+    grid: 9 x 9 uint8 array, 0 where a cell is still unknown
+    solved: True when every cell is known and no row, column or parent square repeats a value
+    rounds: number of sweep rounds run before the fixed point
+    eliminations: eligible numbers removed by the sweeps
+    elapsed: seconds taken
+    contradiction: True when the puzzle was found to have no solution
+    finish_method: name of the solver that completed the grid, None when the sweeps were enough
+    board: the swept board, for inspecting the eligible numbers left in each cell
+    """
+    grid: np.ndarray
+    solved: bool
+    rounds: int
+    eliminations: int
+    elapsed: float
+    contradiction: bool = False
+    finish_method: str = None
+    board: typing.Any = None
+
+
+def grid_has_repeats(grid: np.array = None) -> bool:
+    """
+    The purpose of this function is to check if any row, column or parent square holds a known value twice.
+    :param grid: 9 x 9 uint8 array, 0 for unknown, or side x side for a bigger box size
+    :return:
+    """
+    return bool(find_repeated_units(grids=grid).any())
+
+
+def sweep_to_fixed_point(sudoku_board=None, max_rounds: int = None) -> tuple:
+    """
+    The purpose of this function is to run the remove_known_neighbors, column_solve and row_solve sweeps in rounds
+    until a round removes nothing. The loop also stops as soon as every cell is known, so no sweep runs on a solved
+    board.
+    :param sudoku_board: SudokuBoard or SudokuTensorBoard
+    :param max_rounds: optional safety cap on the rounds, None runs to the fixed point
+    :return: number of rounds run, True when a sweep ran into a cell with no eligible numbers left
+    """
+    sweeps = (sudoku_board.remove_known_neighbors, sudoku_board.column_solve, sudoku_board.row_solve)
+    cell_count = sudoku_board.side * sudoku_board.side
+    known_count, unknowns_count = board_progress(sudoku_board=sudoku_board)
+    rounds = 0
+    while known_count < cell_count and (max_rounds is None or rounds < max_rounds):
+        rounds += 1
+        for sweep in sweeps:
+            try:
+                sweep()
+            except SudokuContradiction:
+                return rounds, True
+            if sudoku_board.count_known_cells() == cell_count:
+                break
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # Every elimination lowers the unknowns count, so an unchanged count means the round changed nothing
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        round_known, round_unknowns = board_progress(sudoku_board=sudoku_board)
+        if round_unknowns == unknowns_count and round_known == known_count:
+            break
+        known_count, unknowns_count = round_known, round_unknowns
+    return rounds, False
+
+
+def solve(puzzle_array: np.array = None, engine: str = 'object', finish_method: str = 'search',
+          max_rounds: int = None, solve_stats: SolveStats = None) -> SolveResult:
+    """
+    The purpose of this function is to solve a puzzle array without any printing. The board sweeps run to a fixed
+    point first, and when they stall the finish method completes the grid from what the sweeps found.
+    :param puzzle_array: 9 x 9 uint8 array as returned by load_puzzle, 0 for empty cells. Bigger puzzles, 16 x 16 or
+    25 x 25, need the object engine and the search finish method.
+    :param engine: name of the board engine, a key of BOARD_ENGINES
+    :param finish_method: key of SOLVE_METHODS used when the sweeps stall, None to stop at the fixed point
+    :param max_rounds: optional safety cap on the sweep rounds
+    :param solve_stats: optional SolveStats attached to the board to record each sweep
+    :return: SolveResult
+    """
+    if finish_method is not None and finish_method not in SOLVE_METHODS:
+        raise ValueError(f"Unknown solve method {finish_method}, choose from {sorted(SOLVE_METHODS)}")
+    if np.shape(puzzle_array) != (9, 9) and (engine != 'object' or finish_method not in (None, 'search')):
+        raise ValueError(f"Only the object engine and search finish method solve puzzles of shape "
+                         f"{np.shape(puzzle_array)}")
+    start_time = time.perf_counter()
+    sudoku_board = create_board(start_board_array=puzzle_array, engine=engine)
+    sudoku_board.solve_stats = solve_stats
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # A puzzle the givens already rule out is turned away before any sweep runs
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    if not check_puzzles(puzzles=puzzle_array).valid[0]:
+        return SolveResult(grid=sudoku_board.get_value_array(), solved=False, rounds=0, eliminations=0,
+                           elapsed=time.perf_counter() - start_time, contradiction=True, finish_method=None,
+                           board=sudoku_board)
+    known_start, unknowns_start = board_progress(sudoku_board=sudoku_board)
+
+    rounds, contradiction = sweep_to_fixed_point(sudoku_board=sudoku_board, max_rounds=max_rounds)
+    known_end, unknowns_end = board_progress(sudoku_board=sudoku_board)
+    eliminations = unknowns_start - unknowns_end - (known_end - known_start)
+
+    grid = sudoku_board.get_value_array()
+    contradiction = contradiction or bool(sudoku_board.check_out_of_options()) or grid_has_repeats(grid=grid)
+
+    used_method = None
+    if not contradiction and known_end < grid.size and finish_method is not None:
+        used_method = finish_method
+        finished_grid = solve_puzzle(puzzle_array=grid, method=finish_method)
+        if finished_grid is None:
+            contradiction = True
+        else:
+            grid = finished_grid
+
+    solved = not contradiction and bool(grid.all())
+    return SolveResult(grid=grid, solved=solved, rounds=rounds, eliminations=eliminations,
+                       elapsed=time.perf_counter() - start_time, contradiction=contradiction,
+                       finish_method=used_method, board=sudoku_board)
@@ -0,0 +1,333 @@
+"""
+
+The purpose of this file is to store the deduction strategies that can be run on a SudokuBoard. Each strategy is a
+class with a name, a cost estimate and an apply function. A StrategyPipeline runs them cheapest first and goes back to
+the cheapest strategy whenever a more expensive one makes progress. Given the board's PropagationQueue, the pipeline
+runs the singles through it, so only the cells that changed since the last run are pushed to their peers.
+
+The strategies work on the candidate bitmasks of the board (bit d set when d is eligible) and the integer unit tables
+from sudoku_utilities, taken for the size of the board so 16 x 16 and 25 x 25 boards work the same way.
+
+"""
+import typing
+from abc import ABC, abstractmethod
+from functools import lru_cache, partial
+from itertools import combinations
+
+from Source.sudoku_propagation import PropagationQueue
+from Source.sudoku_utilities import BoardIndexTables
+from Source.sudoku_validation import SudokuContradiction
+
+
+class UnitTables(typing.NamedTuple):
+    """
+    The purpose of this class is to hold the unit tables of one board size as python ints, which are quicker than
+    numpy scalars in the strategy loops.
+    unit_cells: cell ids of each unit, rows first, then columns, then parent squares
+    cell_units: row, column and parent square unit ids of each cell
+    """
+    side: int
+    unit_cells: tuple
+    cell_units: tuple
+    row_units: range
+    column_units: range
+    square_units: range
+    numbers: range
+
+
+@lru_cache(maxsize=8)
+def create_unit_tables(box_size: int = 3) -> UnitTables:
+    """
+    The purpose of this function is to create the unit tables for a board of box_size x box_size parent squares.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return: UnitTables
+    """
+    side = box_size * box_size
+    return UnitTables(side=side,
+                      unit_cells=tuple(tuple(x) for x in BoardIndexTables.unit_index_array(box_size=box_size).tolist()),
+                      cell_units=tuple(tuple(x) for x in BoardIndexTables.cell_unit_array(box_size=box_size).tolist()),
+                      row_units=range(0, side), column_units=range(side, 2 * side),
+                      square_units=range(2 * side, 3 * side), numbers=range(1, side + 1))
+
+
+class DeductionStrategy(ABC):
+    """
+    The purpose of this class is to define what every deduction strategy looks like. apply removes whatever the
+    strategy can prove and returns how many changes it made, 0 meaning it found nothing. A contradiction is raised as
+    a SudokuContradiction.
+    A strategy with uses_queue set takes the board's PropagationQueue as well and keeps its counters right itself.
+    """
+    name = 'deduction'
+    cost = 0
+    uses_queue = False
+
+    def __repr__(self):
+        return f"{type(self).__name__}(cost={self.cost})"
+
+    @abstractmethod
+    def apply(self, sudoku_board=None) -> int:
+        """
+        The purpose of this function is to remove whatever the strategy can prove on the board.
+        :param sudoku_board:
+        :return: number of changes made, 0 when the strategy found nothing
+        """
+
+
+class NakedSingles(DeductionStrategy):
+    """
+    Remove every known value from its row, column and parent square.
+    """
+    name = 'naked_singles'
+    cost = 1
+    uses_queue = True
+
+    def apply(self, sudoku_board=None, propagation_queue: PropagationQueue = None) -> int:
+        if propagation_queue is None:
+            propagation_queue = PropagationQueue(sudoku_board=sudoku_board)
+            propagation_queue.push_known_cells()
+        eliminations_before = propagation_queue.eliminations
+        if not propagation_queue.run():
+            raise propagation_queue.contradiction
+        return propagation_queue.eliminations - eliminations_before
+
+
+class HiddenSingles(DeductionStrategy):
+    """
+    Place a number that has only one possible cell left in a unit.
+    """
+    name = 'hidden_singles'
+    cost = 2
+    uses_queue = True
+
+    def apply(self, sudoku_board=None, propagation_queue: PropagationQueue = None) -> int:
+        return sudoku_board.place_hidden_singles(propagation_queue=propagation_queue)
+
+
+class PointingClaiming(DeductionStrategy):
+    """
+    When a number's places in a parent square all sit on one row or column, it can be removed from the rest of that
+    line (pointing). When a number's places in a row or column all sit in one parent square, it can be removed from
+    the rest of that square (claiming).
+    """
+    name = 'pointing_claiming'
+    cost = 3
+
+    def apply(self, sudoku_board=None) -> int:
+        masks = sudoku_board.get_candidate_masks()
+        unit_tables = create_unit_tables(box_size=sudoku_board.box_size)
+        unit_cell_tuples = unit_tables.unit_cells
+        removed = 0
+        for unit_id, unit_cells in enumerate(unit_cell_tuples):
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # For a parent square look at the row and column units of the places, for a line at the square unit
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            target_slots = (0, 1) if unit_id in unit_tables.square_units else (2,)
+            for number in unit_tables.numbers:
+                number_bit = 1 << number
+                places = [x for x in unit_cells if masks[x] & number_bit]
+                if len(places) < 2 or any(masks[x].bit_count() == 1 for x in places):
+                    continue
+                for target_slot in target_slots:
+                    target_units = {unit_tables.cell_units[x][target_slot] for x in places}
+                    if len(target_units) != 1:
+                        continue
+                    for target_cell in unit_cell_tuples[target_units.pop()]:
+                        if target_cell in places or not masks[target_cell] & number_bit:
+                            continue
+                        removed += sudoku_board.eliminate_candidate_mask(cell_id=target_cell, removal_mask=number_bit)
+                        masks[target_cell] &= ~number_bit
+        return removed
+
+
+class NakedSubsets(DeductionStrategy):
+    """
+    When subset_size unsolved cells of a unit share only subset_size numbers between them, those numbers can be
+    removed from the other cells of the unit.
+    """
+    name = 'naked_subsets'
+    cost = 4
+    subset_size = 2
+
+    def apply(self, sudoku_board=None) -> int:
+        masks = sudoku_board.get_candidate_masks()
+        subset_size = self.subset_size
+        removed = 0
+        for unit_cells in create_unit_tables(box_size=sudoku_board.box_size).unit_cells:
+            open_cells = [x for x in unit_cells if 1 < masks[x].bit_count() <= subset_size]
+            if len(open_cells) < subset_size:
+                continue
+            for subset in combinations(open_cells, subset_size):
+                union_mask = 0
+                for subset_cell in subset:
+                    union_mask |= masks[subset_cell]
+                union_count = union_mask.bit_count()
+                if union_count < subset_size:
+                    raise SudokuContradiction(f"{subset_size} cells share only {union_count} eligible values")
+                if union_count > subset_size:
+                    continue
+                for other_cell in unit_cells:
+                    if other_cell in subset or not masks[other_cell] & union_mask:
+                        continue
+                    removed += sudoku_board.eliminate_candidate_mask(cell_id=other_cell, removal_mask=union_mask)
+                    masks[other_cell] &= ~union_mask
+        return removed
+
+
+class NakedPairs(NakedSubsets):
+    name = 'naked_pairs'
+    cost = 4
+    subset_size = 2
+
+
+class NakedTriples(NakedSubsets):
+    name = 'naked_triples'
+    cost = 6
+    subset_size = 3
+
+
+class HiddenPairs(DeductionStrategy):
+    """
+    When two numbers can only go in the same two cells of a unit, every other number is removed from those cells.
+    """
+    name = 'hidden_pairs'
+    cost = 5
+
+    def apply(self, sudoku_board=None) -> int:
+        masks = sudoku_board.get_candidate_masks()
+        unit_tables = create_unit_tables(box_size=sudoku_board.box_size)
+        removed = 0
+        for unit_cells in unit_tables.unit_cells:
+            number_places = dict()
+            for number in unit_tables.numbers:
+                number_bit = 1 << number
+                places = tuple(x for x in unit_cells if masks[x] & number_bit)
+                if len(places) == 2 and all(masks[x].bit_count() > 1 for x in places):
+                    number_places[number] = places
+            for first_number, second_number in combinations(number_places, 2):
+                places = number_places[first_number]
+                if places != number_places[second_number]:
+                    continue
+                keep_mask = (1 << first_number) | (1 << second_number)
+                for place in places:
+                    removal_mask = masks[place] & ~keep_mask
+                    if removal_mask:
+                        removed += sudoku_board.eliminate_candidate_mask(cell_id=place, removal_mask=removal_mask)
+                        masks[place] &= keep_mask
+        return removed
+
+
+class XWing(DeductionStrategy):
+    """
+    When a number can only go in the same two columns of two rows, it can be removed from the rest of those two
+    columns, and the same with rows and columns swapped.
+    """
+    name = 'x_wing'
+    cost = 7
+
+    def apply(self, sudoku_board=None) -> int:
+        masks = sudoku_board.get_candidate_masks()
+        unit_tables = create_unit_tables(box_size=sudoku_board.box_size)
+        unit_cell_tuples = unit_tables.unit_cells
+        removed = 0
+        for line_units, cross_offset in ((unit_tables.row_units, unit_tables.side), (unit_tables.column_units, 0)):
+            for number in unit_tables.numbers:
+                number_bit = 1 << number
+                line_positions = dict()
+                for line_unit in line_units:
+                    positions = tuple(p for p, x in enumerate(unit_cell_tuples[line_unit]) if masks[x] & number_bit)
+                    if len(positions) == 2:
+                        line_positions.setdefault(positions, list()).append(line_unit)
+
+                for positions, wing_lines in line_positions.items():
+                    if len(wing_lines) != 2:
+                        continue
+                    wing_cells = set(unit_cell_tuples[wing_lines[0]]) | set(unit_cell_tuples[wing_lines[1]])
+                    for position in positions:
+                        for target_cell in unit_cell_tuples[cross_offset + position]:
+                            if target_cell in wing_cells or not masks[target_cell] & number_bit:
+                                continue
+                            removed += sudoku_board.eliminate_candidate_mask(cell_id=target_cell,
+                                                                             removal_mask=number_bit)
+                            masks[target_cell] &= ~number_bit
+        return removed
+
+
+def create_default_strategies() -> list:
+    """
+    The purpose of this function is to create one of each strategy, in increasing cost order.
+    :return:
+    """
+    strategies = [NakedSingles(), HiddenSingles(), PointingClaiming(), NakedPairs(), HiddenPairs(), NakedTriples(),
+                  XWing()]
+    return sorted(strategies, key=lambda x: x.cost)
+
+
+def apply_strategy(strategy: DeductionStrategy = None, sudoku_board=None,
+                   propagation_queue: PropagationQueue = None) -> int:
+    """
+    The purpose of this function is to apply one strategy and leave the board's queue right afterwards, so its
+    counters can be read straight after the call.
+    :param strategy:
+    :param sudoku_board:
+    :param propagation_queue: optional queue of the board
+    :return: number of changes the strategy made
+    """
+    if strategy.uses_queue:
+        return strategy.apply(sudoku_board=sudoku_board, propagation_queue=propagation_queue)
+    changes = strategy.apply(sudoku_board=sudoku_board)
+    if changes and propagation_queue is not None:
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        # The strategy changed cells behind the queue's back, recount and push what became known
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        propagation_queue.recount()
+        propagation_queue.push_known_cells()
+    return changes
+
+
+class StrategyPipeline:
+    """
+    The purpose of this class is to run deduction strategies cheapest first until none of them makes progress.
+    usage counts how many times each strategy made progress, changes how many eliminations and placements it made.
+    """
+
+    def __init__(self, strategies: list = None):
+        if strategies is None:
+            strategies = create_default_strategies()
+        self.strategies = sorted(strategies, key=lambda x: x.cost)
+        self.usage = {x.name: 0 for x in self.strategies}
+        self.changes = {x.name: 0 for x in self.strategies}
+
+    def run(self, sudoku_board=None, propagation_queue: PropagationQueue = None) -> bool:
+        """
+        The purpose of this function is to apply the strategies to a fixed point. After any strategy makes progress
+        the pipeline starts again from the cheapest one.
+        :param sudoku_board:
+        :param propagation_queue: optional queue of the board, kept right through every strategy so the caller can
+        go on using it
+        :return: False when the board ends up in a contradiction
+        """
+        solve_stats = sudoku_board.solve_stats
+        cell_count = sudoku_board.side * sudoku_board.side
+        try:
+            keep_going = True
+            while keep_going:
+                # The queue knows when every cell is solved, no strategy has to look at a finished board
+                if propagation_queue is not None and propagation_queue.count_known_cells() == cell_count:
+                    break
+                keep_going = False
+                for strategy in self.strategies:
+                    strategy_call = partial(apply_strategy, strategy=strategy, sudoku_board=sudoku_board,
+                                            propagation_queue=propagation_queue)
+                    if solve_stats is None:
+                        changes = strategy_call()
+                    else:
+                        changes = solve_stats.measure(strategy_name=strategy.name, sudoku_board=sudoku_board,
+                                                      strategy_call=strategy_call, propagation_queue=propagation_queue)
+                    if changes:
+                        self.usage[strategy.name] += 1
+                        self.changes[strategy.name] += changes
+                        keep_going = True
+                        break
+        except SudokuContradiction:
+            return False
+        return True
@@ -0,0 +1,184 @@
+"""
+
+The purpose of this file is to store a whole board candidate engine. Instead of 81 SudokuCell objects the board is one
+(9, 9, 9) boolean array where candidates[row, column, number - 1] is True while the number is still eligible.
+
+"""
+import numpy as np
+
+from Source.sudoku_instrumentation import SolveStats, instrumented
+from Source.sudoku_utilities import NineRange
+
+nine_range = NineRange.nine_range()
+digit_values = np.arange(1, 10, dtype=np.uint8)
+
+
+def box_spread(box_values: np.array = None) -> np.array:
+    """
+    The purpose of this function is to take a (3, 3, 9) array of values per parent square and spread it out so that
+    every cell of the (9, 9, 9) board gets the value of the parent square it belongs to.
+    :param box_values: (3, 3, 9) array
+    :return: (9, 9, 9) array
+    """
+    spread = np.broadcast_to(box_values[:, None, :, None, :], (3, 3, 3, 3, 9))
+    return spread.reshape(9, 9, 9)
+
+
+class SudokuTensorBoard:
+    """
+    This is the class to hold a sudoku board as a single candidate tensor. It has the same functions as SudokuBoard
+    so the two engines can be swapped. It only holds 9 x 9 boards.
+    """
+    box_size = 3
+    side = 9
+
+    def __repr__(self):
+        ds = self.board_display()
+        return ds
+
+    def __init__(self, start_board_array=None, solve_stats: SolveStats = None):
+        self.candidates = np.ones(shape=(9, 9, 9), dtype=bool)
+        self.solve_stats = solve_stats
+        self.update_board_array(external_update_board=start_board_array)
+
+    def update_board_array(self, external_update_board: np.array = None):
+        """
+        The purpose of this function is to update the candidates with the values read from an excel sheet.
+        Note empty values are represented by 0.
+        :param external_update_board: 9 x 9 numpy array of known values
+        :return:
+        """
+        external_update_board = np.asarray(external_update_board, dtype=np.uint8)
+        given = external_update_board > 0
+        self.candidates[given] = digit_values[None, :] == external_update_board[given][:, None]
+
+    def candidate_counts(self) -> np.array:
+        """
+        The purpose of this function is to count the eligible numbers of every cell.
+        :return: (9, 9) array of counts
+        """
+        return self.candidates.sum(axis=2)
+
+    def known_values(self) -> np.array:
+        """
+        The purpose of this function is to get the one hot values of the solved cells, unsolved cells are all False.
+        :return: (9, 9, 9) boolean array
+        """
+        solved = self.candidate_counts() == 1
+        return self.candidates & solved[..., None]
+
+    def count_known_cells(self):
+        """
+        The purpose of this function is to count the number of known cells to determine if iterations are paying off
+        :return:
+        """
+        return int((self.candidate_counts() == 1).sum())
+
+    def get_board_wide_unkowns_count(self):
+        counts = self.candidate_counts()
+        board_wide_unknowns_count = counts[counts > 1].sum()
+        return board_wide_unknowns_count
+
+    def get_cell_remaining_unknowns(self, row: int = None, column: int = None) -> np.array:
+        """
+        The purpose of this function is to get the eligible numbers of one cell.
+        :param row:
+        :param column:
+        :return:
+        """
+        return digit_values[self.candidates[row, column]]
+
+    def eliminate_known(self, known_mask: np.array = None) -> int:
+        """
+        The purpose of this function is to remove the known values in known_mask from every unsolved cell.
+        :param known_mask: (9, 9, 9) boolean array of the values seen by each cell
+        :return: number of candidates removed
+        """
+        unsolved = self.candidate_counts() > 1
+        removal = self.candidates & known_mask & unsolved[..., None]
+        removed = int(removal.sum())
+        if removed:
+            self.candidates &= ~removal
+        return removed
+
+    def _sweep_to_fixed_point(self, make_known_mask, verbose=False):
+        """
+        The purpose of this function is to keep applying one kind of elimination until it stops removing values
+        :param make_known_mask: function that turns the known values into the values seen by each cell
+        :return:
+        """
+        keep_going = True
+        while keep_going:
+            removed = self.eliminate_known(known_mask=make_known_mask(self.known_values()))
+            if verbose:
+                print(f"{removed=}")
+            keep_going = bool(removed)
+
+    @instrumented(strategy_name='remove_known_neighbors')
+    def remove_known_neighbors(self, verbose=False):
+        """
+        The purpose of this function is to eliminate possible numbers based on other values in the parent square.
+        :return:
+        """
+        if verbose:
+            print(f"**removing known neighbors**")
+
+        def parent_square_mask(known):
+            return box_spread(known.reshape(3, 3, 3, 3, 9).any(axis=(1, 3)))
+
+        self._sweep_to_fixed_point(make_known_mask=parent_square_mask, verbose=verbose)
+        return True
+
+    @instrumented(strategy_name='column_solve')
+    def column_solve(self, verbose=False):
+        """
+        The purpose of this function is to eliminate possible numbers based on other values in the column.
+        :return:
+        """
+        if verbose:
+            print(f"Column Solve")
+
+        def column_mask(known):
+            return np.broadcast_to(known.any(axis=0)[None, :, :], known.shape)
+
+        self._sweep_to_fixed_point(make_known_mask=column_mask, verbose=verbose)
+
+    @instrumented(strategy_name='row_solve')
+    def row_solve(self, verbose=False):
+        """
+        The purpose of this function is to eliminate possible numbers based on other values in the row.
+        :return:
+        """
+
+        def row_mask(known):
+            return np.broadcast_to(known.any(axis=1)[:, None, :], known.shape)
+
+        self._sweep_to_fixed_point(make_known_mask=row_mask, verbose=verbose)
+
+    def get_value_array(self) -> np.array:
+        """
+        The purpose of this function is to get the board as a 9 x 9 uint8 array with 0 for unsolved cells.
+        :return:
+        """
+        solved = self.candidate_counts() == 1
+        value_array = np.where(solved, self.candidates.argmax(axis=2) + 1, 0).astype(np.uint8)
+        return value_array
+
+    def board_display(self):
+        display_string = str()
+        value_array = self.get_value_array()
+        for i in nine_range:
+            for j in nine_range:
+                display_string += f"{value_array[i, j]} "
+            display_string += '\n'
+        trailing_text = f"unknowns {self.get_board_wide_unkowns_count()} solved {self.count_known_cells()}\n\n"
+        display_string += trailing_text
+        return display_string
+
+    def check_out_of_options(self) -> list:
+        """
+        The purpose of this function is to find the cells that have no eligible numbers left.
+        :return: list of (row, column) tuples, empty when the board is ok
+        """
+        out_of_options_list = [tuple(x) for x in np.argwhere(self.candidate_counts() == 0)]
+        return out_of_options_list
@@ -3,6 +3,8 @@
 The purpose of this file is to store utilities used for making mathematical objects needed for sudoku solving.
 
 """
+import string
+import typing
 from functools import lru_cache
 
 import numpy as np
@@ -13,154 +15,86 @@ import numpy as np
 nine_range = np.arange(0, 9).astype(np.uint8)
 
 
-@lru_cache(maxsize=3)
-def create_parent_square_array():
+def box_size_from_side(side: int = None) -> int:
     """
-    The purpose of this function is to create an array which maps each cell to it's parent square.
+    The purpose of this function is to find the box size n of a board whose side is n * n cells.
+    :param side: number of rows of the board, 9 for a standard puzzle
+    :return: 3 for 9 x 9, 4 for 16 x 16, 5 for 25 x 25
+    """
+    box_size = int(round(side ** 0.5))
+    if box_size < 2 or box_size * box_size != side:
+        raise ValueError(f"A board side must be a square number of at least 4, got {side}")
+    return box_size
+
 
+@lru_cache(maxsize=8)
+def create_side_range(box_size: int = 3) -> np.array:
+    """
+    The purpose of this function is to create the range of row or column numbers of a board, nine_range for 9 x 9.
+    :param box_size: size of a parent square, 3 for 9 x 9
     :return:
     """
-    parent_square_array = np.zeros(shape=(9, 9), dtype=str)
-
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    # For something on this scale, tests have shown that a straight reading of numbers in code is faster than any
-    # looping
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    parent_square_array[0, 0] = 'a'
-    parent_square_array[0, 1] = 'a'
-    parent_square_array[0, 2] = 'a'
-    parent_square_array[0, 3] = 'b'
-    parent_square_array[0, 4] = 'b'
-    parent_square_array[0, 5] = 'b'
-    parent_square_array[0, 6] = 'c'
-    parent_square_array[0, 7] = 'c'
-    parent_square_array[0, 8] = 'c'
-    parent_square_array[1, 0] = 'a'
-    parent_square_array[1, 1] = 'a'
-    parent_square_array[1, 2] = 'a'
-    parent_square_array[1, 3] = 'b'
-    parent_square_array[1, 4] = 'b'
-    parent_square_array[1, 5] = 'b'
-    parent_square_array[1, 6] = 'c'
-    parent_square_array[1, 7] = 'c'
-    parent_square_array[1, 8] = 'c'
-    parent_square_array[2, 0] = 'a'
-    parent_square_array[2, 1] = 'a'
-    parent_square_array[2, 2] = 'a'
-    parent_square_array[2, 3] = 'b'
-    parent_square_array[2, 4] = 'b'
-    parent_square_array[2, 5] = 'b'
-    parent_square_array[2, 6] = 'c'
-    parent_square_array[2, 7] = 'c'
-    parent_square_array[2, 8] = 'c'
-    parent_square_array[3, 0] = 'd'
-    parent_square_array[3, 1] = 'd'
-    parent_square_array[3, 2] = 'd'
-    parent_square_array[3, 3] = 'e'
-    parent_square_array[3, 4] = 'e'
-    parent_square_array[3, 5] = 'e'
-    parent_square_array[3, 6] = 'f'
-    parent_square_array[3, 7] = 'f'
-    parent_square_array[3, 8] = 'f'
-    parent_square_array[4, 0] = 'd'
-    parent_square_array[4, 1] = 'd'
-    parent_square_array[4, 2] = 'd'
-    parent_square_array[4, 3] = 'e'
-    parent_square_array[4, 4] = 'e'
-    parent_square_array[4, 5] = 'e'
-    parent_square_array[4, 6] = 'f'
-    parent_square_array[4, 7] = 'f'
-    parent_square_array[4, 8] = 'f'
-    parent_square_array[5, 0] = 'd'
-    parent_square_array[5, 1] = 'd'
-    parent_square_array[5, 2] = 'd'
-    parent_square_array[5, 3] = 'e'
-    parent_square_array[5, 4] = 'e'
-    parent_square_array[5, 5] = 'e'
-    parent_square_array[5, 6] = 'f'
-    parent_square_array[5, 7] = 'f'
-    parent_square_array[5, 8] = 'f'
-    parent_square_array[6, 0] = 'g'
-    parent_square_array[6, 1] = 'g'
-    parent_square_array[6, 2] = 'g'
-    parent_square_array[6, 3] = 'h'
-    parent_square_array[6, 4] = 'h'
-    parent_square_array[6, 5] = 'h'
-    parent_square_array[6, 6] = 'i'
-    parent_square_array[6, 7] = 'i'
-    parent_square_array[6, 8] = 'i'
-    parent_square_array[7, 0] = 'g'
-    parent_square_array[7, 1] = 'g'
-    parent_square_array[7, 2] = 'g'
-    parent_square_array[7, 3] = 'h'
-    parent_square_array[7, 4] = 'h'
-    parent_square_array[7, 5] = 'h'
-    parent_square_array[7, 6] = 'i'
-    parent_square_array[7, 7] = 'i'
-    parent_square_array[7, 8] = 'i'
-    parent_square_array[8, 0] = 'g'
-    parent_square_array[8, 1] = 'g'
-    parent_square_array[8, 2] = 'g'
-    parent_square_array[8, 3] = 'h'
-    parent_square_array[8, 4] = 'h'
-    parent_square_array[8, 5] = 'h'
-    parent_square_array[8, 6] = 'i'
-    parent_square_array[8, 7] = 'i'
-    parent_square_array[8, 8] = 'i'
+    side_range = np.arange(0, box_size * box_size).astype(np.uint8)
+    side_range.flags.writeable = False
+    return side_range
+
+
+@lru_cache(maxsize=8)
+def create_parent_square_array(box_size: int = 3):
+    """
+    The purpose of this function is to create an array which maps each cell to it's parent square. Parent squares
+    are lettered a, b, c, ... left to right, top to bottom.
 
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return:
+    """
+    side = box_size * box_size
+    if side > len(string.ascii_lowercase):
+        square_labels = np.array([f"s{x}" for x in range(side)])
+    else:
+        square_labels = np.array(list(string.ascii_lowercase[:side]))
+    side_range = np.arange(side)
+    square_ids = (side_range[:, None] // box_size) * box_size + side_range[None, :] // box_size
+    parent_square_array = square_labels[square_ids]
     return parent_square_array
 
 
-@lru_cache(maxsize=3)
-def create_coordinates_list() -> tuple:
+@lru_cache(maxsize=8)
+def create_coordinates_list(box_size: int = 3) -> tuple:
     """
     The purpose of this function is to create a list of the row,column coordinates on the board
     :rtype: tuple
+    :param box_size: size of a parent square, 3 for 9 x 9
     :return:
     """
+    side_range = create_side_range(box_size=box_size)
     coordinates_list = list()
-    for ccl_row in nine_range:
-        for ccl_col in nine_range:
+    for ccl_row in side_range:
+        for ccl_col in side_range:
             coordinates_list.append((ccl_row, ccl_col))
     coordinates_out = tuple(coordinates_list)
     return coordinates_out
 
 
-@lru_cache(maxsize=3)
-def create_neighbor_list_dictionary():
+@lru_cache(maxsize=8)
+def create_neighbor_list_dictionary(box_size: int = 3):
     """
     The purpose of this function is to create a dictionary where the keys are a tuple of the row and column,
     and the values are a list of all cells with the same parent block (a..i)
+    :param box_size: size of a parent square, 3 for 9 x 9
     :return:
     """
-
-    coordinates_points_list = CoordinatesList.coordinates_list()
-    patent_square_array = PatentSquareArray.patent_square_array()
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    # Create collector list and iterate through the coordinate points list
-    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    side_range = create_side_range(box_size=box_size)
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # The cells of a parent square are the box_size rows and columns starting at the square's top left corner,
+    # listed in row major order without the cell itself
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     neighbor_list_dict = dict()
-    for anltc_row, anltc_col in coordinates_points_list:
-        neighbor_collector_list = list()
-        serving_cell_letter = patent_square_array[anltc_row, anltc_col]
-        for neighbor_row in nine_range:
-            for neighbor_col in nine_range:
-                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-                # Avoid adding self as neighbor
-                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-                if (neighbor_row == anltc_row) and (neighbor_col == anltc_col):
-                    continue
-
-                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-                # Get the name of the big block this cell belongs to
-                # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-                neighbor_letter = patent_square_array[neighbor_row, neighbor_col]
-                if neighbor_letter == serving_cell_letter:
-                    neighbor_collector_list.append((neighbor_row, neighbor_col))
-
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # Store the neighbor list as a tuple for memory efficiency
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    for anltc_row, anltc_col in create_coordinates_list(box_size=box_size):
+        square_rows = side_range[anltc_row - anltc_row % box_size:][:box_size]
+        square_cols = side_range[anltc_col - anltc_col % box_size:][:box_size]
+        neighbor_collector_list = [(x, y) for x in square_rows for y in square_cols
+                                   if x != anltc_row or y != anltc_col]
         neighbor_list_dict[(anltc_row, anltc_col)] = tuple(neighbor_collector_list)
 
     return neighbor_list_dict
@@ -172,8 +106,8 @@ class CoordinatesList:
     """
 
     @staticmethod
-    def coordinates_list():
-        cl = create_coordinates_list()
+    def coordinates_list(box_size: int = 3):
+        cl = create_coordinates_list(box_size=box_size)
         return cl
 
 
@@ -183,8 +117,8 @@ class PatentSquareArray:
     """
 
     @staticmethod
-    def patent_square_array():
-        psa = create_parent_square_array()
+    def patent_square_array(box_size: int = 3):
+        psa = create_parent_square_array(box_size=box_size)
         return psa
 
 
@@ -198,10 +132,172 @@ class NineRange:
         nr = np.arange(0, 9).astype(np.uint8)
         return nr
 
+    @staticmethod
+    def side_range(box_size: int = 3):
+        return create_side_range(box_size=box_size)
+
 
 class NeighborListDictionary:
 
     @staticmethod
-    def neighbor_list_dictionary():
-        nld = create_neighbor_list_dictionary()
+    def neighbor_list_dictionary(box_size: int = 3):
+        nld = create_neighbor_list_dictionary(box_size=box_size)
         return nld
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Integer index tables. Cells are numbered 0..80 in row major order (row * 9 + column). Units are numbered 0..26:
+# rows 0..8, columns 9..17 and parent squares 18..26, parent squares numbered left to right, top to bottom.
+# These let the solving loops use numpy fancy indexing instead of dictionary lookups and letter comparisons.
+# For box size n the same layout holds with side = n * n in place of 9: side * side cells and 3 * side units.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@lru_cache(maxsize=8)
+def create_cell_index_array(box_size: int = 3) -> np.array:
+    """
+    The purpose of this function is to create a side x side array holding the flat cell id of each cell.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return:
+    """
+    side = box_size * box_size
+    cell_index_array = np.arange(side * side, dtype=np.intp).reshape(side, side)
+    cell_index_array.flags.writeable = False
+    return cell_index_array
+
+
+@lru_cache(maxsize=8)
+def create_unit_index_array(box_size: int = 3) -> np.array:
+    """
+    The purpose of this function is to create a (3 * side, side) array listing the cell ids of every row, column and
+    parent square, (27, 9) for 9 x 9.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return:
+    """
+    cell_index_array = create_cell_index_array(box_size=box_size)
+    side_range = create_side_range(box_size=box_size)
+    corners = range(0, box_size * box_size, box_size)
+    rows = [cell_index_array[x, :] for x in side_range]
+    columns = [cell_index_array[:, x] for x in side_range]
+    squares = [cell_index_array[x:x + box_size, y:y + box_size].ravel() for x in corners for y in corners]
+    unit_index_array = np.array(rows + columns + squares, dtype=np.intp)
+    unit_index_array.flags.writeable = False
+    return unit_index_array
+
+
+@lru_cache(maxsize=8)
+def create_cell_unit_array(box_size: int = 3) -> np.array:
+    """
+    The purpose of this function is to create a (side * side, 3) array with the row, column and parent square unit
+    ids of each cell, (81, 3) for 9 x 9.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return:
+    """
+    side = box_size * box_size
+    cell_unit_array = np.zeros(shape=(side * side, 3), dtype=np.intp)
+    for unit_id, unit_cells in enumerate(create_unit_index_array(box_size=box_size)):
+        cell_unit_array[unit_cells, unit_id // side] = unit_id
+    cell_unit_array.flags.writeable = False
+    return cell_unit_array
+
+
+@lru_cache(maxsize=8)
+def create_peer_index_array(box_size: int = 3) -> np.array:
+    """
+    The purpose of this function is to create an array with the cell ids of the peers of every cell, the other cells
+    that share its row, column or parent square, in ascending order. (81, 20) for 9 x 9, (625, 72) for 25 x 25.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return:
+    """
+    unit_index_array = create_unit_index_array(box_size=box_size)
+    peer_index_list = list()
+    for cell_id, cell_units in enumerate(create_cell_unit_array(box_size=box_size)):
+        cell_peers = set(unit_index_array[cell_units].ravel().tolist())
+        cell_peers.discard(cell_id)
+        peer_index_list.append(sorted(cell_peers))
+    peer_index_array = np.array(peer_index_list, dtype=np.intp)
+    peer_index_array.flags.writeable = False
+    return peer_index_array
+
+
+class BoardIndexTables:
+    """
+    The purpose of this class is to wrap the integer index tables
+    """
+
+    @staticmethod
+    def cell_index_array(box_size: int = 3):
+        return create_cell_index_array(box_size=box_size)
+
+    @staticmethod
+    def unit_index_array(box_size: int = 3):
+        return create_unit_index_array(box_size=box_size)
+
+    @staticmethod
+    def cell_unit_array(box_size: int = 3):
+        return create_cell_unit_array(box_size=box_size)
+
+    @staticmethod
+    def peer_index_array(box_size: int = 3):
+        return create_peer_index_array(box_size=box_size)
+
+
+class CellGeometry(typing.NamedTuple):
+    """
+    The purpose of this class is to hold everything about a cell that never changes. One table of these is shared by
+    the same cell of every board of a size, so a board's cells only have to point at their entry.
+    cell_id: row * side + column
+    row: board row, np.uint8
+    column: board column, np.uint8
+    parent_square: letter of the parent square, 'a' to 'i' for 9 x 9
+    neighbor_list: (row, column) coordinates of the other cells of the parent square
+    unit_ids: row, column and parent square unit ids
+    peers: cell ids of the other cells sharing its row, column or parent square, ascending, the row of the peer index
+    array (20 cells for 9 x 9)
+    """
+    cell_id: int
+    row: np.uint8
+    column: np.uint8
+    parent_square: str
+    neighbor_list: tuple
+    unit_ids: tuple
+    peers: tuple
+
+
+@lru_cache(maxsize=8)
+def create_cell_geometry_table(box_size: int = 3) -> tuple:
+    """
+    The purpose of this function is to create the flyweight table of cell geometry, one CellGeometry per cell in
+    cell id order.
+    :param box_size: size of a parent square, 3 for 9 x 9
+    :return: tuple of 81 CellGeometry, side * side on bigger boards
+    """
+    parent_square_array = create_parent_square_array(box_size=box_size)
+    neighbor_list_dictionary = create_neighbor_list_dictionary(box_size=box_size)
+    cell_unit_list = create_cell_unit_array(box_size=box_size).tolist()
+    peer_index_list = create_peer_index_array(box_size=box_size).tolist()
+    cell_geometry_list = list()
+    for cell_id, (cg_row, cg_col) in enumerate(create_coordinates_list(box_size=box_size)):
+        cell_geometry_list.append(CellGeometry(cell_id=cell_id, row=cg_row, column=cg_col,
+                                               parent_square=str(parent_square_array[cg_row, cg_col]),
+                                               neighbor_list=neighbor_list_dictionary[(cg_row, cg_col)],
+                                               unit_ids=tuple(cell_unit_list[cell_id]),
+                                               peers=tuple(peer_index_list[cell_id])))
+    return tuple(cell_geometry_list)
+
+
+class CellGeometryTable:
+    """
+    The purpose of this class is to wrap the cell geometry table
+    """
+
+    @staticmethod
+    def cell_geometry_table(box_size: int = 3):
+        return create_cell_geometry_table(box_size=box_size)
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Built once at import so hot loops can use them as plain read only constants
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+CELL_INDEX = create_cell_index_array()
+UNIT_INDEX = create_unit_index_array()
+CELL_UNITS = create_cell_unit_array()
+PEER_INDEX = create_peer_index_array()
@@ -0,0 +1,137 @@
+"""
+
+The purpose of this file is to store the contradiction exception and the vectorised puzzle checks. A puzzle is checked
+before any solving starts, so a puzzle that repeats a given or leaves a cell or a number with nowhere to go is turned
+away straight off instead of after rounds of sweeps.
+
+check_puzzles takes one board or a whole (N, side, side) stack and works on all of them with a few numpy operations.
+
+"""
+import typing
+
+import numpy as np
+
+from Source.sudoku_utilities import BoardIndexTables, box_size_from_side
+
+
+class SudokuContradiction(ValueError):
+    """
+    The purpose of this class is to signal that a board can no longer be solved. It is a ValueError, so code that
+    already catches ValueError for a contradiction keeps working.
+    cell_id: row * side + column of the cell that ran out of eligible numbers, when a cell did
+    unit_id: row, column or parent square unit that lost every place for a number, when one did
+    number: the number that ran out of places
+    """
+
+    def __init__(self, message: str = None, cell_id: int = None, unit_id: int = None, number: int = None):
+        super().__init__(message)
+        self.cell_id = cell_id
+        self.unit_id = unit_id
+        self.number = number
+
+
+class PuzzleCheck(typing.NamedTuple):
+    """
+    The purpose of this class is to hold the result of check_puzzles, one row per puzzle.
+    valid: (N,) True when none of the problems below was found
+    bad_values: (N,) a value is not 0 for empty or 1 through side
+    repeated_units: (N, 3 * side) the unit holds a given twice
+    dead_cells: (N, side * side) an empty cell whose row, column and parent square already hold every number
+    blocked_units: (N, 3 * side) a number missing from the unit has no empty cell left that can take it
+    """
+    valid: np.ndarray
+    bad_values: np.ndarray
+    repeated_units: np.ndarray
+    dead_cells: np.ndarray
+    blocked_units: np.ndarray
+
+
+def stack_grids(grids: np.array = None) -> tuple:
+    """
+    The purpose of this function is to turn one board or a stack of boards into an (N, side * side) array.
+    :param grids: (side, side) or (N, side, side) array
+    :return: flat grids, box size
+    """
+    grids = np.asarray(grids)
+    if grids.ndim == 2:
+        grids = grids[None]
+    if grids.ndim != 3 or grids.shape[1] != grids.shape[2]:
+        raise ValueError(f"Grids must be shaped (side, side) or (N, side, side), got {grids.shape}")
+    box_size = box_size_from_side(side=grids.shape[1])
+    return grids.reshape(len(grids), grids.shape[1] * grids.shape[2]).astype(np.int64), box_size
+
+
+def count_unit_values(flat_grids: np.array = None, box_size: int = 3) -> np.array:
+    """
+    The purpose of this function is to count how often each number appears in each unit.
+    :param flat_grids: (N, side * side) array
+    :param box_size:
+    :return: (N, 3 * side, side) array, [puzzle, unit, number - 1]
+    """
+    side = box_size * box_size
+    unit_values = flat_grids[:, BoardIndexTables.unit_index_array(box_size=box_size)]
+    number_values = np.arange(1, side + 1)
+    return (unit_values[..., None] == number_values).sum(axis=2)
+
+
+def find_repeated_units(grids: np.array = None) -> np.array:
+    """
+    The purpose of this function is to find the rows, columns and parent squares that hold a known value twice.
+    :param grids: (side, side) or (N, side, side) array, 0 for unknown
+    :return: (N, 3 * side) bool array
+    """
+    flat_grids, box_size = stack_grids(grids=grids)
+    return (count_unit_values(flat_grids=flat_grids, box_size=box_size) > 1).any(axis=2)
+
+
+def check_puzzles(puzzles: np.array = None) -> PuzzleCheck:
+    """
+    The purpose of this function is to check puzzles before they are solved. Besides repeated givens it finds the
+    empty cells that no number fits and the units where a missing number fits nowhere, the two ways the givens alone
+    can already rule out a solution.
+    :param puzzles: (side, side) or (N, side, side) array, 0 for empty cells
+    :return: PuzzleCheck
+    """
+    flat_grids, box_size = stack_grids(grids=puzzles)
+    side = box_size * box_size
+    bad_cells = (flat_grids < 0) | (flat_grids > side)
+    bad_values = bad_cells.any(axis=1)
+    flat_grids = np.where(bad_cells, 0, flat_grids)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    # A number is a candidate of an empty cell when none of the cell's three units holds it yet
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    unit_counts = count_unit_values(flat_grids=flat_grids, box_size=box_size)
+    unit_seen = unit_counts > 0
+    cell_seen = unit_seen[:, BoardIndexTables.cell_unit_array(box_size=box_size)].any(axis=2)
+    empty_cells = flat_grids == 0
+    candidates = empty_cells[..., None] & ~cell_seen
+
+    repeated_units = (unit_counts > 1).any(axis=2)
+    dead_cells = empty_cells & ~candidates.any(axis=2)
+    unit_candidates = candidates[:, BoardIndexTables.unit_index_array(box_size=box_size)].any(axis=2)
+    blocked_units = (~unit_seen & ~unit_candidates).any(axis=2)
+    valid = ~bad_values & ~repeated_units.any(axis=1) & ~dead_cells.any(axis=1) & ~blocked_units.any(axis=1)
+    return PuzzleCheck(valid=valid, bad_values=bad_values, repeated_units=repeated_units, dead_cells=dead_cells,
+                       blocked_units=blocked_units)
+
+
+def validate_puzzle(puzzle_array: np.array = None) -> np.array:
+    """
+    The purpose of this function is to turn a bad puzzle away with a SudokuContradiction that says what is wrong.
+    :param puzzle_array: (side, side) array, 0 for empty cells
+    :return: the puzzle as a uint8 array
+    """
+    puzzle_check = check_puzzles(puzzles=puzzle_array)
+    if puzzle_check.bad_values[0]:
+        raise SudokuContradiction("Puzzle values must be 0 for empty or 1 through the board side")
+    if puzzle_check.repeated_units[0].any():
+        unit_id = int(np.argmax(puzzle_check.repeated_units[0]))
+        raise SudokuContradiction(f"Unit {unit_id} holds a given twice", unit_id=unit_id)
+    if puzzle_check.dead_cells[0].any():
+        cell_id = int(np.argmax(puzzle_check.dead_cells[0]))
+        raise SudokuContradiction(f"Cell {cell_id} has no eligible numbers left", cell_id=cell_id)
+    if puzzle_check.blocked_units[0].any():
+        unit_id = int(np.argmax(puzzle_check.blocked_units[0]))
+        raise SudokuContradiction(f"Unit {unit_id} has no place left for a missing number", unit_id=unit_id)
+    return np.asarray(puzzle_array, dtype=np.uint8)
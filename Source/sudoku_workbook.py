@@ -0,0 +1,100 @@
+"""
+
+The purpose of this file is to store the bulk workbook solver. Every puzzle of every sheet is read in one pass, the
+puzzles are solved together in batches and the solutions are written to a new workbook in one pass.
+
+Usage: python -m Source.sudoku_workbook puzzles.xlsx --output solutions.xlsx --include-puzzles
+
+"""
+import argparse
+import os
+import sys
+import time
+import typing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from Source.sudoku_loader_excel import read_workbook_puzzles, write_workbook_grids
+from Source.sudoku_solver import SOLVE_METHODS, solve_puzzle_batch
+from Source.sudoku_validation import check_puzzles
+
+
+class WorkbookSolveResult(typing.NamedTuple):
+    """
+    The purpose of this class is to hold the outcome of solving a workbook.
+    puzzles: number of puzzles found
+    solved: number of puzzles solved
+    invalid: number of puzzles the validator turned away, counted among the unsolved
+    sheets: number of sheets written
+    elapsed: seconds taken, reading and writing included
+    """
+    puzzles: int
+    solved: int
+    invalid: int
+    sheets: int
+    elapsed: float
+
+
+def solve_workbook(workbook_path: Path = None, output_path: Path = None, block_gap: int = 1,
+                   include_puzzles: bool = False, method: str = 'search', workers: int = None,
+                   chunk_size: int = 512) -> WorkbookSolveResult:
+    """
+    The purpose of this function is to solve every puzzle of a workbook and write the solutions to a new workbook.
+    :param workbook_path: .xlsx file holding the puzzles
+    :param output_path: .xlsx file to create
+    :param block_gap: blank rows and columns between neighbouring puzzles on a sheet
+    :param include_puzzles: write each puzzle sheet as well, with its solutions on an extra sheet after it
+    :param method: name of the solver used for the puzzles batch propagation leaves stuck, a key of SOLVE_METHODS
+    :param workers: worker processes the batches are spread over, all cores when None, 1 solves in this process
+    :param chunk_size: puzzles per batch
+    :return: WorkbookSolveResult
+    """
+    start_time = time.perf_counter()
+    workbook_puzzles = read_workbook_puzzles(workbook_path=workbook_path, block_gap=block_gap)
+    puzzles = workbook_puzzles.puzzles
+    workers = workers or os.cpu_count() or 1
+    chunk_worker = partial(solve_puzzle_batch, method=method)
+    puzzle_chunks = [puzzles[x:x + chunk_size] for x in range(0, len(puzzles), chunk_size)]
+    if workers == 1 or len(puzzle_chunks) < 2:
+        solved_chunks = [chunk_worker(x) for x in puzzle_chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(puzzle_chunks))) as executor:
+            solved_chunks = list(executor.map(chunk_worker, puzzle_chunks))
+    solutions = np.concatenate(solved_chunks) if solved_chunks else np.zeros(shape=puzzles.shape, dtype=np.uint8)
+
+    sheet_count = write_workbook_grids(workbook_path=output_path, workbook_puzzles=workbook_puzzles,
+                                       solutions=solutions, block_gap=block_gap, include_puzzles=include_puzzles)
+    return WorkbookSolveResult(puzzles=len(puzzles), solved=int(solutions.all(axis=(1, 2)).sum()),
+                               invalid=int((~check_puzzles(puzzles=puzzles).valid).sum()),
+                               sheets=sheet_count, elapsed=time.perf_counter() - start_time)
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(description="Solve every sudoku puzzle of an Excel workbook.")
+    argument_parser.add_argument('workbook', type=Path, help="xlsx file, puzzles are 9 x 9 blocks on any sheet")
+    argument_parser.add_argument('-o', '--output', type=Path, required=True, help="xlsx file for the solutions")
+    argument_parser.add_argument('-g', '--block-gap', type=int, default=1,
+                                 help="blank rows and columns between puzzles on a sheet")
+    argument_parser.add_argument('-p', '--include-puzzles', action='store_true',
+                                 help="copy the puzzle sheets and add the solutions as extra sheets")
+    argument_parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes, default all cores")
+    argument_parser.add_argument('-m', '--method', choices=sorted(SOLVE_METHODS), default='search')
+    return argument_parser
+
+
+def main(argv: list = None) -> int:
+    arguments = create_argument_parser().parse_args(argv)
+    solve_result = solve_workbook(workbook_path=arguments.workbook, output_path=arguments.output,
+                                  block_gap=arguments.block_gap, include_puzzles=arguments.include_puzzles,
+                                  method=arguments.method, workers=arguments.workers)
+    throughput = solve_result.puzzles / solve_result.elapsed if solve_result.elapsed else 0.0
+    print(f"Solved {solve_result.solved} of {solve_result.puzzles} puzzles ({solve_result.invalid} invalid) in "
+          f"{solve_result.elapsed:.2f}s ({throughput:.1f} puzzles/sec)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,44 +1,44 @@
 # This is a sample Python script.
 import os
+import sys
 from pathlib import Path
 
+from Source.sudoku_instrumentation import SolveStats
 from Source.sudoku_loader import load_puzzle
-from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_solver import solve
 from Source.sudoku_utilities import CoordinatesList
 
+# 'object' for the SudokuCell board, 'tensor' for the whole board candidate array
+engine = 'object'
+# When True, finish with a full solver if the sweeps stall before the board is solved
+use_search = True
+# 'search' for SudokuBoard propagation plus backtracking, 'dlx' for the Dancing Links exact cover solver
+solve_method = 'search'
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Single puzzle run. Pass the puzzle file as the first argument, for whole corpora use Source.sudoku_cli
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 current_dir = Path(os.getcwd())
-file_name = r".\puzzle_0002.xlsx"
-puzzle_path = current_dir.joinpath(file_name)
+file_name = "puzzle_0002.xlsx"
+puzzle_path = Path(sys.argv[1]) if len(sys.argv) > 1 else current_dir.joinpath(file_name)
 puzzle_array = load_puzzle(puzzle_path=puzzle_path)
 
-sudoku_board = SudokuBoard(start_board_array=puzzle_array)
-board_array = sudoku_board.board
-round_count = 0
-keep_going = True
-while keep_going:
-    beginning_unknowns = sudoku_board.get_board_wide_unkowns_count()
-    sudoku_board.check_out_of_options()
-    round_count += 1
-    sudoku_board.remove_known_neighbors(verbose=True)
-    sudoku_board.check_out_of_options()
-    sudoku_board.column_solve(verbose=False)
-    sudoku_board.check_out_of_options()
-    sudoku_board.row_solve(verbose=False)
-    sudoku_board.check_out_of_options()
-    solved = sudoku_board.count_known_cells()
-    ending_unknowns = sudoku_board.get_board_wide_unkowns_count()
-    removed_unknowns = beginning_unknowns - ending_unknowns
-    print(f"{removed_unknowns}")
-    if round_count > 25:
-        keep_going = False
-    else:
-        keep_going = bool(removed_unknowns)
+solve_stats = SolveStats()
+solve_result = solve(puzzle_array=puzzle_array, engine=engine, finish_method=solve_method if use_search else None,
+                     solve_stats=solve_stats)
+sudoku_board = solve_result.board
 
 print(sudoku_board)
+print(solve_stats.format_table())
+print(f"rounds {solve_result.rounds} eliminations {solve_result.eliminations} elapsed {solve_result.elapsed:.4f}s")
+
+if solve_result.contradiction:
+    print(f"No solution, out of options {sudoku_board.check_out_of_options()}")
+elif solve_result.finish_method is not None:
+    print(f"Solved with {solve_result.finish_method}:\n{solve_result.grid}")
 
 cl = CoordinatesList.coordinates_list()
 for quebra_row, quebra_column in cl:
-    quebra_cell = sudoku_board.board[quebra_row, quebra_column]
-    qc_ru = quebra_cell.get_remaining_unknowns()
-    print(f"{quebra_cell}")
-
+    qc_ru = sudoku_board.get_cell_remaining_unknowns(row=quebra_row, column=quebra_column)
+    remaining_unknowns = ','.join([f"{str(x)}" for x in qc_ru])
+    print(f"Row {quebra_row}, Col {quebra_column} {remaining_unknowns}")
@@ -0,0 +1,85 @@
+import numpy as np
+
+from Source.eligible_array import EligibleNumbers, create_eligible_numbers_class
+from Source.eligible_bitmask import EligibleBitmask, MASK_POPCOUNT, MASK_DIGITS, create_eligible_bitmask_class
+
+
+def test_eligible_bitmask_initialization():
+    """
+    The purpose of this function is to test the initialization makes every number eligible.
+    :return:
+    """
+    en_a = EligibleBitmask()
+    correct_answer = np.array([0, 1, 1, 1, 1, 1, 1, 1, 1, 1]).astype(np.uint8)
+    assert np.array_equal(en_a.base_array, correct_answer)
+    assert en_a.number_of_eligible_values() == 9
+
+
+def test_eligible_bitmask_set_value():
+    """
+    The purpose of this function is to test setting a final value
+    :return:
+    """
+    en_a = EligibleBitmask()
+    en_a.set_value(set_value=np.uint8(3))
+    assert en_a.answer_found()
+    assert en_a.get_correct_value() == 3
+    assert list(en_a.get_values()) == [3]
+
+
+def test_eligible_bitmask_eliminate_values():
+    """
+    The purpose of this function is to test eliminating values one at a time and together
+    :return:
+    """
+    en_a = EligibleBitmask()
+    en_a.eliminate_value(to_eliminate=np.uint8(7))
+    en_a.eliminate_values(to_eliminate=(np.uint8(3), 5))
+    assert list(en_a.get_values()) == [1, 2, 4, 6, 8, 9]
+    assert en_a.has_value(test_value=4)
+    assert not en_a.has_value(test_value=5)
+    assert en_a.get_correct_value() == 0
+
+
+def test_eligible_bitmask_matches_eligible_numbers():
+    """
+    The purpose of this function is to test the bitmask and numpy versions agree after the same eliminations
+    :return:
+    """
+    en_a = EligibleNumbers()
+    en_b = EligibleBitmask()
+    for to_eliminate in (2, 9, 4, 1, 8, 6, 3, 5):
+        en_a.eliminate_value(to_eliminate=np.uint8(to_eliminate))
+        en_b.eliminate_value(to_eliminate=np.uint8(to_eliminate))
+        assert np.array_equal(en_a.base_array, en_b.base_array)
+        assert en_a.number_of_eligible_values() == en_b.number_of_eligible_values()
+        assert en_a.answer_found() == en_b.answer_found()
+    assert en_a.get_correct_value() == en_b.get_correct_value() == 7
+
+
+def test_mask_tables():
+    """
+    The purpose of this function is to test the precomputed mask tables
+    :return:
+    """
+    assert MASK_POPCOUNT[0b1010] == 2
+    assert MASK_DIGITS[0b1010] == (1, 3)
+
+
+def test_wide_eligible_bitmask_matches_eligible_numbers():
+    """
+    The purpose of this function is to test the 25 x 25 bitmask and numpy versions agree after the same eliminations
+    :return:
+    """
+    en_a = create_eligible_numbers_class(box_size=5)()
+    en_b = create_eligible_bitmask_class(box_size=5)()
+    assert en_b.number_of_eligible_values() == 25
+    assert list(en_b.get_values()) == list(range(1, 26))
+    for to_eliminate in range(1, 25):
+        en_a.eliminate_value(to_eliminate=np.uint8(to_eliminate))
+        en_b.eliminate_value(to_eliminate=np.uint8(to_eliminate))
+        assert np.array_equal(en_a.base_array, en_b.base_array)
+        assert en_a.number_of_eligible_values() == en_b.number_of_eligible_values()
+    assert en_a.get_correct_value() == en_b.get_correct_value() == 25
+    assert type(en_b.copy()) is type(en_b)
+    assert create_eligible_bitmask_class(box_size=3) is EligibleBitmask
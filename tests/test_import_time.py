@@ -0,0 +1,43 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Short lived CLI and worker processes import the solver on every start, numpy alone takes about 0.15s
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+IMPORT_TIME_BUDGET = 0.5
+HEAVY_MODULES = ('pandas', 'openpyxl')
+repo_root = Path(__file__).parent.parent
+
+
+def measure_import(module_name: str = None) -> tuple:
+    """
+    The purpose of this function is to import a module in a fresh interpreter and report the time it took and which
+    heavy modules came along with it.
+    :return: import seconds, list of heavy modules loaded
+    """
+    probe = (f"import sys, time\n"
+             f"start = time.perf_counter()\n"
+             f"import {module_name}\n"
+             f"print(time.perf_counter() - start)\n"
+             f"print(','.join(x for x in {HEAVY_MODULES!r} if x in sys.modules))\n")
+    probe_output = subprocess.run([sys.executable, '-c', probe], cwd=repo_root, capture_output=True, text=True,
+                                  check=True).stdout.splitlines()
+    heavy_loaded = [x for x in probe_output[1].split(',') if x] if len(probe_output) > 1 else []
+    return float(probe_output[0]), heavy_loaded
+
+
+def test_solver_import_budget():
+    """
+    The purpose of this function is to test the solve entry point imports within budget and without pandas/openpyxl
+    :return:
+    """
+    import_seconds, heavy_loaded = measure_import(module_name='Source.sudoku_solver')
+    assert heavy_loaded == []
+    assert import_seconds < IMPORT_TIME_BUDGET
+
+
+def test_cli_and_loader_skip_heavy_modules():
+    for module_name in ('Source.sudoku_cli', 'Source.sudoku_loader'):
+        _, heavy_loaded = measure_import(module_name=module_name)
+        assert heavy_loaded == []
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from Source.sudoku_batch import solve_batch, STATUS_SOLVED, STATUS_STUCK, STATUS_CONTRADICTION
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+hard_puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+easy_solution = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+
+
+def puzzle_strings_to_array(puzzle_strings: list = None) -> np.array:
+    return np.array([[0 if x == '.' else int(x) for x in ps] for ps in puzzle_strings], dtype=np.uint8).reshape(-1, 9, 9)
+
+
+def test_solve_batch_status():
+    """
+    The purpose of this function is to test each puzzle in a batch gets its own status
+    :return:
+    """
+    duplicate_puzzle = puzzle_strings_to_array([easy_puzzle])[0]
+    duplicate_puzzle[0, 0] = 3
+    puzzles = np.concatenate([puzzle_strings_to_array([easy_puzzle, hard_puzzle]), duplicate_puzzle[None]])
+    batch_result = solve_batch(puzzles=puzzles)
+    assert list(batch_result.status) == [STATUS_SOLVED, STATUS_STUCK, STATUS_CONTRADICTION]
+    assert np.array_equal(batch_result.solutions[0], puzzle_strings_to_array([easy_solution])[0])
+    assert batch_result.status_names() == ['solved', 'stuck', 'contradiction']
+
+
+def test_solve_batch_keeps_givens_when_stuck():
+    """
+    The purpose of this function is to test a stuck puzzle keeps all of its given values
+    :return:
+    """
+    puzzles = puzzle_strings_to_array([hard_puzzle] * 4)
+    batch_result = solve_batch(puzzles=puzzles)
+    given = puzzles > 0
+    assert np.array_equal(batch_result.solutions[given], puzzles[given])
+
+
+def test_solve_batch_rejects_bad_shape():
+    with pytest.raises(ValueError):
+        solve_batch(puzzles=np.zeros((2, 8, 9), dtype=np.uint8))
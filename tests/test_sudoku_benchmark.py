@@ -0,0 +1,41 @@
+from Source.sudoku_benchmark import BENCHMARK_COMPONENTS, compare_results, load_benchmark_puzzles, load_results, \
+    main, run_benchmarks, save_results
+from Source.sudoku_dlx import DancingLinksSolver
+
+
+def test_fixture_puzzles_have_one_solution():
+    """
+    The purpose of this function is to test every bundled fixture puzzle has exactly one solution
+    :return:
+    """
+    for tier, puzzle_arrays in load_benchmark_puzzles().items():
+        for puzzle_array in puzzle_arrays:
+            assert len(DancingLinksSolver(start_board_array=puzzle_array).solve_all(limit=2)) == 1
+
+
+def test_run_benchmarks_and_round_trip(tmp_path):
+    """
+    The purpose of this function is to test a small run covers the requested components and survives a JSON save
+    :return:
+    """
+    benchmark_results = run_benchmarks(tiers=['easy'], repeat=1)
+    assert set(benchmark_results['results']) == set(BENCHMARK_COMPONENTS)
+    assert benchmark_results['results']['construct']['easy']['count'] == 3
+    results_path = tmp_path.joinpath('results.json')
+    save_results(benchmark_results=benchmark_results, results_path=results_path)
+    assert load_results(results_path=results_path)['results'] == benchmark_results['results']
+
+
+def test_compare_results_flags_regressions():
+    baseline = {'results': {'construct': {'easy': {'p50': 1.0}, 'hard': {'p50': 1.0}}}}
+    current = {'results': {'construct': {'easy': {'p50': 1.05}, 'hard': {'p50': 1.5}, '17_clue': {'p50': 1.0}}}}
+    comparisons = compare_results(baseline=baseline, current=current, threshold=0.1)
+    assert [(x['tier'], x['regression']) for x in comparisons] == [('easy', False), ('hard', True)]
+
+
+def test_main_compare_exit_status(tmp_path, capsys):
+    baseline_path = tmp_path.joinpath('baseline.json')
+    save_results(benchmark_results={'results': {'construct': {'easy': {'p50': 1e-9}}}}, results_path=baseline_path)
+    assert main(['--repeat', '1', '--tiers', 'easy', '--components', 'construct', '--compare',
+                 str(baseline_path)]) == 1
+    assert 'REGRESSION' in capsys.readouterr().out
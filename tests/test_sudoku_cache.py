@@ -0,0 +1,75 @@
+import numpy as np
+
+from Source.sudoku_benchmark import load_benchmark_puzzles
+from Source.sudoku_cache import SolutionCache, canonicalize
+from Source.sudoku_loader import puzzle_string_to_array
+
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+def random_isomorph(puzzle_array: np.array = None, random_state: np.random.Generator = None) -> np.array:
+    """
+    The purpose of this function is to relabel the digits and shuffle the bands, rows, stacks and columns of a puzzle,
+    and transpose it half the time
+    :return:
+    """
+    digit_map = np.concatenate(([0], random_state.permutation(9) + 1)).astype(np.uint8)
+    row_order = np.concatenate([x * 3 + random_state.permutation(3) for x in random_state.permutation(3)])
+    column_order = np.concatenate([x * 3 + random_state.permutation(3) for x in random_state.permutation(3)])
+    isomorph = digit_map[puzzle_array][np.ix_(row_order, column_order)]
+    return isomorph.T.copy() if random_state.random() < 0.5 else isomorph
+
+
+def is_solution_of(solution: np.array = None, puzzle_array: np.array = None) -> bool:
+    givens = puzzle_array > 0
+    lines_ok = all(len(set(x)) == 9 for x in np.concatenate((solution, solution.T)).tolist())
+    squares_ok = all(len(set(solution[x:x + 3, y:y + 3].ravel().tolist())) == 9 for x in (0, 3, 6) for y in (0, 3, 6))
+    return bool((solution[givens] == puzzle_array[givens]).all()) and lines_ok and squares_ok
+
+
+def test_canonical_form_round_trip():
+    puzzle_array = puzzle_string_to_array(inkala_puzzle)
+    canonical_form = canonicalize(puzzle_array=puzzle_array)
+    assert np.array_equal(canonical_form.to_original(canonical_grid=canonical_form.grid), puzzle_array)
+
+
+def test_isomorphic_puzzles_hit_with_correct_solutions():
+    """
+    The purpose of this function is to test isomorphs of the fixture puzzles come back from the cache, mapped to a
+    solution of the puzzle asked for
+    :return:
+    """
+    random_state = np.random.default_rng(11)
+    solution_cache = SolutionCache()
+    puzzle_arrays = [y for x in load_benchmark_puzzles().values() for y in x]
+    for puzzle_array in puzzle_arrays:
+        solution_cache.solve(puzzle_array=puzzle_array, method='dlx')
+    for puzzle_array in puzzle_arrays:
+        for _ in range(5):
+            isomorph = random_isomorph(puzzle_array=puzzle_array, random_state=random_state)
+            solution = solution_cache.get(puzzle_array=isomorph)
+            assert solution is not None
+            assert is_solution_of(solution=solution, puzzle_array=isomorph)
+    cache_stats = solution_cache.stats()
+    assert cache_stats.misses == len(puzzle_arrays)
+    assert cache_stats.hits == 5 * len(puzzle_arrays)
+
+    solution_cache.solve(puzzle_array=puzzle_arrays[0])
+    assert solution_cache.stats().exact_hits == 1
+
+
+def test_lru_eviction_and_disk_store(tmp_path):
+    store_path = tmp_path.joinpath('solutions.sqlite')
+    puzzle_arrays = load_benchmark_puzzles(tiers=['easy'])['easy']
+    solution_cache = SolutionCache(max_entries=2, store_path=store_path)
+    solutions = [solution_cache.solve(puzzle_array=x) for x in puzzle_arrays]
+    assert len(solution_cache) == 2
+    assert solution_cache.stats().evictions == 1
+    assert np.array_equal(solution_cache.get(puzzle_array=puzzle_arrays[0]), solutions[0])
+    assert solution_cache.stats().disk_hits == 1
+    solution_cache.close()
+
+    reopened_cache = SolutionCache(store_path=store_path)
+    assert all(np.array_equal(reopened_cache.get(puzzle_array=x), y) for x, y in zip(puzzle_arrays, solutions))
+    assert reopened_cache.stats().disk_hits == 3
+    reopened_cache.close()
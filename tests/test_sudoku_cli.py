@@ -0,0 +1,35 @@
+import io
+
+from Source.sudoku_cli import main, solve_corpus
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+easy_solution = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+inkala_solution = "812753649943682175675491283154237896369845721287169534521974368438526917796318452"
+
+
+def test_solve_corpus_keeps_input_order(tmp_path):
+    """
+    The purpose of this function is to test every puzzle comes back next to its solution, in input order, across
+    several workers and chunks, with a malformed line kept in its place and left unsolved
+    :return:
+    """
+    corpus_path = tmp_path.joinpath('corpus.txt')
+    bad_puzzle = '...030x' + easy_puzzle[7:]
+    corpus_path.write_text('\n'.join([easy_puzzle, bad_puzzle, inkala_puzzle, easy_puzzle]) + '\n')
+    output_stream = io.BytesIO()
+    puzzle_count, solved_count = solve_corpus(corpus_path=corpus_path, output_stream=output_stream, workers=2,
+                                              chunk_size=1)
+    assert (puzzle_count, solved_count) == (4, 3)
+    output_lines = [x.split(',') for x in output_stream.getvalue().decode().split()]
+    assert output_lines == [[easy_puzzle, easy_solution], ['?' * 81, '0' * 81], [inkala_puzzle, inkala_solution],
+                            [easy_puzzle, easy_solution]]
+
+
+def test_main_writes_output_file(tmp_path, capsys):
+    corpus_path = tmp_path.joinpath('corpus.txt')
+    corpus_path.write_text(inkala_puzzle + '\n')
+    output_path = tmp_path.joinpath('solutions.csv')
+    assert main([str(corpus_path), '--workers', '1', '--method', 'dlx', '--output', str(output_path)]) == 0
+    assert output_path.read_text().split() == [f"{inkala_puzzle},{inkala_solution}"]
+    assert 'Solved 1 of 1 puzzles' in capsys.readouterr().err
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from Source.sudoku_dlx import DancingLinksSolver, dlx_solve
+from Source.sudoku_loader import puzzle_string_to_array
+from Source.sudoku_solver import solve_puzzle
+
+seventeen_clue_puzzle = "000000010400000000020000000000050407008000300001090000300400200050100000000806000"
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+inkala_solution = "812753649943682175675491283154237896369845721287169534521974368438526917796318452"
+
+
+def test_dlx_solves_inkala_puzzle():
+    """
+    The purpose of this function is to test the exact cover solver returns the known solution
+    :return:
+    """
+    solved_grid = dlx_solve(start_board_array=puzzle_string_to_array(inkala_puzzle))
+    assert solved_grid.dtype == np.uint8
+    assert np.array_equal(solved_grid, puzzle_string_to_array(inkala_solution))
+
+
+def test_dlx_finds_multiple_solutions():
+    """
+    The purpose of this function is to test removing clues from a unique puzzle gives more than one solution
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(seventeen_clue_puzzle)
+    assert len(DancingLinksSolver(start_board_array=puzzle_array).solve_all(limit=2)) == 1
+    puzzle_array[0, 7] = 0
+    assert len(DancingLinksSolver(start_board_array=puzzle_array).solve_all(limit=2)) == 2
+
+
+def test_dlx_finds_every_solution_without_limit():
+    """
+    The purpose of this function is to test a limit of None finds both fillings of an emptied deadly rectangle
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(inkala_solution)
+    puzzle_array[[0, 0, 1, 1], [2, 5, 2, 5]] = 0
+    solutions = DancingLinksSolver(start_board_array=puzzle_array).solve_all(limit=None)
+    assert len(solutions) == 2
+    assert any(np.array_equal(x, puzzle_string_to_array(inkala_solution)) for x in solutions)
+
+
+def test_dlx_rejects_clashing_givens():
+    puzzle_array = puzzle_string_to_array(inkala_puzzle)
+    puzzle_array[0, 8] = 8
+    assert dlx_solve(start_board_array=puzzle_array) is None
+
+
+@pytest.mark.parametrize("method", ["search", "dlx"])
+def test_solve_puzzle_methods_agree(method):
+    solved_grid = solve_puzzle(puzzle_array=puzzle_string_to_array(inkala_puzzle), method=method)
+    assert np.array_equal(solved_grid, puzzle_string_to_array(inkala_solution))
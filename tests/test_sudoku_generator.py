@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from Source.sudoku_dlx import DancingLinksSolver
+from Source.sudoku_generator import PuzzleGenerator, create_symmetry_groups, generate_puzzles, main
+
+
+def is_valid_solution(grid: np.array = None) -> bool:
+    units = [grid[i, :] for i in range(9)] + [grid[:, i] for i in range(9)]
+    units += [grid[i:i + 3, j:j + 3].ravel() for i in (0, 3, 6) for j in (0, 3, 6)]
+    return all(sorted(unit.tolist()) == list(range(1, 10)) for unit in units)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_generated_puzzles_have_one_solution(seed):
+    """
+    The purpose of this function is to test a generated puzzle has exactly one solution, checked by the exact cover
+    solver, and that it is the solution reported
+    :return:
+    """
+    generated_puzzle = PuzzleGenerator().generate(seed=seed)
+    assert is_valid_solution(generated_puzzle.solution)
+    assert generated_puzzle.clues == np.count_nonzero(generated_puzzle.puzzle)
+    solutions = DancingLinksSolver(start_board_array=generated_puzzle.puzzle).solve_all(limit=2)
+    assert len(solutions) == 1
+    assert np.array_equal(solutions[0], generated_puzzle.solution)
+
+
+def test_generator_is_reproducible_and_reusable():
+    """
+    The purpose of this function is to test the same seed gives the same puzzle, also from a generator that already
+    made other puzzles
+    :return:
+    """
+    puzzle_generator = PuzzleGenerator()
+    first_puzzle = puzzle_generator.generate(seed=11)
+    puzzle_generator.generate(seed=12)
+    assert np.array_equal(puzzle_generator.generate(seed=11).puzzle, first_puzzle.puzzle)
+    assert np.array_equal(PuzzleGenerator().generate(seed=11).puzzle, first_puzzle.puzzle)
+
+
+def test_symmetry_and_target_clues():
+    generated_puzzle = PuzzleGenerator(symmetry='rotational').generate(seed=5, target_clues=30)
+    given = generated_puzzle.puzzle > 0
+    assert np.array_equal(given, given[::-1, ::-1])
+    assert generated_puzzle.clues <= 30
+    assert len(DancingLinksSolver(start_board_array=generated_puzzle.puzzle).solve_all(limit=2)) == 1
+
+
+def test_symmetry_groups_cover_every_cell():
+    for symmetry in ('none', 'rotational', 'horizontal', 'vertical', 'diagonal'):
+        symmetry_groups = create_symmetry_groups(symmetry=symmetry)
+        assert sorted(x for y in symmetry_groups for x in y) == list(range(81))
+    with pytest.raises(ValueError):
+        create_symmetry_groups(symmetry='spiral')
+
+
+def test_generate_puzzles_does_not_depend_on_workers():
+    """
+    The purpose of this function is to test the process pool gives the same puzzles in the same order as generating
+    in this process
+    :return:
+    """
+    in_process = [x.puzzle for x in generate_puzzles(count=3, seed=8, workers=1, chunk_size=2)]
+    in_pool = [x.puzzle for x in generate_puzzles(count=3, seed=8, workers=2, chunk_size=1)]
+    assert all(np.array_equal(x, y) for x, y in zip(in_process, in_pool))
+    assert len(in_pool) == 3
+
+
+def test_main_writes_puzzle_lines(tmp_path, capsys):
+    output_path = tmp_path.joinpath('puzzles.txt')
+    assert main(['--count', '2', '--seed', '3', '--workers', '1', '--output', str(output_path)]) == 0
+    puzzle_lines = output_path.read_text().split()
+    assert len(puzzle_lines) == 2 and all(len(x) == 81 for x in puzzle_lines)
+    assert 'puzzles/sec' in capsys.readouterr().err
@@ -0,0 +1,94 @@
+from Source.sudoku_instrumentation import SolveHook, SolveStats, summarize_latencies
+from Source.sudoku_loader import puzzle_string_to_array
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_propagation import PropagationQueue
+from Source.sudoku_search import search_solve
+from Source.sudoku_strategies import StrategyPipeline
+from Source.sudoku_tensor import SudokuTensorBoard
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+class RecordingHook(SolveHook):
+    def __init__(self):
+        self.events = list()
+
+    def on_strategy_start(self, strategy_name: str = None, sudoku_board=None):
+        self.events.append(('start', strategy_name))
+
+    def on_strategy_end(self, strategy_name: str = None, sudoku_board=None, eliminations: int = None,
+                        cells_solved: int = None, seconds: float = None):
+        self.events.append(('end', strategy_name))
+
+
+def test_sweeps_record_eliminations_and_solved_cells():
+    """
+    The purpose of this function is to test the sweep totals add up to what happened to the board
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(easy_puzzle)
+    for board_class in (SudokuBoard, SudokuTensorBoard):
+        solve_stats = SolveStats()
+        sudoku_board = board_class(start_board_array=puzzle_array, solve_stats=solve_stats)
+        known_before = int(sudoku_board.count_known_cells())
+        sudoku_board.remove_known_neighbors()
+        sudoku_board.column_solve()
+        sudoku_board.row_solve()
+        assert set(solve_stats.strategies) == {'remove_known_neighbors', 'column_solve', 'row_solve'}
+        cells_solved = sum(x.cells_solved for x in solve_stats.strategies.values())
+        assert cells_solved == int(sudoku_board.count_known_cells()) - known_before
+        assert solve_stats.strategies['remove_known_neighbors'].eliminations > 0
+        assert all(x.sweeps == 1 and x.seconds > 0 for x in solve_stats.strategies.values())
+
+
+def test_search_and_pipeline_stats_with_hooks():
+    recording_hook = RecordingHook()
+    solve_stats = SolveStats(hooks=[recording_hook])
+    search_result = search_solve(start_board_array=puzzle_string_to_array(inkala_puzzle),
+                                 strategy_pipeline=StrategyPipeline(), solve_stats=solve_stats)
+    assert search_result.solved
+    assert search_result.stats is solve_stats
+    assert {'propagation_queue', 'hidden_singles', 'naked_singles', 'x_wing'} <= set(solve_stats.strategies)
+    assert len(recording_hook.events) == 2 * sum(x.sweeps for x in solve_stats.strategies.values())
+    assert 'x_wing' in solve_stats.format_table()
+
+
+def test_merge_and_disabled_path():
+    first_stats = SolveStats()
+    first_stats.record(strategy_name='row_solve', eliminations=3, cells_solved=1, seconds=0.5)
+    second_stats = SolveStats()
+    second_stats.record(strategy_name='row_solve', eliminations=2, cells_solved=0, seconds=0.25)
+    first_stats.merge(other_stats=second_stats)
+    assert first_stats.as_dict()['row_solve'] == {'sweeps': 2, 'eliminations': 5, 'cells_solved': 1, 'seconds': 0.75}
+
+    sudoku_board = SudokuBoard(start_board_array=puzzle_string_to_array(easy_puzzle))
+    assert sudoku_board.solve_stats is None
+    sudoku_board.remove_known_neighbors()
+    assert sudoku_board.check_out_of_options() == []
+
+
+def test_measure_reads_the_queue_counters():
+    """
+    The purpose of this function is to test a measured call with a queue attached is counted from the queue's running
+    counters, without the board being scanned
+    :return:
+    """
+    sudoku_board = SudokuBoard(start_board_array=puzzle_string_to_array(easy_puzzle))
+    propagation_queue = PropagationQueue(sudoku_board=sudoku_board)
+    propagation_queue.push_known_cells()
+    known_before = propagation_queue.count_known_cells()
+    solve_stats = SolveStats()
+    assert solve_stats.measure(strategy_name='propagation_queue', sudoku_board=None,
+                               strategy_call=propagation_queue.run, propagation_queue=propagation_queue)
+    queue_stats = solve_stats.strategies['propagation_queue']
+    assert queue_stats.cells_solved == propagation_queue.count_known_cells() - known_before > 0
+    assert queue_stats.eliminations == propagation_queue.eliminations
+
+
+def test_summarize_latencies():
+    summary = summarize_latencies(latencies=[0.1, 0.2, 0.3, 0.4])
+    assert summary['count'] == 4
+    assert summary['p50'] == 0.25
+    assert summary['max'] == 0.4
+    assert abs(summary['throughput'] - 4.0) < 1e-9
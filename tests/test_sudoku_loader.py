@@ -0,0 +1,117 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from Source.sudoku_loader import PACKED_HEADER_DTYPE, PackedPuzzleFile, PackedPuzzleWriter, load_puzzle, \
+    puzzle_string_to_array, stream_puzzles, write_packed_puzzles
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+hard_puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+
+def test_stream_text_file_in_chunks(tmp_path):
+    """
+    The purpose of this function is to test a text corpus comes back in order and in fixed size chunks, including
+    a last line with no newline
+    :return:
+    """
+    puzzle_strings = [easy_puzzle, hard_puzzle] * 5
+    puzzle_path = tmp_path.joinpath('corpus.txt')
+    puzzle_path.write_text('\n'.join(puzzle_strings))
+
+    chunks = list(stream_puzzles(puzzle_path=puzzle_path, chunk_size=4, block_bytes=200))
+    assert [len(x) for x in chunks] == [4, 4, 2]
+    assert all(x.dtype == np.uint8 for x in chunks)
+    streamed = np.concatenate(chunks)
+    assert np.array_equal(streamed, np.array([puzzle_string_to_array(x) for x in puzzle_strings]))
+
+
+def test_stream_csv_skips_header_and_solution_column(tmp_path):
+    """
+    The purpose of this function is to test a CSV with a header row and a solution column
+    :return:
+    """
+    puzzle_path = tmp_path.joinpath('corpus.csv')
+    puzzle_path.write_text(f"quizzes,solutions\r\n{easy_puzzle},{'1' * 81}\r\n\r\n{hard_puzzle},{'2' * 81}\r\n")
+    streamed = np.concatenate(list(stream_puzzles(puzzle_path=puzzle_path)))
+    assert streamed.shape == (2, 9, 9)
+    assert np.array_equal(streamed[1], puzzle_string_to_array(hard_puzzle))
+
+
+def test_stream_keeps_malformed_puzzle_lines_in_place(tmp_path):
+    """
+    The purpose of this function is to test a malformed puzzle line still gives a puzzle, every cell 255, so the
+    puzzles stay in line with the input, while a line not starting with a cell character is skipped
+    :return:
+    """
+    puzzle_path = tmp_path.joinpath('corpus.txt')
+    bad_character = easy_puzzle[:40] + 'x' + easy_puzzle[41:]
+    puzzle_path.write_text(f"{'a' * 81}\n{easy_puzzle}x\n{bad_character}\n{easy_puzzle[:80]}\n{easy_puzzle}\n")
+    streamed = np.concatenate(list(stream_puzzles(puzzle_path=puzzle_path)))
+    assert len(streamed) == 4
+    assert (streamed[:3] == 255).all()
+    assert np.array_equal(streamed[3], puzzle_string_to_array(easy_puzzle))
+
+
+def test_stream_empty_file(tmp_path):
+    puzzle_path = tmp_path.joinpath('empty.txt')
+    puzzle_path.write_text('')
+    assert list(stream_puzzles(puzzle_path=puzzle_path)) == []
+
+
+def test_load_puzzle_formats_agree(tmp_path):
+    """
+    The purpose of this function is to test each format plugin loads the bundled puzzle the same way
+    :return:
+    """
+    repo_root = Path(__file__).parent.parent
+    pickle_puzzle = load_puzzle(puzzle_path=repo_root.joinpath('puzzle_0001.pkl'))
+    excel_puzzle = load_puzzle(puzzle_path=repo_root.joinpath('puzzle_0001.xlsx'))
+    text_path = tmp_path.joinpath('puzzle.txt')
+    text_path.write_text(''.join(str(x) for x in pickle_puzzle.ravel()) + '\n')
+    assert np.array_equal(pickle_puzzle, excel_puzzle)
+    assert np.array_equal(pickle_puzzle, load_puzzle(puzzle_path=text_path))
+
+
+def test_load_puzzle_unknown_format():
+    with pytest.raises(ValueError):
+        load_puzzle(puzzle_path=Path('puzzle.json'))
+
+
+def test_packed_round_trip_with_columns(tmp_path):
+    """
+    The purpose of this function is to test puzzles, solutions and status come back from a packed file unchanged
+    :return:
+    """
+    random_state = np.random.default_rng(7)
+    puzzles = random_state.integers(0, 10, size=(50, 9, 9), dtype=np.uint8)
+    solutions = random_state.integers(1, 10, size=(50, 9, 9), dtype=np.uint8)
+    status = random_state.integers(1, 4, size=50, dtype=np.uint8)
+    packed_path = tmp_path.joinpath('corpus.sdkp')
+    assert write_packed_puzzles(puzzle_path=packed_path, puzzles=puzzles, solutions=solutions, status=status) == 50
+    assert packed_path.stat().st_size == PACKED_HEADER_DTYPE.itemsize + 50 * (41 + 41 + 1)
+
+    packed_file = PackedPuzzleFile(puzzle_path=packed_path)
+    assert len(packed_file) == 50
+    assert np.array_equal(packed_file[10:20], puzzles[10:20])
+    assert np.array_equal(packed_file[-1], puzzles[-1])
+    assert np.array_equal(packed_file.get_solutions(start=5), solutions[5:])
+    assert np.array_equal(packed_file.get_status(), status)
+    assert np.array_equal(np.concatenate(list(stream_puzzles(puzzle_path=packed_path, chunk_size=16))), puzzles)
+    assert np.array_equal(load_puzzle(puzzle_path=packed_path), puzzles[0])
+
+
+def test_packed_writer_appends_chunks(tmp_path):
+    puzzles = np.random.default_rng(3).integers(0, 10, size=(30, 9, 9), dtype=np.uint8)
+    packed_path = tmp_path.joinpath('chunks.sdkp')
+    with PackedPuzzleWriter(puzzle_path=packed_path) as packed_writer:
+        for chunk_start in range(0, 30, 8):
+            packed_writer.append(puzzles=puzzles[chunk_start:chunk_start + 8])
+    packed_file = PackedPuzzleFile(puzzle_path=packed_path)
+    assert packed_path.stat().st_size == PACKED_HEADER_DTYPE.itemsize + 30 * 41
+    assert np.array_equal(packed_file[:], puzzles)
+    with pytest.raises(ValueError):
+        packed_file.get_solutions()
+    with pytest.raises(ValueError):
+        PackedPuzzleFile(puzzle_path=Path(__file__).parent.parent.joinpath('puzzle_0001.pkl'))
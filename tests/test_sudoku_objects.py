@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from Source.eligible_array import EligibleNumbers
+from Source.eligible_bitmask import EligibleBitmask
+from Source.sudoku_loader import puzzle_string_to_array
+from Source.sudoku_objects import SudokuBoard
+
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+inkala_solution = "812753649943682175675491283154237896369845721287169534521974368438526917796318452"
+
+
+def board_state(sudoku_board: SudokuBoard = None) -> list:
+    return [tuple(x.get_remaining_unknowns()) for x in sudoku_board.board.flat]
+
+
+@pytest.mark.parametrize("eligible_class", [EligibleBitmask, EligibleNumbers])
+def test_nested_checkpoints_roll_back(eligible_class):
+    """
+    The purpose of this function is to test rolling back to each of two nested checkpoints restores the board as it
+    was when the checkpoint was taken
+    :return:
+    """
+    sudoku_board = SudokuBoard(start_board_array=puzzle_string_to_array(inkala_puzzle), eligible_class=eligible_class)
+    start_state = board_state(sudoku_board)
+    outer_checkpoint = sudoku_board.checkpoint()
+    sudoku_board.eliminate_seen_values()
+    propagated_state = board_state(sudoku_board)
+    assert propagated_state != start_state
+
+    inner_checkpoint = sudoku_board.checkpoint()
+    sudoku_board.board[0, 1].eligible_numbers.set_value(set_value=1)
+    sudoku_board.propagate()
+    assert board_state(sudoku_board) != propagated_state
+
+    sudoku_board.rollback(checkpoint=inner_checkpoint)
+    assert board_state(sudoku_board) == propagated_state
+    sudoku_board.rollback(checkpoint=outer_checkpoint)
+    assert board_state(sudoku_board) == start_state
+
+
+def test_release_trail_stops_recording():
+    sudoku_board = SudokuBoard(start_board_array=puzzle_string_to_array(inkala_puzzle))
+    assert sudoku_board.checkpoint() == 0
+    sudoku_board.eliminate_seen_values()
+    assert len(sudoku_board.trail) > 0
+    sudoku_board.release_trail()
+    assert sudoku_board.trail is None
+    assert all(x.eligible_numbers.trail is None for x in sudoku_board.board.flat)
+    sudoku_board.propagate()
+    assert sudoku_board.trail is None
+
+
+def test_count_solutions_stops_at_limit():
+    """
+    The purpose of this function is to test the counter tells apart none, one and many solutions, and leaves the
+    board as it was
+    :return:
+    """
+    sudoku_board = SudokuBoard(start_board_array=puzzle_string_to_array(inkala_puzzle))
+    masks_before = sudoku_board.get_candidate_masks()
+    assert sudoku_board.count_solutions(limit=2) == 1
+    assert sudoku_board.get_candidate_masks() == masks_before
+    assert sudoku_board.trail is None
+
+    empty_board = SudokuBoard(start_board_array=np.zeros(shape=(9, 9), dtype=np.uint8))
+    assert empty_board.count_solutions(limit=2) == 2
+    assert empty_board.count_solutions(limit=25) == 25
+
+    repeated_puzzle = puzzle_string_to_array(inkala_puzzle)
+    repeated_puzzle[0, 1] = 8
+    assert SudokuBoard(start_board_array=repeated_puzzle).count_solutions(limit=2) == 0
+
+
+def test_iter_solutions_is_lazy():
+    """
+    The purpose of this function is to test the solutions come out one at a time, all different and all valid. The
+    puzzle is the inkala solution with a rectangle of swappable cells blanked, so it has exactly two solutions.
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(inkala_solution)
+    puzzle_array[np.ix_([0, 1], [2, 5])] = 0
+    sudoku_board = SudokuBoard(start_board_array=puzzle_array)
+    solution_iterator = sudoku_board.iter_solutions()
+    first_solution = next(solution_iterator)
+    solution_iterator.close()
+    assert sudoku_board.get_value_array()[0, 2] == 0
+
+    solutions = list(sudoku_board.iter_solutions())
+    assert len(solutions) == sudoku_board.count_solutions(limit=None) == 2
+    assert np.array_equal(solutions[0], first_solution)
+    assert not np.array_equal(solutions[0], solutions[1])
+    assert len(list(sudoku_board.iter_solutions(limit=1))) == 1
+    given = puzzle_array > 0
+    for solution in solutions:
+        assert np.array_equal(solution[given], puzzle_array[given])
+        assert all(sorted(x.tolist()) == list(range(1, 10)) for x in solution)
+
+
+def test_cells_share_geometry_and_board_candidates():
+    """
+    The purpose of this function is to test two boards share the geometry of their cells, while each board owns the
+    eligible numbers its cells point at
+    :return:
+    """
+    first_board = SudokuBoard(start_board_array=puzzle_string_to_array(inkala_puzzle))
+    second_board = SudokuBoard(start_board_array=puzzle_string_to_array(inkala_puzzle))
+    first_cell = first_board.board[4, 7]
+    assert first_cell.geometry is second_board.board[4, 7].geometry
+    assert (first_cell.row, first_cell.column, first_cell.parent_square) == (4, 7, 'f')
+    assert first_cell.eligible_numbers is first_board.candidates[4 * 9 + 7]
+    assert first_cell.eligible_numbers is not second_board.board[4, 7].eligible_numbers
+    assert not hasattr(first_cell, '__dict__')
+
+    first_board.propagate()
+    assert first_board.get_candidate_masks() != second_board.get_candidate_masks()
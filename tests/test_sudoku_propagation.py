@@ -0,0 +1,42 @@
+import pytest
+
+from Source.sudoku_loader import puzzle_string_to_array
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_propagation import PropagationQueue, create_peer_index_tuple
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+hard_puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+
+def test_peer_index_tuple():
+    peer_index = create_peer_index_tuple()
+    assert len(peer_index) == 81
+    assert all(len(x) == 20 for x in peer_index)
+    assert peer_index[0] == (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 18, 19, 20, 27, 36, 45, 54, 63, 72)
+
+
+@pytest.mark.parametrize("puzzle_string", [easy_puzzle, hard_puzzle])
+def test_queue_matches_sweeps(puzzle_string):
+    """
+    The purpose of this function is to test the queue reaches the same board as the full sweeps, and that its
+    running counters agree with a rescan of the board
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(puzzle_string)
+    swept_board = SudokuBoard(start_board_array=puzzle_array)
+    swept_board.eliminate_seen_values()
+
+    queued_board = SudokuBoard(start_board_array=puzzle_array)
+    propagation_queue = PropagationQueue(sudoku_board=queued_board)
+    propagation_queue.push_known_cells()
+    assert propagation_queue.run()
+
+    assert queued_board.board_display() == swept_board.board_display()
+    assert propagation_queue.count_known_cells() == queued_board.count_known_cells()
+    assert propagation_queue.get_board_wide_unkowns_count() == queued_board.get_board_wide_unkowns_count()
+
+
+def test_queue_finds_duplicate_givens():
+    puzzle_array = puzzle_string_to_array(easy_puzzle)
+    puzzle_array[0, 0] = 3
+    assert not SudokuBoard(start_board_array=puzzle_array).propagate()
@@ -0,0 +1,65 @@
+import io
+
+import numpy as np
+
+from Source.sudoku_loader import puzzle_string_to_array
+from Source.sudoku_rating import GUESS_NAME, INVALID_TIER, main, rate_corpus, rate_puzzle, rate_puzzle_chunk
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+x_wing_puzzle = "100000569492056108056109240009640801064010000218035604040500016905061402621000005"
+
+
+def test_rating_follows_the_hardest_step():
+    """
+    The purpose of this function is to test the tier and grade go up with the hardest step a puzzle needs
+    :return:
+    """
+    easy_rating = rate_puzzle(puzzle_array=puzzle_string_to_array(easy_puzzle))
+    x_wing_rating = rate_puzzle(puzzle_array=puzzle_string_to_array(x_wing_puzzle))
+    inkala_rating = rate_puzzle(puzzle_array=puzzle_string_to_array(inkala_puzzle))
+
+    assert (easy_rating.tier, easy_rating.hardest, easy_rating.usage) == ('easy', 'naked_singles',
+                                                                          {'naked_singles': 1})
+    assert 1 < easy_rating.grade < 2
+    assert (x_wing_rating.tier, x_wing_rating.hardest) == ('expert', 'x_wing')
+    assert x_wing_rating.usage['x_wing'] >= 1 and GUESS_NAME not in x_wing_rating.usage
+    assert (inkala_rating.tier, inkala_rating.hardest) == ('diabolical', GUESS_NAME)
+    assert inkala_rating.usage[GUESS_NAME] > 0
+    assert all(x.solved for x in (easy_rating, x_wing_rating, inkala_rating))
+    assert easy_rating.grade < x_wing_rating.grade < inkala_rating.grade
+
+
+def test_rate_puzzle_chunk_turns_invalid_puzzles_away():
+    repeated_puzzle = puzzle_string_to_array(easy_puzzle)
+    repeated_puzzle[0, 0] = 3
+    puzzle_ratings = rate_puzzle_chunk(puzzle_chunk=np.stack([repeated_puzzle, puzzle_string_to_array(easy_puzzle)]))
+    assert [x.tier for x in puzzle_ratings] == [INVALID_TIER, 'easy']
+    assert not puzzle_ratings[0].solved and puzzle_ratings[0].grade == 0.0
+
+
+def test_rate_corpus_streams_in_input_order(tmp_path):
+    """
+    The purpose of this function is to test the ratings come back in input order across several workers and chunks
+    :return:
+    """
+    corpus_path = tmp_path.joinpath('corpus.txt')
+    bad_puzzle = '...030x' + easy_puzzle[7:]
+    corpus_path.write_text('\n'.join([inkala_puzzle, easy_puzzle, x_wing_puzzle, bad_puzzle, easy_puzzle]) + '\n')
+    output_stream = io.StringIO()
+    tier_counts = rate_corpus(corpus_path=corpus_path, output_stream=output_stream, workers=2, chunk_size=1)
+    assert tier_counts == {'diabolical': 1, 'easy': 2, 'expert': 1, INVALID_TIER: 1}
+
+    rating_lines = [x.split(',') for x in output_stream.getvalue().splitlines()]
+    assert rating_lines[0][:4] == ['puzzle', 'grade', 'tier', 'hardest'] and rating_lines[0][-1] == GUESS_NAME
+    assert [x[0] for x in rating_lines[1:]] == [inkala_puzzle, easy_puzzle, x_wing_puzzle, '?' * 81, easy_puzzle]
+    assert [x[2] for x in rating_lines[1:]] == ['diabolical', 'easy', 'expert', INVALID_TIER, 'easy']
+
+
+def test_main_writes_output_file(tmp_path, capsys):
+    corpus_path = tmp_path.joinpath('corpus.txt')
+    corpus_path.write_text(easy_puzzle + '\n')
+    output_path = tmp_path.joinpath('ratings.csv')
+    assert main([str(corpus_path), '--workers', '1', '--output', str(output_path)]) == 0
+    assert output_path.read_text().splitlines()[1].split(',')[2] == 'easy'
+    assert 'puzzles/sec' in capsys.readouterr().err
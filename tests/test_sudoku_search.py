@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from Source.sudoku_loader import load_puzzle, puzzle_string_to_array
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_search import search_solve
+from Source.sudoku_solver import solve
+
+hard_puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+seventeen_clue_puzzle = "000000010400000000020000000000050407008000300001090000300400200050100000000806000"
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+def is_valid_solution(grid: np.array = None) -> bool:
+    units = [grid[i, :] for i in range(9)] + [grid[:, i] for i in range(9)]
+    units += [grid[i:i + 3, j:j + 3].ravel() for i in (0, 3, 6) for j in (0, 3, 6)]
+    return all(sorted(unit.tolist()) == list(range(1, 10)) for unit in units)
+
+
+@pytest.mark.parametrize("puzzle_string", [hard_puzzle, seventeen_clue_puzzle, inkala_puzzle])
+def test_search_solves_hard_puzzles(puzzle_string):
+    """
+    The purpose of this function is to test the search solves puzzles the sweeps alone leave unsolved
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(puzzle_string)
+    search_result = search_solve(start_board_array=puzzle_array)
+    assert search_result.solved
+    assert is_valid_solution(search_result.grid)
+    given = puzzle_array > 0
+    assert np.array_equal(search_result.grid[given], puzzle_array[given])
+    assert search_result.nodes_visited >= search_result.backtracks
+
+
+def test_search_reports_unsolvable_puzzle():
+    """
+    The purpose of this function is to test the bundled puzzle, which has no solution, is reported as unsolved
+    :return:
+    """
+    puzzle_array = load_puzzle(puzzle_path=Path(__file__).parent.parent.joinpath('puzzle_0001.pkl'))
+    search_result = search_solve(start_board_array=puzzle_array)
+    assert not search_result.solved
+
+
+def pattern_puzzle(box_size: int = None, blank_fraction: float = None, seed: int = 1) -> np.array:
+    """
+    The purpose of this function is to make a big puzzle by blanking random cells of a patterned solution grid
+    :return:
+    """
+    side = box_size * box_size
+    side_range = np.arange(side)
+    solution_grid = (box_size * (side_range[:, None] % box_size) + side_range[:, None] // box_size
+                     + side_range[None, :]) % side + 1
+    puzzle_array = solution_grid.astype(np.uint8)
+    puzzle_array[np.random.default_rng(seed).random((side, side)) < blank_fraction] = 0
+    return puzzle_array
+
+
+@pytest.mark.parametrize("box_size, blank_fraction", [(2, 0.6), (4, 0.55), (5, 0.4)])
+def test_search_solves_bigger_boards(box_size, blank_fraction):
+    """
+    The purpose of this function is to test the search solves 4 x 4, 16 x 16 and 25 x 25 puzzles
+    :return:
+    """
+    side = box_size * box_size
+    puzzle_array = pattern_puzzle(box_size=box_size, blank_fraction=blank_fraction)
+    search_result = search_solve(start_board_array=puzzle_array)
+    assert search_result.solved
+    grid = search_result.grid
+    units = [grid[i, :] for i in range(side)] + [grid[:, i] for i in range(side)]
+    units += [grid[i:i + box_size, j:j + box_size].ravel() for i in range(0, side, box_size)
+              for j in range(0, side, box_size)]
+    assert all(sorted(unit.tolist()) == list(range(1, side + 1)) for unit in units)
+    given = puzzle_array > 0
+    assert np.array_equal(grid[given], puzzle_array[given])
+
+
+@pytest.mark.parametrize("box_size", [4, 5])
+def test_solve_counts_bigger_boards(box_size):
+    """
+    The purpose of this function is to test the known cell count does not wrap on boards with more than 255 cells,
+    so the sweeps solve a 16 x 16 or 25 x 25 puzzle on their own and solve counts their eliminations right
+    :return:
+    """
+    side = box_size * box_size
+    puzzle_array = pattern_puzzle(box_size=box_size, blank_fraction=20 / (side * side))
+    blank_count = int((puzzle_array == 0).sum())
+    sudoku_board = SudokuBoard(start_board_array=puzzle_array)
+    assert sudoku_board.count_known_cells() == side * side - blank_count
+
+    solve_result = solve(puzzle_array=puzzle_array)
+    assert solve_result.solved and solve_result.finish_method is None
+    assert solve_result.board.count_known_cells() == side * side
+    assert solve_result.eliminations == blank_count * (side - 1)
@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import pytest
+
+from Source.sudoku_service import SolveClient, SolveService, parse_puzzle
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+easy_solution = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+inkala_solution = "812753649943682175675491283154237896369845721287169534521974368438526917796318452"
+repeated_puzzle = "88" + inkala_puzzle[2:]
+
+
+def run_with_service(client_calls, **service_options):
+    """
+    The purpose of this function is to start a service on a free localhost port, run client_calls against it and
+    stop it again
+    :return: whatever client_calls returns
+    """
+
+    async def run():
+        solve_service = SolveService(**service_options)
+        await solve_service.start(port=0)
+        try:
+            return await client_calls(solve_service)
+        finally:
+            await solve_service.close()
+
+    return asyncio.run(run())
+
+
+def test_service_solves_and_batches():
+    """
+    The purpose of this function is to test concurrent requests come back with their ids, and are solved together
+    :return:
+    """
+
+    async def client_calls(solve_service):
+        solve_client = await SolveClient.connect(port=solve_service.address[1])
+        puzzles = [easy_puzzle, inkala_puzzle, repeated_puzzle] * 4
+        responses = await asyncio.gather(*[solve_client.solve(puzzle_string=x) for x in puzzles])
+        metrics = await solve_client.get_metrics()
+        await solve_client.close()
+        return responses, metrics
+
+    responses, metrics = run_with_service(client_calls, max_batch_size=8, max_batch_delay=0.05)
+    assert [x['solution'] for x in responses[:3]] == [easy_solution, inkala_solution, None]
+    assert [x['solved'] for x in responses] == [True, True, False] * 4
+    assert metrics['responses'] == 12
+    assert metrics['batches'] < 12
+    assert metrics['latency']['count'] == 12
+
+
+def test_service_reports_bad_requests():
+    async def client_calls(solve_service):
+        reader, writer = await asyncio.open_connection(host='127.0.0.1', port=solve_service.address[1])
+        writer.write(b'not json\n' + json.dumps({'id': 'a', 'puzzle': 'x' * 81}).encode() + b'\n')
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in range(2)]
+        writer.close()
+        await writer.wait_closed()
+        return responses
+
+    responses = run_with_service(client_calls)
+    assert 'error' in responses[0] and responses[0]['id'] is None
+    assert responses[1]['id'] == 'a' and 'error' in responses[1]
+
+
+def test_service_applies_back_pressure():
+    """
+    The purpose of this function is to test a full queue holds requests back instead of growing, and that every
+    request still gets its answer
+    :return:
+    """
+
+    async def client_calls(solve_service):
+        solve_client = await SolveClient.connect(port=solve_service.address[1])
+        responses = await asyncio.gather(*[solve_client.solve(puzzle_string=inkala_puzzle) for _ in range(20)])
+        metrics = await solve_client.get_metrics()
+        await solve_client.close()
+        return responses, metrics
+
+    responses, metrics = run_with_service(client_calls, max_batch_size=2, max_queue_size=3)
+    assert all(x['solution'] == inkala_solution for x in responses)
+    assert metrics['max_queue_depth'] <= 3
+
+
+def test_parse_puzzle():
+    assert parse_puzzle(puzzle_string=inkala_puzzle.replace('0', '.'))[0, 0] == 8
+    with pytest.raises(ValueError):
+        parse_puzzle(puzzle_string='123')
+
+
+def test_service_over_unix_socket(tmp_path):
+    socket_path = str(tmp_path.joinpath('sudoku.sock'))
+
+    async def run():
+        solve_service = SolveService()
+        await solve_service.start(unix_path=socket_path)
+        try:
+            solve_client = await SolveClient.connect(unix_path=socket_path)
+            response = await solve_client.solve(puzzle_string=easy_puzzle)
+            await solve_client.close()
+            return response
+        finally:
+            await solve_service.close()
+
+    assert asyncio.run(run())['solution'] == easy_solution
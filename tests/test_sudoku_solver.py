@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from Source.sudoku_instrumentation import SolveStats
+from Source.sudoku_loader import load_puzzle, puzzle_string_to_array
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_solver import grid_has_repeats, solve, sweep_to_fixed_point
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+easy_solution = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+inkala_solution = "812753649943682175675491283154237896369845721287169534521974368438526917796318452"
+
+
+@pytest.mark.parametrize("engine", ['object', 'tensor'])
+def test_solve_easy_by_sweeps_alone(engine):
+    """
+    The purpose of this function is to test an easy puzzle is solved by the sweeps with no finishing solver
+    :return:
+    """
+    solve_result = solve(puzzle_array=puzzle_string_to_array(easy_puzzle), engine=engine, finish_method=None)
+    assert solve_result.solved
+    assert solve_result.finish_method is None
+    assert np.array_equal(solve_result.grid, puzzle_string_to_array(easy_solution))
+    assert solve_result.rounds >= 1
+    assert solve_result.eliminations > 0
+
+
+def test_solve_hands_over_when_sweeps_stall():
+    solve_stats = SolveStats()
+    solve_result = solve(puzzle_array=puzzle_string_to_array(inkala_puzzle), solve_stats=solve_stats)
+    assert solve_result.solved
+    assert solve_result.finish_method == 'search'
+    assert np.array_equal(solve_result.grid, puzzle_string_to_array(inkala_solution))
+    assert sum(x.eliminations for x in solve_stats.strategies.values()) == solve_result.eliminations
+
+    stalled = solve(puzzle_array=puzzle_string_to_array(inkala_puzzle), finish_method=None)
+    assert not stalled.solved and not stalled.contradiction
+    assert stalled.grid.min() == 0
+
+
+def test_fixed_point_stops_after_one_quiet_round():
+    """
+    The purpose of this function is to test that a board already at its fixed point costs a single round
+    :return:
+    """
+    sudoku_board = SudokuBoard(start_board_array=puzzle_string_to_array(inkala_puzzle))
+    rounds, contradiction = sweep_to_fixed_point(sudoku_board=sudoku_board)
+    assert not contradiction and rounds >= 2
+    assert sweep_to_fixed_point(sudoku_board=sudoku_board) == (1, False)
+
+
+def test_solve_reports_contradiction():
+    puzzle_array = load_puzzle(puzzle_path=Path(__file__).parent.parent.joinpath('puzzle_0001.pkl'))
+    solve_result = solve(puzzle_array=puzzle_array)
+    assert solve_result.contradiction
+    assert not solve_result.solved
+
+    repeated = puzzle_string_to_array(easy_puzzle)
+    repeated[0, 0] = 3
+    assert grid_has_repeats(grid=repeated)
+    assert solve(puzzle_array=repeated).contradiction
+
+
+def test_solve_unknown_finish_method():
+    with pytest.raises(ValueError):
+        solve(puzzle_array=puzzle_string_to_array(easy_puzzle), finish_method='guess')
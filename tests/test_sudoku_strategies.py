@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from Source.sudoku_dlx import dlx_solve
+from Source.sudoku_loader import puzzle_string_to_array
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_propagation import PropagationQueue
+from Source.sudoku_search import search_solve
+from Source.sudoku_strategies import DeductionStrategy, StrategyPipeline, XWing, NakedPairs, create_default_strategies
+
+hard_puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+x_wing_puzzle = "100000569492056108056109240009640801064010000218035604040500016905061402621000005"
+
+
+@pytest.mark.parametrize("puzzle_string", [hard_puzzle, inkala_puzzle, x_wing_puzzle])
+def test_strategies_keep_the_solution(puzzle_string):
+    """
+    The purpose of this function is to test the strategies never remove the number the solution needs
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(puzzle_string)
+    solution = dlx_solve(start_board_array=puzzle_array).ravel()
+    sudoku_board = SudokuBoard(start_board_array=puzzle_array)
+    assert sudoku_board.apply_strategies()
+    candidate_masks = sudoku_board.get_candidate_masks()
+    assert all(candidate_masks[x] >> int(solution[x]) & 1 for x in range(81))
+
+
+def test_x_wing_puzzle_needs_x_wing():
+    """
+    The purpose of this function is to test the x-wing puzzle is solved only once x-wing is in the pipeline
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(x_wing_puzzle)
+    no_x_wing = [x for x in create_default_strategies() if not isinstance(x, XWing)]
+    sudoku_board = SudokuBoard(start_board_array=puzzle_array)
+    assert sudoku_board.apply_strategies(strategy_pipeline=StrategyPipeline(strategies=no_x_wing))
+    assert sudoku_board.count_known_cells() < 81
+
+    strategy_pipeline = StrategyPipeline()
+    sudoku_board = SudokuBoard(start_board_array=puzzle_array)
+    assert sudoku_board.apply_strategies(strategy_pipeline=strategy_pipeline)
+    assert sudoku_board.count_known_cells() == 81
+    assert strategy_pipeline.usage['x_wing'] >= 1
+
+
+def test_pipeline_orders_by_cost():
+    strategy_pipeline = StrategyPipeline(strategies=[XWing(), NakedPairs()])
+    assert [x.name for x in strategy_pipeline.strategies] == ['naked_pairs', 'x_wing']
+
+
+def test_strategies_reduce_search_nodes():
+    puzzle_array = puzzle_string_to_array(inkala_puzzle)
+    plain_result = search_solve(start_board_array=puzzle_array)
+    strategy_result = search_solve(start_board_array=puzzle_array, strategy_pipeline=StrategyPipeline())
+    assert strategy_result.solved
+    assert np.array_equal(strategy_result.grid, plain_result.grid)
+    assert strategy_result.nodes_visited < plain_result.nodes_visited
+
+
+def test_pipeline_keeps_the_queue_right():
+    """
+    The purpose of this function is to test a pipeline run through the board's queue reaches the same board as a run
+    without it, and leaves the queue's counters as a recount finds them
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(x_wing_puzzle)
+    plain_board = SudokuBoard(start_board_array=puzzle_array)
+    assert plain_board.apply_strategies()
+
+    sudoku_board = SudokuBoard(start_board_array=puzzle_array)
+    propagation_queue = PropagationQueue(sudoku_board=sudoku_board)
+    propagation_queue.push_known_cells()
+    strategy_pipeline = StrategyPipeline()
+    assert strategy_pipeline.run(sudoku_board=sudoku_board, propagation_queue=propagation_queue)
+    assert np.array_equal(sudoku_board.get_value_array(), plain_board.get_value_array())
+    assert strategy_pipeline.changes['x_wing'] >= strategy_pipeline.usage['x_wing'] >= 1
+
+    running_counts = propagation_queue.save_counts()
+    propagation_queue.recount()
+    assert propagation_queue.save_counts() == running_counts
+
+
+def test_strategy_without_apply_cannot_be_created():
+    class NoApply(DeductionStrategy):
+        name = 'no_apply'
+
+    with pytest.raises(TypeError):
+        NoApply()
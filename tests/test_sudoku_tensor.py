@@ -0,0 +1,58 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from Source.sudoku_engines import create_board
+from Source.sudoku_loader import puzzle_string_to_array
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+hard_puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+
+def run_sweeps(sudoku_board):
+    """
+    The purpose of this function is to run the main.py sweep loop quietly on a board
+    :return:
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(26):
+            beginning_unknowns = sudoku_board.get_board_wide_unkowns_count()
+            sudoku_board.remove_known_neighbors()
+            sudoku_board.column_solve()
+            sudoku_board.row_solve()
+            if beginning_unknowns == sudoku_board.get_board_wide_unkowns_count():
+                break
+    return sudoku_board
+
+
+@pytest.mark.parametrize("puzzle_string", [easy_puzzle, hard_puzzle])
+def test_tensor_engine_matches_object_engine(puzzle_string):
+    """
+    The purpose of this function is to test both engines reach the same board after the same sweeps
+    :return:
+    """
+    puzzle_array = puzzle_string_to_array(puzzle_string)
+    object_board = run_sweeps(create_board(start_board_array=puzzle_array, engine='object'))
+    tensor_board = run_sweeps(create_board(start_board_array=puzzle_array, engine='tensor'))
+    assert object_board.board_display() == tensor_board.board_display()
+    assert object_board.count_known_cells() == tensor_board.count_known_cells()
+    assert object_board.get_board_wide_unkowns_count() == tensor_board.get_board_wide_unkowns_count()
+
+
+def test_tensor_engine_solves_easy_puzzle():
+    """
+    The purpose of this function is to test the tensor engine solves an easy puzzle
+    :return:
+    """
+    tensor_board = run_sweeps(create_board(start_board_array=puzzle_string_to_array(easy_puzzle), engine='tensor'))
+    value_array = tensor_board.get_value_array()
+    assert tensor_board.count_known_cells() == 81
+    assert all(sorted(value_array[i, :]) == list(range(1, 10)) for i in range(9))
+    assert all(sorted(value_array[:, i]) == list(range(1, 10)) for i in range(9))
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        create_board(start_board_array=np.zeros((9, 9), dtype=np.uint8), engine='nope')
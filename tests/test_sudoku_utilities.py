@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from Source.sudoku_utilities import CELL_INDEX, UNIT_INDEX, CELL_UNITS, PEER_INDEX, NeighborListDictionary, \
+    BoardIndexTables, CellGeometryTable, PatentSquareArray, box_size_from_side
+
+
+def test_unit_index_array():
+    """
+    The purpose of this function is to test the unit table holds every cell once per unit type
+    :return:
+    """
+    assert UNIT_INDEX.shape == (27, 9)
+    for unit_type in range(3):
+        assert sorted(UNIT_INDEX[unit_type * 9:(unit_type + 1) * 9].ravel().tolist()) == list(range(81))
+    assert UNIT_INDEX[9].tolist() == CELL_INDEX[:, 0].tolist()
+
+
+def test_cell_unit_array():
+    assert CELL_UNITS.shape == (81, 3)
+    assert all(cell_id in UNIT_INDEX[unit_id] for cell_id in range(81) for unit_id in CELL_UNITS[cell_id])
+
+
+def test_peer_index_array_matches_neighbor_dictionary():
+    """
+    The purpose of this function is to test the peer table contains the parent square neighbors, plus row and column
+    :return:
+    """
+    assert PEER_INDEX.shape == (81, 20)
+    neighbor_list_dictionary = NeighborListDictionary.neighbor_list_dictionary()
+    for (n_row, n_col), neighbors in neighbor_list_dictionary.items():
+        cell_peers = set(PEER_INDEX[CELL_INDEX[n_row, n_col]].tolist())
+        assert {int(x) * 9 + int(y) for x, y in neighbors} <= cell_peers
+        assert {int(n_row) * 9 + x for x in range(9)} - {CELL_INDEX[n_row, n_col]} <= cell_peers
+
+
+def test_tables_are_read_only():
+    assert not PEER_INDEX.flags.writeable
+    assert not np.may_share_memory(UNIT_INDEX, PEER_INDEX)
+
+
+@pytest.mark.parametrize("box_size", [2, 4, 5])
+def test_tables_for_bigger_boards(box_size):
+    """
+    The purpose of this function is to test the index tables of 4 x 4, 16 x 16 and 25 x 25 boards
+    :return:
+    """
+    side = box_size * box_size
+    unit_index = BoardIndexTables.unit_index_array(box_size=box_size)
+    peer_index = BoardIndexTables.peer_index_array(box_size=box_size)
+    assert unit_index.shape == (3 * side, side)
+    assert peer_index.shape == (side * side, 3 * side - 2 * box_size - 1)
+    for unit_type in range(3):
+        assert sorted(unit_index[unit_type * side:(unit_type + 1) * side].ravel().tolist()) == list(range(side * side))
+    parent_square_array = PatentSquareArray.patent_square_array(box_size=box_size)
+    assert len(set(parent_square_array.ravel().tolist())) == side
+    assert len(NeighborListDictionary.neighbor_list_dictionary(box_size=box_size)[(0, 0)]) == side - 1
+
+
+def test_box_size_from_side():
+    assert box_size_from_side(side=9) == 3
+    assert box_size_from_side(side=25) == 5
+    with pytest.raises(ValueError):
+        box_size_from_side(side=10)
+
+
+@pytest.mark.parametrize("box_size", [3, 4])
+def test_cell_geometry_table(box_size):
+    """
+    The purpose of this function is to test the shared geometry table agrees with the index tables it is built from
+    :return:
+    """
+    side = box_size * box_size
+    cell_geometry_table = CellGeometryTable.cell_geometry_table(box_size=box_size)
+    assert len(cell_geometry_table) == side * side
+    assert cell_geometry_table is CellGeometryTable.cell_geometry_table(box_size=box_size)
+    for cell_geometry in cell_geometry_table:
+        assert cell_geometry.cell_id == cell_geometry.row * side + cell_geometry.column
+        assert cell_geometry.peers == tuple(BoardIndexTables.peer_index_array(box_size=box_size)[cell_geometry.cell_id])
+        assert cell_geometry.parent_square == PatentSquareArray.patent_square_array(box_size=box_size)[
+            cell_geometry.row, cell_geometry.column]
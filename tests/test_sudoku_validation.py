@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from Source.eligible_array import EligibleNumbers
+from Source.eligible_bitmask import EligibleBitmask
+from Source.sudoku_loader import puzzle_string_to_array
+from Source.sudoku_objects import SudokuBoard
+from Source.sudoku_propagation import PropagationQueue
+from Source.sudoku_solver import solve
+from Source.sudoku_validation import SudokuContradiction, check_puzzles, validate_puzzle
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+
+
+def blocked_row_puzzle() -> np.array:
+    """
+    The purpose of this function is to make a puzzle where row 0 has no place left for a 1, although every one of
+    its empty cells still has eligible numbers
+    :return:
+    """
+    puzzle_array = np.zeros(shape=(9, 9), dtype=np.uint8)
+    puzzle_array[1, 0] = 1
+    puzzle_array[2, 4] = 1
+    puzzle_array[0, 6:9] = (2, 3, 4)
+    return puzzle_array
+
+
+def dead_cell_puzzle() -> np.array:
+    puzzle_array = np.zeros(shape=(9, 9), dtype=np.uint8)
+    puzzle_array[0, 1:9] = range(1, 9)
+    puzzle_array[5, 0] = 9
+    return puzzle_array
+
+
+def test_check_puzzles_batch():
+    """
+    The purpose of this function is to test one call checks a whole stack of puzzles and says what is wrong with each
+    :return:
+    """
+    repeated_puzzle = puzzle_string_to_array(easy_puzzle)
+    repeated_puzzle[0, 0] = 3
+    puzzles = np.stack([puzzle_string_to_array(easy_puzzle), repeated_puzzle, dead_cell_puzzle(),
+                        blocked_row_puzzle()])
+    puzzle_check = check_puzzles(puzzles=puzzles)
+    assert puzzle_check.valid.tolist() == [True, False, False, False]
+    assert puzzle_check.repeated_units[1, 0] and puzzle_check.repeated_units[1].sum() == 2
+    assert np.flatnonzero(puzzle_check.dead_cells[2]).tolist() == [0]
+    assert puzzle_check.blocked_units[3, 0] and not puzzle_check.dead_cells[3].any()
+    assert check_puzzles(puzzles=puzzles[0]).valid.tolist() == [True]
+
+
+def test_validate_puzzle_raises_typed_contradiction():
+    with pytest.raises(SudokuContradiction) as raised:
+        validate_puzzle(puzzle_array=blocked_row_puzzle())
+    assert raised.value.unit_id == 0
+    with pytest.raises(ValueError):
+        validate_puzzle(puzzle_array=dead_cell_puzzle())
+    assert validate_puzzle(puzzle_array=puzzle_string_to_array(easy_puzzle)).dtype == np.uint8
+
+
+def test_solve_stops_before_sweeping():
+    solve_result = solve(puzzle_array=blocked_row_puzzle())
+    assert solve_result.contradiction and not solve_result.solved
+    assert solve_result.rounds == 0
+
+
+def test_queue_stops_when_a_unit_loses_a_number():
+    """
+    The purpose of this function is to test the queue's place counts catch a row losing the last place for a number
+    at the assignment that took it, before any sweep
+    :return:
+    """
+    puzzle_array = blocked_row_puzzle()
+    puzzle_array[0, 8] = 0
+    sudoku_board = SudokuBoard(start_board_array=puzzle_array)
+    propagation_queue = PropagationQueue(sudoku_board=sudoku_board)
+    propagation_queue.push_known_cells()
+    assert propagation_queue.run()
+
+    saved_counts = propagation_queue.save_counts()
+    propagation_queue.assign_value(cell_index=8, value=4)
+    assert not propagation_queue.run()
+    assert propagation_queue.contradiction.unit_id == 0 and propagation_queue.contradiction.number == 1
+
+    propagation_queue.restore_counts(saved_counts=saved_counts)
+    assert propagation_queue.contradiction is None
+    assert propagation_queue.run()
+
+
+@pytest.mark.parametrize("eligible_class", [EligibleBitmask, EligibleNumbers])
+def test_last_value_cannot_be_eliminated(eligible_class):
+    eligible_numbers = eligible_class()
+    eligible_numbers.set_value(set_value=np.uint8(4))
+    with pytest.raises(SudokuContradiction):
+        eligible_numbers.eliminate_value(to_eliminate=np.uint8(4))
+    with pytest.raises(SudokuContradiction):
+        eligible_numbers.eliminate_values(to_eliminate=(4, 5))
+    assert eligible_numbers.get_correct_value() == 4
@@ -0,0 +1,90 @@
+import numpy as np
+import openpyxl
+import pytest
+
+from Source.sudoku_loader import puzzle_string_to_array
+from Source.sudoku_loader_excel import read_workbook_puzzles
+from Source.sudoku_workbook import main, solve_workbook
+
+easy_puzzle = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+easy_solution = "483921657967345821251876493548132976729564138136798245372689514814253769695417382"
+inkala_puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+inkala_solution = "812753649943682175675491283154237896369845721287169534521974368438526917796318452"
+
+
+def write_puzzle_block(worksheet=None, puzzle_array: np.array = None, row: int = 0, column: int = 0):
+    for (cell_row, cell_column), cell_value in np.ndenumerate(puzzle_array):
+        if cell_value:
+            worksheet.cell(row=row + cell_row + 1, column=column + cell_column + 1, value=int(cell_value))
+
+
+@pytest.fixture
+def puzzle_workbook(tmp_path):
+    """
+    The purpose of this function is to make a workbook with a 2 x 2 grid of blocks on one sheet, one of them left
+    empty, and a second sheet holding one puzzle at A1 and a puzzle with a repeated given next to it
+    :return: path of the workbook
+    """
+    workbook = openpyxl.Workbook()
+    grid_sheet = workbook.active
+    grid_sheet.title = 'grid'
+    write_puzzle_block(worksheet=grid_sheet, puzzle_array=puzzle_string_to_array(easy_puzzle))
+    write_puzzle_block(worksheet=grid_sheet, puzzle_array=puzzle_string_to_array(inkala_puzzle), column=10)
+    write_puzzle_block(worksheet=grid_sheet, puzzle_array=puzzle_string_to_array(inkala_puzzle), row=10, column=10)
+    grid_sheet.cell(row=10, column=1, value=None)
+
+    single_sheet = workbook.create_sheet(title='single')
+    write_puzzle_block(worksheet=single_sheet, puzzle_array=puzzle_string_to_array(easy_puzzle))
+    repeated_puzzle = puzzle_string_to_array(easy_puzzle)
+    repeated_puzzle[0, 0] = 3
+    write_puzzle_block(worksheet=single_sheet, puzzle_array=repeated_puzzle, column=10)
+    workbook_path = tmp_path.joinpath('puzzles.xlsx')
+    workbook.save(workbook_path)
+    return workbook_path
+
+
+def test_read_workbook_puzzles(puzzle_workbook):
+    workbook_puzzles = read_workbook_puzzles(workbook_path=puzzle_workbook)
+    assert workbook_puzzles.puzzles.shape == (5, 9, 9)
+    assert [(x.sheet_name, x.cell_reference) for x in workbook_puzzles.blocks] == [
+        ('grid', 'A1'), ('grid', 'K1'), ('grid', 'K11'), ('single', 'A1'), ('single', 'K1')]
+    assert np.array_equal(workbook_puzzles.puzzles[2], puzzle_string_to_array(inkala_puzzle))
+    assert workbook_puzzles.sheet_shapes == {'grid': (2, 2), 'single': (1, 2)}
+
+
+def test_solve_workbook_writes_solutions_in_place(puzzle_workbook, tmp_path):
+    """
+    The purpose of this function is to test the solutions land where their puzzles were, next to the copied puzzle
+    sheets, and that the puzzle with a repeated given is left blank
+    :return:
+    """
+    output_path = tmp_path.joinpath('solutions.xlsx')
+    solve_result = solve_workbook(workbook_path=puzzle_workbook, output_path=output_path, include_puzzles=True,
+                                  workers=1)
+    assert (solve_result.puzzles, solve_result.solved, solve_result.invalid, solve_result.sheets) == (5, 4, 1, 4)
+    assert openpyxl.load_workbook(output_path, read_only=True).sheetnames == ['grid', 'grid solved', 'single',
+                                                                              'single solved']
+
+    written_puzzles = read_workbook_puzzles(workbook_path=output_path)
+    written_grids = {(x.sheet_name, x.cell_reference): y for x, y in zip(written_puzzles.blocks,
+                                                                           written_puzzles.puzzles)}
+    assert np.array_equal(written_grids[('grid solved', 'A1')], puzzle_string_to_array(easy_solution))
+    assert np.array_equal(written_grids[('grid solved', 'K11')], puzzle_string_to_array(inkala_solution))
+    assert np.array_equal(written_grids[('grid', 'K1')], puzzle_string_to_array(inkala_puzzle))
+    assert ('single solved', 'K1') not in written_grids
+
+
+def test_text_in_a_block_is_rejected(tmp_path):
+    workbook = openpyxl.Workbook()
+    workbook.active['B2'] = 'seven'
+    workbook_path = tmp_path.joinpath('text.xlsx')
+    workbook.save(workbook_path)
+    with pytest.raises(ValueError):
+        read_workbook_puzzles(workbook_path=workbook_path)
+
+
+def test_main_reports_throughput(puzzle_workbook, tmp_path, capsys):
+    output_path = tmp_path.joinpath('solutions.xlsx')
+    assert main([str(puzzle_workbook), '--output', str(output_path), '--workers', '1']) == 0
+    assert openpyxl.load_workbook(output_path, read_only=True).sheetnames == ['grid', 'single']
+    assert 'puzzles/sec' in capsys.readouterr().err